@@ -0,0 +1,155 @@
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from functools import partial
+
+import lookup_table_generator
+from lookup_table_generator import SOLVER_BINARY, TABLES, BatchSolver, generateLookupTables, parseReducedLayout, writeLookupTable
+
+# Measures where the time of generating supertile_lookup_tables.hpp goes and writes the results as JSON, so runs of different commits can be compared.
+# Every table is measured in phases: starting the solver process, solving (wall time and the time the solver reports with -t),
+# parsing the answers, tracing the paths of the entries and writing the table. Afterwards the whole header is generated the same way
+# lookup_table_generator.py does it. Nothing is cached, so every repetition does the same amount of work.
+
+RESULTS_PATH = "benchmark_results.json"
+DEFAULT_REPETITIONS = 5
+
+def summarize(samples) :
+    return {
+        "runs" : len(samples),
+        "min" : min(samples),
+        "median" : statistics.median(samples),
+        "mean" : statistics.fmean(samples),
+        "max" : max(samples),
+    }
+
+# Starting and stopping the solver without any query, this is what every query cost when each one had its own process
+def benchmarkSpawn(binary, repetitions) :
+    samples = []
+    for _ in range(repetitions) :
+        start = time.perf_counter()
+        subprocess.run((binary, "-b"), stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, check=True)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+# Returns the raw answers of the solver, the wall time from sending the first query to reading the last answer and the sum of the times reported with -t.
+# The process is started before the clock, so the spawn cost is not part of the wall time.
+def solveRaw(binary, queries) :
+    solver = BatchSolver(binary, trackTime=True)
+    try :
+        start = time.perf_counter()
+        writer = threading.Thread(target=solver.writeQueries, args=(queries,))
+        writer.start()
+        answers = [solver.process.stdout.readline().rstrip("\n").split(", ") for _ in queries]
+        writer.join()
+        wallTime = time.perf_counter() - start
+    finally :
+        solver.close()
+    for query, answer in zip(queries, answers) :
+        if answer[0] == "" or answer[0].startswith("ERROR") :
+            raise RuntimeError("The solver failed on " + " ".join(query) + ": " + ", ".join(answer))
+    reportedTime = sum(float(answer[-1]) for answer in answers) / 1000
+    return answers, wallTime, reportedTime
+
+def benchmarkTable(binary, table, repetitions) :
+    jobs = list(table.jobs(table))
+    solverJobs = [job for job in jobs if job.gate is not None]
+    queries = [(job.gate, job.inputWires, job.outputWires) for job in solverJobs]
+    phases = {"solve" : [], "solverReported" : [], "pipeOverhead" : [], "parse" : [], "trace" : [], "write" : []}
+    for _ in range(repetitions) :
+        if len(queries) > 0 :
+            answers, wallTime, reportedTime = solveRaw(binary, queries)
+        else :
+            answers, wallTime, reportedTime = [], 0.0, 0.0
+        phases["solve"].append(wallTime)
+        phases["solverReported"].append(reportedTime)
+        phases["pipeOverhead"].append(wallTime - reportedTime)
+
+        start = time.perf_counter()
+        superTiles = [parseReducedLayout(answer) for answer in answers]
+        phases["parse"].append(time.perf_counter() - start)
+
+        superTileOfJob = dict(zip(map(id, solverJobs), superTiles))
+        lookupTableForFile = [""] * table.totalSize
+        start = time.perf_counter()
+        for job in jobs :
+            lookupTableForFile[job.slot] = job.buildEntry(superTileOfJob.get(id(job)))
+        phases["trace"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        writeLookupTable(io.StringIO(), table, lookupTableForFile)
+        phases["write"].append(time.perf_counter() - start)
+
+    result = {"entries" : len(jobs), "queries" : len(queries)}
+    for phase, samples in phases.items() :
+        result[phase] = summarize(samples)
+    return result
+
+# The whole header, written to a temporary file, with the solvers and symmetries the generator uses
+def benchmarkHeader(binary, workers, repetitions) :
+    samples = []
+    with tempfile.TemporaryDirectory() as directory :
+        for _ in range(repetitions) :
+            start = time.perf_counter()
+            with open(os.path.join(directory, "supertile_lookup_tables.hpp"), "w") as outputFile :
+                generateLookupTables(outputFile, TABLES, workers, partial(BatchSolver, binary))
+            samples.append(time.perf_counter() - start)
+    return samples
+
+def gitCommit() :
+    try :
+        return subprocess.run(("git", "rev-parse", "HEAD"), capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(lookup_table_generator.__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError) :
+        return None
+
+def main() :
+    parser = argparse.ArgumentParser(description="Benchmarks the generation of supertile_lookup_tables.hpp and writes the results as JSON.")
+    parser.add_argument("-r", "--repetitions", type=int, default=DEFAULT_REPETITIONS, help="how often every measurement is repeated (default: " + str(DEFAULT_REPETITIONS) + ")")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(), help="number of solver processes for the parallel header run (default: number of cores)")
+    parser.add_argument("-o", "--output", default=RESULTS_PATH, help="file for the JSON results, - for stdout (default: " + RESULTS_PATH + ")")
+    parser.add_argument("--binary", default=SOLVER_BINARY, help="the compiled supertile_layout_generator (default: " + SOLVER_BINARY + ")")
+    arguments = parser.parse_args()
+    repetitions = max(1, arguments.repetitions)
+    workers = max(1, arguments.workers)
+
+    results = {
+        "commit" : gitCommit(),
+        "python" : platform.python_version(),
+        "platform" : platform.platform(),
+        "cpus" : os.cpu_count(),
+        "repetitions" : repetitions,
+        "unit" : "seconds",
+        "spawn" : summarize(benchmarkSpawn(arguments.binary, repetitions)),
+        "tables" : {},
+    }
+    for table in TABLES :
+        results["tables"][table.name] = benchmarkTable(arguments.binary, table, repetitions)
+    results["header"] = {
+        "sequential" : summarize(benchmarkHeader(arguments.binary, 1, repetitions)),
+        "parallel" : dict(summarize(benchmarkHeader(arguments.binary, workers, repetitions)), workers=workers),
+    }
+
+    if arguments.output == "-" :
+        json.dump(results, sys.stdout, indent=4)
+        print()
+        return
+    with open(arguments.output, "w") as resultsFile :
+        json.dump(results, resultsFile, indent=4)
+
+    print("spawn: " + format(results["spawn"]["median"] * 1000, ".3f") + " ms")
+    for name, table in results["tables"].items() :
+        print(name + ": " + ", ".join(phase + " " + format(table[phase]["median"] * 1000, ".3f") + " ms"
+            for phase in ("solve", "solverReported", "pipeOverhead", "parse", "trace", "write")))
+    print("header: " + format(results["header"]["sequential"]["median"] * 1000, ".3f") + " ms sequential, "
+        + format(results["header"]["parallel"]["median"] * 1000, ".3f") + " ms with " + str(workers) + " workers")
+
+if __name__ == "__main__" :
+    main()
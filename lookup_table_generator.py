@@ -1,5 +1,23 @@
+import argparse
+import hashlib
+import io
+import os
 import subprocess
 import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from solver_cache import CACHE_PATH, DEFAULT_MAX_ENTRIES, SolverCache
+from supertile_paths import traceCrossingPath, traceInputPath, traceOutputPath
+from supertile_table_formats import HEADER_PREAMBLE, arrayToEntries, entriesToArray, parseHeaderTables, writeBinaryTables, writeDedupHeader, writePackedHeader
+from supertile_symmetry import IDENTITY, canonicalQuery, restoreSuperTile
+from supertile_telemetry import QueryTiming, Telemetry
+from supertile_library import LIBRARY_PATH, WIRE_CODES, SuperTile, SupertileLibrary, superTileOfResult
 
 # Directions are based on this layout
 #           ˍ---¯¯¯---ˍ ˍ---¯¯¯---ˍ
@@ -19,6 +37,164 @@ DIRECTIONS = ["0", "1", "2", "3", "4", "5"]
 
 EMPTY = "-1"
 
+SOLVER_BINARY = "./supertile_layout_generator"
+
+OUTPUT_PATH = "supertile_lookup_tables.hpp"
+
+# Keeps one supertile_layout_generator open in batch mode (-b), so a query only costs one line on stdin/stdout instead of a whole new process
+# With trackTime the solver appends the time it took to every answer (see -t), readAnswer() keeps it in lastMilliseconds
+class BatchSolver :
+    def __init__(self, binary=SOLVER_BINARY, trackTime=False) :
+        self.process = subprocess.Popen((binary, "-b", "-t") if trackTime else (binary, "-b"), stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        self.lastMilliseconds = None
+
+    # returns the SuperTile of the reduced layout (see -r)
+    def solve(self, gate, inputWires, outputWires) :
+        self.writeQueries([(gate, inputWires, outputWires)])
+        return self.readAnswer(gate, inputWires, outputWires)
+
+    # Sends all queries before reading the answers, so the solver never waits for the next line.
+    # The queries are written from a second thread, otherwise both sides could block on full pipes.
+    # If timings is a list, a QueryTiming is added for every answer (see supertile_telemetry.py)
+    def solveAll(self, queries, timings=None) :
+        writer = threading.Thread(target=self.writeQueries, args=(queries,))
+        writer.start()
+        superTiles = []
+        error = None
+        start = time.perf_counter()
+        for query in queries :
+            try :
+                superTiles.append(self.readAnswer(*query))
+            except RuntimeError as exception :
+                # keep reading, so the solver can't get stuck on a full pipe while the writer is still running
+                if error is None :
+                    error = exception
+                if self.process.poll() is not None :
+                    break
+            if timings is not None :
+                end = time.perf_counter()
+                timings.append(QueryTiming(start, end, self.lastMilliseconds))
+                start = end
+        writer.join()
+        if error is not None :
+            raise error
+        return superTiles
+
+    def writeQueries(self, queries) :
+        try :
+            for gate, inputWires, outputWires in queries :
+                self.process.stdin.write(gate + " " + inputWires + " " + outputWires + "\n")
+            self.process.stdin.flush()
+        except BrokenPipeError :
+            pass # the solver stopped, this is reported by readAnswer()
+
+    def readAnswer(self, gate, inputWires, outputWires) :
+        answer = self.process.stdout.readline()
+        if answer == "" :
+            raise RuntimeError("supertile_layout_generator stopped while solving: " + gate + " " + inputWires + " " + outputWires)
+        if answer.startswith("ERROR") :
+            self.lastMilliseconds = None
+            raise RuntimeError(answer.strip() + " (query: " + gate + " " + inputWires + " " + outputWires + ")")
+        programOutput = answer.rstrip("\n").split(", ")
+        self.lastMilliseconds = float(programOutput[7]) if len(programOutput) > 7 else None
+        return parseReducedLayout(programOutput)
+
+    def close(self) :
+        try :
+            self.process.stdin.close()
+        except BrokenPipeError :
+            pass
+        self.process.wait()
+
+# Calls the solvers directly through libsupertile_layout_generator.so, without any process or text in between
+class LibrarySolver :
+    def __init__(self, library) :
+        self.library = library
+
+    def solve(self, gate, inputWires, outputWires) :
+        return self.library.solve(gate, [int(direction) for direction in inputWires], [int(direction) for direction in outputWires])
+
+    def solveAll(self, queries, timings=None) :
+        if timings is None :
+            return [self.solve(gate, inputWires, outputWires) for gate, inputWires, outputWires in queries]
+        superTiles = []
+        for gate, inputWires, outputWires in queries :
+            start = time.perf_counter()
+            result = self.library.solveRaw(gate, [int(direction) for direction in inputWires], [int(direction) for direction in outputWires])
+            superTiles.append(superTileOfResult(result))
+            timings.append(QueryTiming(start, time.perf_counter(), result.milliseconds))
+        return superTiles
+
+    def close(self) :
+        pass
+
+# The answers of supertile_layout_generator -e, which solves every configuration of a gate class in one run.
+# Every gate class is enumerated once, the first time one of its queries is needed, and shared by all EnumerationSolvers.
+class Enumeration :
+    def __init__(self, binary=SOLVER_BINARY, threads=1) :
+        self.binary = binary
+        self.threads = threads
+        self.lock = threading.Lock()
+        self.answers = {}
+
+    # (inputWires, outputWires) -> (SuperTile, milliseconds) or the error message of the solver
+    def answersOf(self, gate) :
+        with self.lock :
+            if gate not in self.answers :
+                self.answers[gate] = self.enumerate(gate)
+            return self.answers[gate]
+
+    def enumerate(self, gate) :
+        process = subprocess.run((self.binary, "-e", gate, "-j", str(self.threads), "-t"), stdout=subprocess.PIPE, text=True)
+        if process.returncode != 0 :
+            raise RuntimeError("supertile_layout_generator can't enumerate " + gate + ": " + process.stdout.strip())
+        answers = {}
+        for line in process.stdout.splitlines() :
+            query, answer = line.split(", ", 1)
+            _, inputWires, outputWires = query.split(" ")
+            if answer.startswith("ERROR") :
+                answers[enumerationKey(gate, inputWires, outputWires)] = answer + " (query: " + query + ")"
+                continue
+            programOutput = answer.split(", ")
+            answers[enumerationKey(gate, inputWires, outputWires)] = (parseReducedLayout(programOutput), float(programOutput[7]))
+        return answers
+
+# The enumeration lists the inputs of BLG in ascending order and ignores the input of POutput
+def enumerationKey(gate, inputWires, outputWires) :
+    if gate == "POutput" :
+        return ("", outputWires)
+    if gate == "BLG" or gate == "BLGR" :
+        return ("".join(sorted(inputWires)), outputWires)
+    return (inputWires, outputWires)
+
+class EnumerationSolver :
+    def __init__(self, enumeration) :
+        self.enumeration = enumeration
+
+    def solve(self, gate, inputWires, outputWires) :
+        return self.answer(gate, inputWires, outputWires)[0]
+
+    def answer(self, gate, inputWires, outputWires) :
+        answer = self.enumeration.answersOf(gate).get(enumerationKey(gate, inputWires, outputWires))
+        if answer is None :
+            raise RuntimeError("The enumeration of " + gate + " doesn't contain the query " + gate + " " + inputWires + " " + outputWires)
+        if isinstance(answer, str) :
+            raise RuntimeError(answer)
+        return answer
+
+    def solveAll(self, queries, timings=None) :
+        superTiles = []
+        for query in queries :
+            start = time.perf_counter()
+            superTile, milliseconds = self.answer(*query)
+            superTiles.append(superTile)
+            if timings is not None :
+                timings.append(QueryTiming(start, time.perf_counter(), milliseconds))
+        return superTiles
+
+    def close(self) :
+        pass
+
 def directionLookup(direction: str) :
     match direction :
         case "-1" :
@@ -41,70 +217,25 @@ def directionLookup(direction: str) :
             print("ERROR in directionLookup")
             return direction
 
-def wireLookup(wireName: str) :
-    match wireName :
-        case "-" :
-            return [99, 99, 99, 99]
-        # Standard wires:
-        case "wire01" :
-            return [0, 1, 99, 99]
-        case "wire02" :
-            return [0, 2, 99, 99]
-        case "wire03" :
-            return [0, 3, 99, 99]
-        case "wire04" :
-            return [0, 4, 99, 99]
-        case "wire05" :
-            return [0, 5, 99, 99]
-        case "wire12" :
-            return [1, 2, 99, 99]
-        case "wire13" :
-            return [1, 3, 99, 99]
-        case "wire14" :
-            return [1, 4, 99, 99]
-        case "wire15" :
-            return [1, 5, 99, 99]
-        case "wire23" :
-            return [2, 3, 99, 99]
-        case "wire24" :
-            return [2, 4, 99, 99]
-        case "wire25" :
-            return [2, 5, 99, 99]
-        case "wire34" :
-            return [3, 4, 99, 99]
-        case "wire35" :
-            return [3, 5, 99, 99]
-        case "wire45" :
-            return [4, 5, 99, 99]
-        # Double wires with on straight wire
-        case "wire14_23" :
-            return [1, 4, 2, 3]
-        case "wire25_34" :
-            return [2, 5, 3, 4]
-        case "wire03_45" :
-            return [0, 3, 4, 5]
-        case "wire14_05" :
-            return [1, 4, 0, 5]
-        case "wire25_01" :
-            return [2, 5, 0, 1]
-        case "wire03_12" :
-            return [0, 3, 1, 2]
-        # Double wires with both wires bend
-        case "wire12_34" :
-            return [1, 2, 3, 4]
-        case "wire23_45" :
-            return [2, 3, 4, 5]
-        case "wire34_05" :
-            return [3, 4, 0, 5]
-        case "wire45_01" :
-            return [4, 5, 0, 1]
-        case "wire05_12" :
-            return [0, 5, 1, 2]
-        case "wire01_23" :
-            return [0, 1, 2, 3]
-        # Default case (Error)
-        case _:
-            return [100, 100, 100, 100]
+# Turns the reduced output of supertile_layout_generator (-r or -b) into a SuperTile.
+# The positions of wire cores (Wire, POutput) are not part of the reduced output, so they are left empty.
+def parseReducedLayout(programOutput) :
+    coreName = programOutput[0]
+    orientation = coreName.split("_")[1:]
+    if coreName.startswith("Inverter") :
+        coreInPositions = (int(orientation[0]),)
+        coreOutPositions = (int(orientation[1]),)
+    elif coreName.startswith("CROSSING") :
+        coreInPositions = (int(orientation[0]), int(orientation[1]))
+        coreOutPositions = ((coreInPositions[0] + 3) % 6, (coreInPositions[1] + 3) % 6)
+    elif coreName == "Bypass" or coreName.startswith("wire") :
+        coreInPositions = ()
+        coreOutPositions = ()
+    else :
+        # Y-shaped cores, the inputs always lie on the other side of the output
+        coreOutPositions = (int(orientation[0]),)
+        coreInPositions = (2, 3) if coreOutPositions[0] == 0 or coreOutPositions[0] == 5 else (0, 5)
+    return SuperTile(coreName, coreInPositions, coreOutPositions, tuple(WIRE_CODES[wireName] for wireName in programOutput[1:7]))
 
 def perfectHashFunction22CROSSING(in1, out1, in2, out2) :
     out1 = (out1 - in1) % 6
@@ -185,168 +316,18 @@ def perfectHashFunction11(A, B) :
 def perfectHashFunction10(A) :
     return A
 
-# returns next position (7 represents the core, 8 represents the outside of the supertile)
-def translateDirectionToPosition(currentPosition, direction) :
-    match currentPosition :
-        case 0 :
-            match direction :
-                case 2 :
-                    return 1
-                case 3 :
-                    return 7
-                case 4 :
-                    return 5
-                case _ :
-                    return 8
-        case 1 :
-            match direction :
-                case 3 :
-                    return 2
-                case 4 :
-                    return 7
-                case 5 :
-                    return 0
-                case _ :
-                    return 8
-        case 2 :
-            match direction :
-                case 4 :
-                    return 3
-                case 5 :
-                    return 7
-                case 0 :
-                    return 1
-                case _ :
-                    return 8
-        case 3 :
-            match direction :
-                case 5 :
-                    return 4
-                case 0 :
-                    return 7
-                case 1 :
-                    return 2
-                case _ :
-                    return 8
-        case 4 :
-            match direction :
-                case 0 :
-                    return 5
-                case 1 :
-                    return 7
-                case 2 :
-                    return 3
-                case _ :
-                    return 8
-        case 5 :
-            match direction :
-                case 1 :
-                    return 0
-                case 2 :
-                    return 7
-                case 3 :
-                    return 4
-                case _ :
-                    return 8
-        case 7 :
-            return direction
-        case _ :
-            print("ERROR in translateDirectionToPosition")
-            return 99
-
-def writeInputPathToTable(lookupTableForSupertile, programOutput, inputPosition, lookupTableStartPosition) :
-    updatedLookupTablePosition = lookupTableStartPosition
-    currentWirePosition = inputPosition
-    lastWirePosition = 8
-    while True :
-        lookupTableForSupertile[updatedLookupTablePosition] = str(currentWirePosition)
-        updatedLookupTablePosition += 1
-        wireConnections = wireLookup(programOutput[currentWirePosition + 1]) # +1 to skip the core in the output
-        if translateDirectionToPosition(currentWirePosition, wireConnections[0]) == lastWirePosition :
-            lastWirePosition = currentWirePosition
-            currentWirePosition = translateDirectionToPosition(currentWirePosition, wireConnections[1])
-        elif translateDirectionToPosition(currentWirePosition, wireConnections[1]) == lastWirePosition :
-            lastWirePosition = currentWirePosition
-            currentWirePosition = translateDirectionToPosition(currentWirePosition, wireConnections[0])
-        elif translateDirectionToPosition(currentWirePosition, wireConnections[2]) == lastWirePosition :
-            lastWirePosition = currentWirePosition
-            currentWirePosition = translateDirectionToPosition(currentWirePosition, wireConnections[3])
-        elif translateDirectionToPosition(currentWirePosition, wireConnections[3]) == lastWirePosition :
-            lastWirePosition = currentWirePosition
-            currentWirePosition = translateDirectionToPosition(currentWirePosition, wireConnections[2])
-        else :
-            print("ERROR in writeInputPathToTable")
-            return 0
-        
-        if currentWirePosition == 7 :
-            break
-
-    return updatedLookupTablePosition
-
-def writeOutputPathToTable(lookupTableForSupertile, programOutput, outputPosition, lookupTableStartPosition) :
-    updatedLookupTablePosition = lookupTableStartPosition
-    currentWirePosition = outputPosition
-    lastWirePosition = 7
-    while True :
-        lookupTableForSupertile[updatedLookupTablePosition] = str(currentWirePosition)
-        updatedLookupTablePosition += 1
-        wireConnections = wireLookup(programOutput[currentWirePosition + 1])
-        if translateDirectionToPosition(currentWirePosition, wireConnections[0]) == lastWirePosition:
-            lastWirePosition = currentWirePosition
-            currentWirePosition = translateDirectionToPosition(currentWirePosition, wireConnections[1])
-        elif translateDirectionToPosition(currentWirePosition, wireConnections[1]) == lastWirePosition :
-            lastWirePosition = currentWirePosition
-            currentWirePosition = translateDirectionToPosition(currentWirePosition, wireConnections[0])
-        elif translateDirectionToPosition(currentWirePosition, wireConnections[2]) == lastWirePosition :
-            lastWirePosition = currentWirePosition
-            currentWirePosition = translateDirectionToPosition(currentWirePosition, wireConnections[3])
-        elif translateDirectionToPosition(currentWirePosition, wireConnections[3]) == lastWirePosition :
-            lastWirePosition = currentWirePosition
-            currentWirePosition = translateDirectionToPosition(currentWirePosition, wireConnections[2])
-        else :
-            print("ERROR in writeOutputPathToTable")
-            break
-        if currentWirePosition == 8 :
-                break
-        
-    return updatedLookupTablePosition
+# Writes the positions of a traced path (see supertile_paths.py) and returns where the next part of the entry starts
+def writePathToTable(lookupTableForSupertile, path, lookupTableStartPosition) :
+    for offset, position in enumerate(path) :
+        lookupTableForSupertile[lookupTableStartPosition + offset] = str(position)
+    return lookupTableStartPosition + len(path)
 
 def writeTableStart(outputFile, totalSize, supertileSize, name) :
     outputFile.write('\nconstexpr const std::array<std::array<hex_direction,' + str(supertileSize) + '>,' + str(totalSize) + '> ' + name + ' = {{\n')
 
+# Every entry is assembled in memory first, so the whole table is a single write
 def writeTable(outputFile, table) :
-    outputFile.write('{{')
-
-    if table[0][0] != EMPTY : # Write first entry seperate so we don't write a ',' where it isn't required
-        outputFile.write(directionLookup(str(table[0][0])))
-    else :
-        outputFile.write("X")
-
-    for gate in table[0][1:len(table[0])] : # Write first entries seperate so we don't write a ',' where it isn't required
-        outputFile.write(', ')
-        if gate != EMPTY :
-            outputFile.write(directionLookup(str(gate)))
-        else :
-            outputFile.write("X")
-
-    outputFile.write('}}')
-
-    for supertile in table[1:(len(table))] :
-        outputFile.write(',\n{{')
-
-        if supertile[0] != EMPTY : # Write first entry seperate so we don't write a ',' where it isn't required
-            outputFile.write(directionLookup(str(supertile[0])))
-        else :
-            outputFile.write("X")
-
-        for gate in supertile[1:len(supertile)] : 
-            outputFile.write(', ')
-            if gate != EMPTY :
-                outputFile.write(directionLookup(str(gate)))
-            else :
-                outputFile.write("X")
-
-        outputFile.write('}}')
+    outputFile.write(',\n'.join('{{' + ', '.join(directionLookup(str(gate)) for gate in supertile) + '}}' for supertile in table))
 
 def writeTableEnd(outputFile) :
     outputFile.write('}};\n')
@@ -376,353 +357,472 @@ def checkIfCrossing(in1, in2, out1, out2) :
             else :
                 return False
 
-def crossingLookup(coreName) :
-    in1 = int(coreName[-1])
-    in2 = int(coreName[-3])
-    out1 = (in1 + 3) % 6
-    out2 = (in2 + 3) % 6
-    return [in1, out1, in2, out2]
-
-def writeCrossingWireToTable(lookupTableForSupertile, programOutput, inputPosition, lookupTableStartPosition) :
-    updatedLookupTablePosition = lookupTableStartPosition
-    currentWirePosition = inputPosition
-    lastWirePosition = 8
-    while True :
-        lookupTableForSupertile[updatedLookupTablePosition] = str(currentWirePosition)
-        updatedLookupTablePosition += 1
-        if currentWirePosition != 7 :
-            wireConnections = wireLookup(programOutput[currentWirePosition + 1]) # +1 to skip the core in the output
-        else :
-            wireConnections = crossingLookup(programOutput[0])
-        if translateDirectionToPosition(currentWirePosition, wireConnections[0]) == lastWirePosition :
-            lastWirePosition = currentWirePosition
-            currentWirePosition = translateDirectionToPosition(currentWirePosition, wireConnections[1])
-        elif translateDirectionToPosition(currentWirePosition, wireConnections[1]) == lastWirePosition :
-            lastWirePosition = currentWirePosition
-            currentWirePosition = translateDirectionToPosition(currentWirePosition, wireConnections[0])
-        elif translateDirectionToPosition(currentWirePosition, wireConnections[2]) == lastWirePosition :
-            lastWirePosition = currentWirePosition
-            currentWirePosition = translateDirectionToPosition(currentWirePosition, wireConnections[3])
-        elif translateDirectionToPosition(currentWirePosition, wireConnections[3]) == lastWirePosition :
-            lastWirePosition = currentWirePosition
-            currentWirePosition = translateDirectionToPosition(currentWirePosition, wireConnections[2])
-        else :
-            print("ERROR in writeCrossingWireToTable")
-            return 0
-        
-        if currentWirePosition == 8 :
-            break
-    return updatedLookupTablePosition
-
-def generate2in2outCROSSING(outputfile) :
-    lookupTableForFile = []
-    for directionIn1 in DIRECTIONS :
-        for i in range(20) :
-            lookupTableForFile.append("")
-        for directionOut1 in DIRECTIONS :
-            if directionOut1 != directionIn1 :
-                for directionIn2 in DIRECTIONS :
-                    if directionIn2 != directionIn1 and directionIn2 != directionOut1 :
-                        for directionOut2 in DIRECTIONS :
-                            if directionOut2 != directionIn1 and directionOut2 != directionIn2 and directionOut2 != directionOut1 :
-                                if checkIfCrossing(int(directionIn1),int(directionIn2),int(directionOut1),int(directionOut2)) :
-                                    # Prepare programm inputs
-                                    gate = "Crossing"
-                                    outputWires = directionOut1 + directionOut2
-                                    inputWires = directionIn1 + directionIn2
-                                    args = ("./supertile_layout_generator", "-r", gate, inputWires, outputWires)
-
-                                    # Execute programm and read output
-                                    executed_binary = subprocess.Popen(args, stdout=subprocess.PIPE)
-                                    executed_binary.wait()
-                                    programOutput = executed_binary.stdout.read().decode().split(", ")
+# One query to the solver, buildEntry turns the solver output into the lookup table entry that is placed at slot
+SolverJob = namedtuple("SolverJob", ["table", "slot", "gate", "inputWires", "outputWires", "buildEntry"])
 
-                                    # prepare lookup table entry for this gate
-                                    lookupTableForSupertile = [EMPTY,EMPTY,EMPTY,EMPTY,EMPTY,EMPTY,EMPTY,EMPTY,EMPTY,EMPTY]
+# name is used in the header, the jobs function yields every SolverJob that is needed to fill the table
+LookupTable = namedtuple("LookupTable", ["name", "totalSize", "supertileSize", "jobs", "trivial"])
 
-                                    # write wire 1
-                                    updatedStartPosition = writeCrossingWireToTable(lookupTableForSupertile, programOutput, int(directionIn1), 0)
-                                    updatedStartPosition += 1 # to insert dividing EMPTY
+def entry2in2out(supertileSize, directionIn1, directionIn2, superTile) :
+    # prepare lookup table entry for this gate
+    lookupTableForSupertile = [EMPTY] * supertileSize
 
-                                    # write wire 2
-                                    writeCrossingWireToTable(lookupTableForSupertile, programOutput, int(directionIn2), updatedStartPosition)
+    # write wire 1
+    updatedStartPosition = writePathToTable(lookupTableForSupertile, traceCrossingPath(superTile, directionIn1), 0)
+    updatedStartPosition += 1 # to insert dividing EMPTY
 
-                                    # Add array entry
-                                    lookupTableForFile[perfectHashFunction22CROSSING(int(directionIn1), int(directionOut1), int(directionIn2), int(directionOut2))] = lookupTableForSupertile
+    # write wire 2
+    writePathToTable(lookupTableForSupertile, traceCrossingPath(superTile, directionIn2), updatedStartPosition)
 
-    # Write array to file
-    writeTableStart(outputFile, 120, 10, 'lookup_table_2in2out_CROSSING')
-    writeTable(outputFile, lookupTableForFile)
-    writeTableEnd(outputFile)
+    return lookupTableForSupertile
 
-def generate2in2outBYPASS(outputfile) :
-    lookupTableForFile = []
+def jobs2in2out(table, gate, crossing, perfectHashFunction) :
     for directionIn1 in DIRECTIONS :
-        for i in range(40) :
-            lookupTableForFile.append("")
         for directionOut1 in DIRECTIONS :
             if directionOut1 != directionIn1 :
                 for directionIn2 in DIRECTIONS :
                     if directionIn2 != directionIn1 and directionIn2 != directionOut1 :
                         for directionOut2 in DIRECTIONS :
                             if directionOut2 != directionIn1 and directionOut2 != directionIn2 and directionOut2 != directionOut1 :
-                                if not checkIfCrossing(int(directionIn1),int(directionIn2),int(directionOut1),int(directionOut2)) :
-                                    # Prepare programm inputs
-                                    gate = "Bypass"
-                                    outputWires = directionOut1 + directionOut2
-                                    inputWires = directionIn1 + directionIn2
-                                    args = ("./supertile_layout_generator", "-r", gate, inputWires, outputWires)
+                                if checkIfCrossing(int(directionIn1),int(directionIn2),int(directionOut1),int(directionOut2)) == crossing :
+                                    slot = perfectHashFunction(int(directionIn1), int(directionOut1), int(directionIn2), int(directionOut2))
+                                    buildEntry = partial(entry2in2out, table.supertileSize, int(directionIn1), int(directionIn2))
+                                    yield SolverJob(table, slot, gate, directionIn1 + directionIn2, directionOut1 + directionOut2, buildEntry)
 
-                                    # Execute programm and read output
-                                    executed_binary = subprocess.Popen(args, stdout=subprocess.PIPE)
-                                    executed_binary.wait()
-                                    programOutput = executed_binary.stdout.read().decode().split(", ")
+def jobs2in2outCROSSING(table) :
+    return jobs2in2out(table, "Crossing", True, perfectHashFunction22CROSSING)
 
-                                    # prepare lookup table entry for this gate
-                                    lookupTableForSupertile = [EMPTY,EMPTY,EMPTY,EMPTY,EMPTY,EMPTY,EMPTY]
+def jobs2in2outBYPASS(table) :
+    return jobs2in2out(table, "Bypass", False, perfectHashFunction22BYPASS)
 
-                                    # write wire 1
-                                    updatedStartPosition = writeCrossingWireToTable(lookupTableForSupertile, programOutput, int(directionIn1), 0)
-                                    updatedStartPosition += 1 # to insert dividing EMPTY
+def entry2in1out(directionIn1, directionIn2, superTile) :
+    # prepare lookup table entry for this gate
+    lookupTableForSupertile = [EMPTY,EMPTY,EMPTY,EMPTY,EMPTY,EMPTY,EMPTY,EMPTY,EMPTY]
 
-                                    # write wire 2
-                                    writeCrossingWireToTable(lookupTableForSupertile, programOutput, int(directionIn2), updatedStartPosition)
+    # write input wires
+    updatedStartPosition = writePathToTable(lookupTableForSupertile, traceInputPath(superTile, directionIn1), 0)
+    updatedStartPosition += 1 # to insert dividing EMPTY
+    updatedStartPosition = writePathToTable(lookupTableForSupertile, traceInputPath(superTile, directionIn2), updatedStartPosition)
+    updatedStartPosition += 1 # to insert dividing EMPTY
 
-                                    # Add array entry
-                                    lookupTableForFile[perfectHashFunction22BYPASS(int(directionIn1), int(directionOut1), int(directionIn2), int(directionOut2))] = lookupTableForSupertile
+    # write output wire
+    writePathToTable(lookupTableForSupertile, traceOutputPath(superTile, superTile.coreOutPositions[0]), updatedStartPosition)
 
-    # Write array to file
-    writeTableStart(outputFile, 240, 7, 'lookup_table_2in2out_BYPASS')
-    writeTable(outputFile, lookupTableForFile)
-    writeTableEnd(outputFile)
-    
-def generate2in1out(outputFile) :
-    lookupTableForFile = []
-    for directionOut in DIRECTIONS :# Represents the output wire
-        for i in range(10) :
-            lookupTableForFile.append("")
+    return lookupTableForSupertile
 
+def jobs2in1out(table) :
+    for directionOut in DIRECTIONS :# Represents the output wire
         for directionIn1 in DIRECTIONS :# Represents the first input wire
             if directionIn1 != directionOut :
                 for directionIn2 in DIRECTIONS : # Represents the second input wire
                     if directionIn2 != directionOut and directionIn2 != directionIn1 and int(directionIn2) > int(directionIn1) :
-                        # Prepare programm inputs
-                        gate = "BLG"
-                        outputWire = directionOut
-                        inputWires = directionIn1 + directionIn2
-                        args = ("./supertile_layout_generator", "-r", gate, inputWires, outputWire)
-
-                        # Execute programm and read output
-                        executed_binary = subprocess.Popen(args, stdout=subprocess.PIPE)
-                        executed_binary.wait()
-                        programOutput = executed_binary.stdout.read().decode().split(", ")
-
-                        # prepare lookup table entry for this gate
-                        lookupTableForSupertile = [EMPTY,EMPTY,EMPTY,EMPTY,EMPTY,EMPTY,EMPTY,EMPTY,EMPTY]
-
-                        # write input wires
-                        updatedStartPosition = writeInputPathToTable(lookupTableForSupertile, programOutput, int(directionIn1), 0)
-                        updatedStartPosition += 1 # to insert dividing EMPTY
-                        updatedStartPosition = writeInputPathToTable(lookupTableForSupertile, programOutput, int(directionIn2), updatedStartPosition)
-                        updatedStartPosition += 1 # to insert dividing EMPTY
-
-                        # write output wire
-                        writeOutputPathToTable(lookupTableForSupertile, programOutput, int(programOutput[0][-1]), updatedStartPosition)
-
-                        # Add array entry
-                        lookupTableForFile[perfectHashFunction21(int(directionOut), int(directionIn1), int(directionIn2))] = lookupTableForSupertile
-                        
-    # Write array to file
-    writeTableStart(outputFile, 60, 9, 'lookup_table_2in1out')
-    writeTable(outputFile, lookupTableForFile)
-    writeTableEnd(outputFile)
+                        slot = perfectHashFunction21(int(directionOut), int(directionIn1), int(directionIn2))
+                        buildEntry = partial(entry2in1out, int(directionIn1), int(directionIn2))
+                        yield SolverJob(table, slot, "BLG", directionIn1 + directionIn2, directionOut, buildEntry)
+
+def entry1in2out(directionIn, superTile) :
+    # prepare lookup table entry for this gate
+    lookupTableForSupertile = [EMPTY,EMPTY,EMPTY,EMPTY,EMPTY,EMPTY,EMPTY,EMPTY,EMPTY]
+
+    # write intput wire
+    updatedStartPosition = writePathToTable(lookupTableForSupertile, traceInputPath(superTile, directionIn), 0)
+    updatedStartPosition += 1 # to insert dividing EMPTY
+
+    # write output wires
+    if superTile.coreOutPositions[0] == 2 or superTile.coreOutPositions[0] == 3 :
+        outputPosition1 = 0
+        outputPosition2 = 5
+    elif superTile.coreOutPositions[0] == 0 or superTile.coreOutPositions[0] == 5 :
+        outputPosition1 = 2
+        outputPosition2 = 3
+    else :
+        raise RuntimeError("ERROR in entry1in2out, unknown core orientation " + superTile.coreName)
+    updatedStartPosition = writePathToTable(lookupTableForSupertile, traceOutputPath(superTile, outputPosition1), updatedStartPosition)
+    updatedStartPosition += 1 # to insert dividing EMPTY
+    updatedStartPosition = writePathToTable(lookupTableForSupertile, traceOutputPath(superTile, outputPosition2), updatedStartPosition)
 
-def generate1in2out(outputFile) :
-    lookupTableForFile = []
-    for directionIn in DIRECTIONS :# Represents the output wire
-        for i in range(10) :
-            lookupTableForFile.append("")
+    return lookupTableForSupertile
 
-        for directionOut1 in DIRECTIONS :# Represents the first input wire
+def jobs1in2out(table) :
+    for directionIn in DIRECTIONS :# Represents the input wire
+        for directionOut1 in DIRECTIONS :# Represents the first output wire
             if directionOut1 != directionIn :
-                for directionOut2 in DIRECTIONS : # Represents the second input wire
+                for directionOut2 in DIRECTIONS : # Represents the second output wire
                     if directionOut2 != directionIn and directionOut2 != directionOut1 and int(directionOut2) > int(directionOut1) :
-                        # Prepare programm inputs
-                        gate = "BLG"
-                        inputWire = directionIn
-                        outputWires = directionOut1 + directionOut2
-                        args = ("./supertile_layout_generator", "-r", gate, outputWires, inputWire)
-
-                        # Execute programm and read output
-                        executed_binary = subprocess.Popen(args, stdout=subprocess.PIPE)
-                        executed_binary.wait()
-                        programOutput = executed_binary.stdout.read().decode().split(", ")
-
-                        # prepare lookup table entry for this gate
-                        lookupTableForSupertile = [EMPTY,EMPTY,EMPTY,EMPTY,EMPTY,EMPTY,EMPTY,EMPTY,EMPTY]
-
-                        # write intput wire
-                        updatedStartPosition = writeInputPathToTable(lookupTableForSupertile, programOutput, int(directionIn), 0)
-                        updatedStartPosition += 1 # to insert dividing EMPTY
-
-                        # write output wires
-                        if int(programOutput[0][-1]) == 2 or int(programOutput[0][-1]) == 3 :
-                            outputPosition1 = 0
-                            outputPosition2 = 5
-                        elif int(programOutput[0][-1]) == 0 or int(programOutput[0][-1]) == 5 :
-                            outputPosition1 = 2
-                            outputPosition2 = 3
-                        else :
-                            print("ERROR in generate1in2out")
-                            return
-                        updatedStartPosition = writeOutputPathToTable(lookupTableForSupertile, programOutput, outputPosition1, updatedStartPosition)
-                        updatedStartPosition += 1 # to insert dividing EMPTY
-                        updatedStartPosition = writeOutputPathToTable(lookupTableForSupertile, programOutput, outputPosition2, updatedStartPosition)
-
-                        # Add array entry
-                        lookupTableForFile[perfectHashFunction21(int(directionIn), int(directionOut1), int(directionOut2))] = lookupTableForSupertile
-
-    # Write array to file
-    writeTableStart(outputFile, 60, 9, 'lookup_table_1in2out')
-    writeTable(outputFile, lookupTableForFile)
-    writeTableEnd(outputFile)
+                        # The fan-out uses the same core as BLG, just with in- and outputs swapped
+                        slot = perfectHashFunction21(int(directionIn), int(directionOut1), int(directionOut2))
+                        buildEntry = partial(entry1in2out, int(directionIn))
+                        yield SolverJob(table, slot, "BLG", directionOut1 + directionOut2, directionIn, buildEntry)
+
+def entry1in1outWIRE(directionIn, directionOut, superTile) :
+    # prepare lookup table entry for this gate
+    lookupTableForSupertile = [EMPTY,EMPTY,EMPTY]
+
+    # write input wire
+    updatedStartPosition = writePathToTable(lookupTableForSupertile, traceInputPath(superTile, directionIn), 0)
+
+    # write core
+    lookupTableForSupertile[updatedStartPosition] = "7"
+    updatedStartPosition += 1
+
+    # write output wire
+    writePathToTable(lookupTableForSupertile, traceOutputPath(superTile, directionOut), updatedStartPosition)
+
+    return lookupTableForSupertile
+
+def entry1in1outINVERTER(directionIn, superTile) :
+    # prepare lookup table entry for this gate
+    lookupTableForSupertile = [EMPTY,EMPTY,EMPTY,EMPTY,EMPTY]
+
+    # write input wire
+    updatedStartPosition = writePathToTable(lookupTableForSupertile, traceInputPath(superTile, directionIn), 0)
+    updatedStartPosition += 1 # to insert dividing EMPTY
+
+    # write output wire
+    writePathToTable(lookupTableForSupertile, traceOutputPath(superTile, superTile.coreOutPositions[0]), updatedStartPosition)
+
+    return lookupTableForSupertile
 
-def generate1in1outWIRE(outputFile) :
-    lookupTableForFile = []
-    for i in range(30) :
-            lookupTableForFile.append("")
+def jobs1in1outWIRE(table) :
     for directionOut in DIRECTIONS :# Represents the output wire
         for directionIn in DIRECTIONS :# Represents the input wire
             if directionIn != directionOut :
-                # Prepare programm inputs
-                gate = "Wire"
-                args = ("./supertile_layout_generator", "-r", gate, directionIn, directionOut)
-
-                # Execute programm and read output
-                executed_binary = subprocess.Popen(args, stdout=subprocess.PIPE)
-                executed_binary.wait()
-                programOutput = executed_binary.stdout.read().decode().split(", ")
-
-                # prepare lookup table entry for this gate
-                lookupTableForSupertile = [EMPTY,EMPTY,EMPTY]
-
-                # write input wire
-                updatedStartPosition = writeInputPathToTable(lookupTableForSupertile, programOutput, int(directionIn), 0)
-
-                # write core
-                lookupTableForSupertile[updatedStartPosition] = "7"
-                updatedStartPosition += 1
-                
-                # write output wire
-                writeOutputPathToTable(lookupTableForSupertile, programOutput, int(directionOut), updatedStartPosition)
-
-                # Add array entry
-                lookupTableForFile[perfectHashFunction11(int(directionIn), int(directionOut))] = lookupTableForSupertile
-
-    # Write array to file
-    outputFile.write('\n//Trivial, so it\'s not actually used')
-    writeTableStart(outputFile, 30, 3, 'lookup_table_1in1out_WIRE')
-    writeTable(outputFile, lookupTableForFile)
-    writeTableEnd(outputFile)
+                slot = perfectHashFunction11(int(directionIn), int(directionOut))
+                buildEntry = partial(entry1in1outWIRE, int(directionIn), int(directionOut))
+                yield SolverJob(table, slot, "Wire", directionIn, directionOut, buildEntry)
 
-def generate1in1outINVERTER(outputFile) :
-    lookupTableForFile = []
-    for i in range(30) :
-            lookupTableForFile.append("")
+def jobs1in1outINVERTER(table) :
     for directionOut in DIRECTIONS :# Represents the output wire
         for directionIn in DIRECTIONS :# Represents the input wire
             if directionIn != directionOut :
-                # Prepare programm inputs
-                gate = "Inverter"
-                args = ("./supertile_layout_generator", "-r", gate, directionIn, directionOut)
+                slot = perfectHashFunction11(int(directionIn), int(directionOut))
+                buildEntry = partial(entry1in1outINVERTER, int(directionIn))
+                yield SolverJob(table, slot, "Inverter", directionIn, directionOut, buildEntry)
 
-                # Execute programm and read output
-                executed_binary = subprocess.Popen(args, stdout=subprocess.PIPE)
-                executed_binary.wait()
-                programOutput = executed_binary.stdout.read().decode().split(", ")
+def entry1in0out(directionIn, superTile) :
+    # prepare lookup table entry for this gate
+    lookupTableForSupertile = [EMPTY,EMPTY]
 
-                # prepare lookup table entry for this gate
-                lookupTableForSupertile = [EMPTY,EMPTY,EMPTY,EMPTY,EMPTY]
+    # write input wires
+    updatedStartPosition = writePathToTable(lookupTableForSupertile, traceInputPath(superTile, directionIn), 0)
 
-                # write input wire
-                updatedStartPosition = writeInputPathToTable(lookupTableForSupertile, programOutput, int(directionIn), 0)
-                updatedStartPosition += 1 # to insert dividing EMPTY
+    # write core
+    lookupTableForSupertile[updatedStartPosition] = "7"
 
-                # write output wire
-                writeOutputPathToTable(lookupTableForSupertile, programOutput, int(programOutput[0][-1]), updatedStartPosition)
+    return lookupTableForSupertile
 
-                # Add array entry
-                lookupTableForFile[perfectHashFunction11(int(directionIn), int(directionOut))] = lookupTableForSupertile
-    
-    # Write array to file
-    writeTableStart(outputFile, 30, 5, 'lookup_table_1in1out_INVERTER')
-    writeTable(outputFile, lookupTableForFile)
-    writeTableEnd(outputFile)
-
-def generate1in0out(outputFile) :
-    lookupTableForFile = []
-    for i in range(6) :
-        lookupTableForFile.append("")
+def jobs1in0out(table) :
     for directionIn in DIRECTIONS :# Represents the input wire
-            # Prepare programm inputs
-            gate = "POutput"
-            args = ("./supertile_layout_generator", "-r", gate, "1" if directionIn == "0" else "0", directionIn)
-
-            # Execute programm and read output
-            executed_binary = subprocess.Popen(args, stdout=subprocess.PIPE)
-            executed_binary.wait()
-            programOutput = executed_binary.stdout.read().decode().split(", ")
-            
-            # prepare lookup table entry for this gate
-            lookupTableForSupertile = [EMPTY,EMPTY]
-
-            # write input wires
-            updatedStartPosition = writeInputPathToTable(lookupTableForSupertile, programOutput, int(directionIn), 0)
-
-            # write core
-            lookupTableForSupertile[updatedStartPosition] = "7"
-
-            # Add array entry
-            lookupTableForFile[perfectHashFunction10(int(directionIn))] = lookupTableForSupertile
-
-    # Write array to file
-    outputFile.write('\n//Trivial, so it\'s not actually used')
-    writeTableStart(outputFile, 6, 2, 'lookup_table_1in0out')
-    writeTable(outputFile, lookupTableForFile)
-    writeTableEnd(outputFile)
-
-def generate0in1out(outputFile) :
-    lookupTableForFile = []
-    for i in range(6) :
-        lookupTableForFile.append("")
-    for directionOut in DIRECTIONS :# Represents the input wire          
-            # prepare lookup table entry for this gate
-            lookupTableForSupertile = [EMPTY]
+        # The input-positions are ignored by POutput, but they must not collide with the output
+        slot = perfectHashFunction10(int(directionIn))
+        buildEntry = partial(entry1in0out, int(directionIn))
+        yield SolverJob(table, slot, "POutput", "1" if directionIn == "0" else "0", directionIn, buildEntry)
 
-            # write output wire
-            lookupTableForSupertile[0] = directionOut
+def entry0in1out(directionOut, superTile) :
+    # write output wire
+    return [directionOut]
 
-            # Add array entry
-            lookupTableForFile[perfectHashFunction10(int(directionOut))] = lookupTableForSupertile
-
-    # Write array to file
-    outputFile.write('\n//Trivial, so it\'s not actually used')
-    writeTableStart(outputFile, 6, 1, 'lookup_table_0in1out')
+def jobs0in1out(table) :
+    for directionOut in DIRECTIONS :# Represents the output wire
+        # Does not need the solver, so there is no gate
+        yield SolverJob(table, perfectHashFunction10(int(directionOut)), None, None, None, partial(entry0in1out, directionOut))
+
+# The tables in the order in which they are written to the header
+TABLES = [
+    LookupTable('lookup_table_2in1out', 60, 9, jobs2in1out, False),
+    LookupTable('lookup_table_1in2out', 60, 9, jobs1in2out, False),
+    LookupTable('lookup_table_1in1out_WIRE', 30, 3, jobs1in1outWIRE, True),
+    LookupTable('lookup_table_1in1out_INVERTER', 30, 5, jobs1in1outINVERTER, False),
+    LookupTable('lookup_table_1in0out', 6, 2, jobs1in0out, True),
+    LookupTable('lookup_table_0in1out', 6, 1, jobs0in1out, True),
+    LookupTable('lookup_table_2in2out_CROSSING', 120, 10, jobs2in2outCROSSING, False),
+    LookupTable('lookup_table_2in2out_BYPASS', 240, 7, jobs2in2outBYPASS, False),
+]
+
+TABLE_PREFIX = "lookup_table_"
+
+JOB_CHUNK_SIZE = 64
+
+# Each worker thread keeps its own solver process, so the solvers run in parallel while the threads just wait on their pipes
+def runQueryChunk(createSolver, workerState, solvers, telemetry, chunk) :
+    if not hasattr(workerState, "solver") :
+        workerState.solver = createSolver()
+        solvers.append(workerState.solver)
+    if telemetry is None :
+        return [(query, superTile, None) for query, superTile in zip(chunk, workerState.solver.solveAll(chunk))]
+    timings = []
+    superTiles = workerState.solver.solveAll(chunk, timings)
+    for query, timing in zip(chunk, timings) :
+        telemetry.addQuery(query, timing)
+    return list(zip(chunk, superTiles, timings))
+
+# Runs all jobs with up to workers solver processes at the same time and yields (job, entry) for every job as soon as its entry is known:
+# first the jobs that don't need a solver or whose query is in the cache, then the others chunk by chunk.
+# Every job is turned into the canonical query of its symmetry class (see supertile_symmetry.py), each canonical query
+# is solved only once and the solution is rotated back for every job. Queries that are already in the cache are not passed to the solvers at all.
+def solveJobs(jobs, workers, createSolver, cache=None, symmetries=None, telemetry=None) :
+    readyJobs = []
+    waitingJobs = {}
+    superTiles = {}
+    for job in jobs :
+        if job.gate is None :
+            readyJobs.append((job, None, IDENTITY))
+            continue
+        query, transform = canonicalQuery(job.gate, job.inputWires, job.outputWires, symmetries)
+        if query not in superTiles :
+            superTiles[query] = cache.get(*query) if cache is not None else None
+        if superTiles[query] is None :
+            waitingJobs.setdefault(query, []).append((job, query, transform))
+        else :
+            readyJobs.append((job, query, transform))
+    solverQueries = list(waitingJobs)
+
+    timings = {}
+    solvedQueries = set()
+
+    def finishJob(job, query, transform) :
+        if telemetry is not None :
+            start = time.perf_counter()
+        superTile = restoreSuperTile(superTiles[query], transform) if query is not None else None
+        entry = job.buildEntry(superTile)
+        if telemetry is not None :
+            end = time.perf_counter()
+            if query is None :
+                source = "none"
+            elif query not in timings :
+                source = "cache"
+            elif query in solvedQueries :
+                source = "shared"
+            else :
+                source = "solver" # the first job of the query, the others share its SuperTile
+                solvedQueries.add(query)
+            telemetry.addJob(job, source, timings.get(query), end - start, entry)
+        return entry
+
+    for job, query, transform in readyJobs :
+        yield job, finishJob(job, query, transform)
+
+    workerState = threading.local()
+    solvers = []
+    chunks = [solverQueries[start:start + JOB_CHUNK_SIZE] for start in range(0, len(solverQueries), JOB_CHUNK_SIZE)]
+    try :
+        with ThreadPoolExecutor(max_workers=workers) as executor :
+            for results in executor.map(partial(runQueryChunk, createSolver, workerState, solvers, telemetry), chunks) :
+                for query, superTile, timing in results :
+                    if cache is not None :
+                        cache.put(*query, superTile)
+                    superTiles[query] = superTile
+                    timings[query] = timing
+                    for job, _, transform in waitingJobs.pop(query) :
+                        yield job, finishJob(job, query, transform)
+    finally :
+        for solver in solvers :
+            solver.close()
+
+# Runs all jobs (see solveJobs()) and places the entries by their slot, so the result does not depend on the order in which the jobs finish
+def runJobs(jobs, workers, createSolver, cache=None, symmetries=None, telemetry=None) :
+    lookupTables = {}
+    jobs = list(jobs)
+    for job in jobs :
+        if job.table.name not in lookupTables :
+            lookupTables[job.table.name] = [""] * job.table.totalSize
+    for job, entry in solveJobs(jobs, workers, createSolver, cache, symmetries, telemetry) :
+        lookupTables[job.table.name][job.slot] = entry
+    return lookupTables
+
+# Yields (slot, entry) for every entry of a single table as soon as it is solved, without touching any file.
+# Only the solver calls of this table are made, e.g. dict(tableEntries(tableByName("2in2out_BYPASS"))) solves just the bypasses.
+def tableEntries(table, workers=1, createSolver=BatchSolver, cache=None, symmetries=None) :
+    for job, entry in solveJobs(table.jobs(table), workers, createSolver, cache, symmetries) :
+        yield job.slot, entry
+
+# The table with the name, with or without "lookup_table_" in front of it (e.g. "2in2out_BYPASS")
+def tableByName(name) :
+    for table in TABLES :
+        if table.name == name or table.name == TABLE_PREFIX + name :
+            return table
+    raise ValueError("There is no table " + name)
+
+def writeLookupTable(outputFile, table, lookupTableForFile) :
+    if table.trivial :
+        outputFile.write('\n//Trivial, so it\'s not actually used')
+    writeTableStart(outputFile, table.totalSize, table.supertileSize, table.name)
     writeTable(outputFile, lookupTableForFile)
     writeTableEnd(outputFile)
 
-# Start of programm:
-
-outputFile = open(r"supertile_lookup_tables.hpp", "w")
-outputFile.write('#include <array>\n#include <cstdint>\n\nenum hex_direction {\n    NE = 0,\n    E = 1,\n    SE = 2,\n    SW = 3,\n    W = 4,\n    NW = 5,\n    X = 6,\n    C = 7\n};\n')
+# Changes whenever the solver, one of the modules in SOLVER_SOURCES of solver_cache.py or the layout of the table changes, so an unchanged
+# fingerprint means the table can be reused as it is. solverHash also holds the fingerprint of the optimizer if the tables are optimised.
+def tableFingerprint(table, solverHash) :
+    fingerprint = hashlib.sha256((solverHash + " " + table.name + " " + str(table.totalSize) + " " + str(table.supertileSize)).encode())
+    return fingerprint.hexdigest()
+
+# Enumerates the jobs of all tables up front, so all of them can be spread over the workers at once.
+# With a cache, tables whose fingerprint didn't change are copied from the last run without enumerating their jobs.
+# Writes the whole header with a single write and returns the values of every table as (totalSize x supertileSize) uint8 array by name, for the other formats of supertile_table_formats.py.
+# With telemetry, the enumeration, the jobs and the writing of every table are recorded (see supertile_telemetry.py).
+# With an optimizer (see supertile_optimizer.py), the entries of the solvers are replaced by cheaper routings where there are any.
+# Tables in keptTables ((totalSize x supertileSize) arrays by name, e.g. parseHeaderTables() of the last header) are written as they are,
+# so only the other tables cost solver calls.
+def generateLookupTables(outputFile, tables, workers, createSolver=BatchSolver, cache=None, symmetries=None, telemetry=None, optimizer=None, keptTables=None) :
+    start = time.perf_counter()
+    blocks = {}
+    fingerprints = {}
+    cachedReports = {}
+    jobs = []
+    for table in tables :
+        if keptTables is not None and table.name in keptTables :
+            block = io.StringIO()
+            writeLookupTable(block, table, arrayToEntries(keptTables[table.name]))
+            blocks[table.name] = block.getvalue()
+            continue
+        if cache is not None :
+            fingerprints[table.name] = tableFingerprint(table, cache.solverHash + (" " + optimizer.fingerprint() if optimizer is not None else ""))
+            # An optimised table is only reused together with its report, so the savings of every table can be printed
+            optimized = optimizer is not None and optimizer.optimizes(table.name)
+            report = cache.getTableReport(table.name, fingerprints[table.name]) if optimized else None
+            block = cache.getTableBlock(table.name, fingerprints[table.name]) if report is not None or not optimized else None
+            if block is not None :
+                blocks[table.name] = block
+                if report is not None :
+                    cachedReports[table.name] = optimizer.cachedReport(table.name, report)
+                continue
+        jobs.extend(table.jobs(table))
+    if telemetry is not None :
+        telemetry.addSpan("enumerate jobs", "generate", start, time.perf_counter(), {"jobs" : len(jobs)})
+        start = time.perf_counter()
+    lookupTables = runJobs(jobs, workers, createSolver, cache, symmetries, telemetry)
+    if telemetry is not None :
+        telemetry.addSpan("run jobs", "generate", start, time.perf_counter())
+    if optimizer is not None :
+        start = time.perf_counter()
+        optimizer.optimize([table for table in tables if table.name not in blocks or table.name in cachedReports], lookupTables, cachedReports)
+        if telemetry is not None :
+            telemetry.addSpan("optimize", "generate", start, time.perf_counter())
+
+    arrays = {}
+    for table in tables :
+        start = time.perf_counter()
+        reused = table.name in blocks
+        if reused :
+            arrays[table.name] = keptTables[table.name] if keptTables is not None and table.name in keptTables else parseHeaderTables(blocks[table.name])[table.name]
+        else :
+            block = io.StringIO()
+            writeLookupTable(block, table, lookupTables[table.name])
+            blocks[table.name] = block.getvalue()
+            arrays[table.name] = entriesToArray(lookupTables[table.name])
+            if cache is not None :
+                cache.putTableBlock(table.name, fingerprints[table.name], blocks[table.name])
+                if optimizer is not None and optimizer.optimizes(table.name) :
+                    cache.putTableReport(table.name, fingerprints[table.name], optimizer.reportText(table.name))
+        if telemetry is not None :
+            telemetry.addSpan("assemble " + table.name, "write", start, time.perf_counter(), {"reused" : reused, "characters" : len(blocks[table.name])})
+
+    start = time.perf_counter()
+    outputFile.write(HEADER_PREAMBLE + "".join(blocks[table.name] for table in tables))
+    if telemetry is not None :
+        telemetry.addSpan("write header", "write", start, time.perf_counter())
+    return arrays
+
+# Opens a temporary file next to path for writing, which replaces path once the with block is done. If anything goes wrong before,
+# the temporary file is removed and path stays as it was, so a failed or interrupted run never leaves a half written file behind.
+@contextmanager
+def atomicOutput(path) :
+    descriptor, temporaryPath = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix="." + os.path.basename(path) + ".", suffix=".tmp")
+    try :
+        # mkstemp() only allows the owner to read the file, a new file gets the permissions of open()
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temporaryPath, 0o666 & ~umask)
+        with os.fdopen(descriptor, "w") as outputFile :
+            yield outputFile
+        os.replace(temporaryPath, path)
+    except BaseException :
+        os.remove(temporaryPath)
+        raise
+
+def main() :
+    parser = argparse.ArgumentParser(description="Generates supertile_lookup_tables.hpp with the help of supertile_layout_generator.")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(), help="number of solver processes that run at the same time (default: number of cores)")
+    parser.add_argument("--backend", choices=["batch", "library", "enumerate"], default="batch", help="batch: talk to supertile_layout_generator -b, library: call " + LIBRARY_PATH
+        + " directly, enumerate: solve every gate class with a single run of supertile_layout_generator -e, using the workers as threads (default: batch)")
+    parser.add_argument("--cache", default=CACHE_PATH, help="file of the solver cache (default: " + CACHE_PATH + ")")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_ENTRIES, help="maximum number of cached solver results, the least recently used ones are removed first (default: " + str(DEFAULT_MAX_ENTRIES) + ")")
+    parser.add_argument("--no-cache", action="store_true", help="solve everything again and don't touch the cache")
+    parser.add_argument("--no-symmetry", action="store_true", help="solve every configuration directly instead of rotating the solution of an equivalent one")
+    parser.add_argument("-o", "--output", default=OUTPUT_PATH, help="the header to write (default: " + OUTPUT_PATH + ")")
+    parser.add_argument("--only", nargs="+", metavar="TABLE", choices=[table.name[len(TABLE_PREFIX):] for table in TABLES], help="generate only these tables (e.g. 2in2out_BYPASS)"
+        + " and keep the others as they are in the header")
+    parser.add_argument("--binary", metavar="FILE", help="also write the tables to FILE in the 3-bit-packed binary format (see supertile_table_formats.py)")
+    parser.add_argument("--packed-header", metavar="FILE", help="also write the tables to FILE as C++ header with packed uint32_t arrays and inline accessors")
+    parser.add_argument("--dedup-header", metavar="FILE", help="also write the tables to FILE as C++ header that stores every path only once and every entry as references to them")
+    parser.add_argument("--telemetry", metavar="FILE", help="record every solver job and write the records, per table counters and latency histograms to FILE as JSON")
+    parser.add_argument("--trace", metavar="FILE", help="write a timeline of the generation to FILE, which can be opened in chrome://tracing or Perfetto")
+    parser.add_argument("--cache-stats", action="store_true", help="print the hits, misses and evictions of the cache")
+    parser.add_argument("--optimize", action="store_true", help="replace the entries of the solvers by the routings with the fewest SiDBs, wire tiles and wires"
+        + " (see supertile_optimizer.py) and print the savings of every table, tables reused from the cache print the savings of the run that optimised them")
+    arguments = parser.parse_args()
+
+    if arguments.backend == "library" :
+        # The solvers don't share any state, so all threads can use the same library
+        library = SupertileLibrary()
+        createSolver = partial(LibrarySolver, library)
+    elif arguments.backend == "enumerate" :
+        createSolver = partial(EnumerationSolver, Enumeration(threads=max(1, arguments.workers)))
+    else :
+        # The solver only reports its own time with -t, which is left out when nobody looks at it
+        createSolver = partial(BatchSolver, trackTime=True) if arguments.telemetry or arguments.trace else BatchSolver
+    telemetry = Telemetry() if arguments.telemetry or arguments.trace else None
+    # Loading the SiDB designs takes a moment, so the optimizer is only imported when it is used
+    optimizer = None
+    if arguments.optimize :
+        from supertile_optimizer import TableOptimizer
+        optimizer = TableOptimizer()
+
+    # With --only, the other tables are kept as they are in the last header
+    keptTables = None
+    if arguments.only :
+        regenerated = {tableByName(name).name for name in arguments.only}
+        if not os.path.exists(arguments.output) :
+            parser.error("--only needs the other tables from " + arguments.output + ", which doesn't exist")
+        with open(arguments.output) as headerFile :
+            lastTables = parseHeaderTables(headerFile.read())
+        missing = [table.name for table in TABLES if table.name not in regenerated and table.name not in lastTables]
+        if len(missing) > 0 :
+            parser.error(arguments.output + " has no " + ", ".join(missing) + ", generate all tables first")
+        keptTables = {table.name : lastTables[table.name] for table in TABLES if table.name not in regenerated}
+
+    cache = None if arguments.no_cache else SolverCache(arguments.cache, arguments.cache_size, solverBinary=LIBRARY_PATH if arguments.backend == "library" else SOLVER_BINARY)
+
+    try :
+        with atomicOutput(arguments.output) as outputFile :
+            arrays = generateLookupTables(outputFile, TABLES, max(1, arguments.workers), createSolver, cache, [IDENTITY] if arguments.no_symmetry else None, telemetry,
+                optimizer, keptTables)
+    finally :
+        if cache is not None :
+            cache.close()
+
+    if optimizer is not None :
+        optimizer.printReports()
+
+    if arguments.binary :
+        writeBinaryTables(arguments.binary, TABLES, arrays)
+    if arguments.packed_header :
+        writePackedHeader(arguments.packed_header, TABLES, arrays)
+    if arguments.dedup_header :
+        writeDedupHeader(arguments.dedup_header, TABLES, arrays)
+
+    if telemetry is not None :
+        if arguments.telemetry :
+            telemetry.writeRecords(arguments.telemetry)
+        if arguments.trace :
+            telemetry.writeChromeTrace(arguments.trace)
+
+    if cache is not None and arguments.cache_stats :
+        statistics = cache.statistics()
+        print("Cache: " + str(statistics["hits"]) + " hits, " + str(statistics["misses"]) + " misses, " + str(statistics["evictions"]) + " evictions, "
+            + str(statistics["tableHits"]) + " of " + str(statistics["tableHits"] + statistics["tableMisses"]) + " tables reused")
 
-generate2in1out(outputFile)
-generate1in2out(outputFile)
-generate1in1outWIRE(outputFile)
-generate1in1outINVERTER(outputFile)
-generate1in0out(outputFile)
-generate0in1out(outputFile)
-generate2in2outCROSSING(outputFile)
-generate2in2outBYPASS(outputFile)
+# Start of programm:
 
-outputFile.close()
\ No newline at end of file
+if __name__ == "__main__" :
+    main()
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+import sqlite3
+
+from supertile_library import SuperTile
+
+# Persistent cache for lookup_table_generator.py: stores the SuperTile of every solver query and the finished text block of every table.
+# The keys contain a hash of the solver source, so changing supertile_layout_generator.cpp invalidates all entries made with the old version.
+# The Python modules that parse the answers of the solver or turn SuperTiles into table entries are part of it as well, the table blocks
+# are keyed by the same hash (see tableFingerprint() of lookup_table_generator.py).
+
+CACHE_PATH = ".supertile_cache.sqlite3"
+SOLVER_SOURCES = ["supertile_layout_generator.cpp", "supertile_layout_generator.h", "lookup_table_generator.py", "supertile_library.py",
+    "supertile_paths.py", "supertile_symmetry.py", "supertile_table_formats.py"]
+DEFAULT_MAX_ENTRIES = 100000
+
+def hashFiles(paths) :
+    fileHash = hashlib.sha256()
+    for path in paths :
+        fileHash.update(path.encode())
+        with open(path, "rb") as sourceFile :
+            fileHash.update(sourceFile.read())
+    return fileHash.hexdigest()
+
+class SolverCache :
+    # solverBinary is the compiled solver that answers the queries (the executable or the library), it's part of the hash as well,
+    # so the answers of a binary that wasn't rebuilt after a change of the sources aren't reused once it is
+    def __init__(self, path=CACHE_PATH, maxEntries=DEFAULT_MAX_ENTRIES, solverHash=None, solverBinary=None) :
+        self.maxEntries = maxEntries
+        if solverHash is None :
+            sources = [os.path.join(os.path.dirname(os.path.abspath(__file__)), source) for source in SOLVER_SOURCES]
+            solverHash = hashFiles(sources + ([solverBinary] if solverBinary is not None else []))
+        self.solverHash = solverHash
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.tableHits = 0
+        self.tableMisses = 0
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, superTile TEXT NOT NULL, lastUsed INTEGER NOT NULL)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS entriesLastUsed ON entries (lastUsed)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS tables (name TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, block TEXT NOT NULL)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS tableReports (name TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, report TEXT NOT NULL)")
+        # lastUsed is a counter instead of a time, so the LRU order does not depend on the clock
+        self.clock = self.connection.execute("SELECT COALESCE(MAX(lastUsed), 0) FROM entries").fetchone()[0]
+
+    def entryKey(self, gate, inputWires, outputWires) :
+        return hashlib.sha256((self.solverHash + " " + gate + " " + inputWires + " " + outputWires).encode()).hexdigest()
+
+    # returns None if the query has not been solved with this version of the solver yet
+    def get(self, gate, inputWires, outputWires) :
+        key = self.entryKey(gate, inputWires, outputWires)
+        row = self.connection.execute("SELECT superTile FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None :
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.clock += 1
+        self.connection.execute("UPDATE entries SET lastUsed = ? WHERE key = ?", (self.clock, key))
+        coreName, coreInPositions, coreOutPositions, wires = json.loads(row[0])
+        return SuperTile(coreName, tuple(coreInPositions), tuple(coreOutPositions), tuple(wires))
+
+    def put(self, gate, inputWires, outputWires, superTile) :
+        self.clock += 1
+        self.connection.execute("INSERT OR REPLACE INTO entries (key, superTile, lastUsed) VALUES (?, ?, ?)",
+            (self.entryKey(gate, inputWires, outputWires), json.dumps(list(superTile)), self.clock))
+
+    # removes the least recently used entries until there are at most maxEntries left
+    def evict(self) :
+        entries = self.connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        if entries > self.maxEntries :
+            self.connection.execute("DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY lastUsed LIMIT ?)", (entries - self.maxEntries,))
+            self.evictions += entries - self.maxEntries
+
+    # returns the block that was written for this table last time, if the fingerprint still matches
+    def getTableBlock(self, name, fingerprint) :
+        row = self.connection.execute("SELECT block FROM tables WHERE name = ? AND fingerprint = ?", (name, fingerprint)).fetchone()
+        if row is None :
+            self.tableMisses += 1
+            return None
+        self.tableHits += 1
+        return row[0]
+
+    def putTableBlock(self, name, fingerprint, block) :
+        self.connection.execute("INSERT OR REPLACE INTO tables (name, fingerprint, block) VALUES (?, ?, ?)", (name, fingerprint, block))
+
+    # The report of the optimizer (see supertile_optimizer.py) of a table block, so a reused optimised table can still print its savings.
+    # An optimised table can't be reused without it, so a missing report counts as a table miss (and the block isn't looked up then).
+    def getTableReport(self, name, fingerprint) :
+        row = self.connection.execute("SELECT report FROM tableReports WHERE name = ? AND fingerprint = ?", (name, fingerprint)).fetchone()
+        if row is None :
+            self.tableMisses += 1
+            return None
+        return row[0]
+
+    def putTableReport(self, name, fingerprint, report) :
+        self.connection.execute("INSERT OR REPLACE INTO tableReports (name, fingerprint, report) VALUES (?, ?, ?)", (name, fingerprint, report))
+
+    def statistics(self) :
+        return {"hits" : self.hits, "misses" : self.misses, "evictions" : self.evictions, "tableHits" : self.tableHits, "tableMisses" : self.tableMisses}
+
+    # the size bound is enforced here, so a run doesn't have to count the entries after every new one
+    def close(self) :
+        self.evict()
+        self.connection.commit()
+        self.connection.close()
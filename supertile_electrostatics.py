@@ -0,0 +1,216 @@
+import argparse
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+from supertile_library import WIRE_CONNECTIONS
+from supertile_optimizer import TABLE_GATES
+from supertile_paths import ENTRY_SIDES
+from supertile_sidb import COLUMN_DISTANCE, DIMER_DISTANCE, ROW_DISTANCE, SiDBGateLibrary, describeKey
+from supertile_table_formats import parseHeaderTables
+
+# Electrostatic sanity check of the SiDB dots of assembled supertiles (see SiDBGateLibrary.entryTiles()): the designs of the tiles are drawn
+# on their own, so two designs next to each other in a supertile could disturb each other. Every pair of dots interacts through the
+# screened Coulomb potential of SiQAD's ground state simulation, V(r) = e^2 / (4 pi eps0 epsr r) * exp(-r / lambdaTF), with every dot charged
+# negatively (the worst case, the charges of a design change with its inputs). A pair of dots of two different designs (on neighbouring
+# tiles, or the two wires of one tile) that aren't connected by the wires of the entry across a side of their tiles is flagged if it
+# interacts more strongly than the threshold.
+#
+# The pairs are found with a cell list: the dots are sorted into square cells as large as the cutoff, so only the dots of a cell and its
+# neighbouring cells have to be compared and the cost grows linearly with the number of dots instead of quadratically. Half of the
+# neighbouring cells suffice, as each pair only has to be found once. The dots of all entries of a table are checked at once, the
+# entry is part of the cell, so dots of different entries are never paired.
+
+# e^2 / (4 pi eps0) in eV * Angstrom
+COULOMB_CONSTANT = 14.3996
+# Relative permittivity and Thomas-Fermi screening length (in Angstrom) of SiQAD's default physical parameters
+DEFAULT_PERMITTIVITY = 5.6
+DEFAULT_SCREENING_LENGTH = 50.0
+# Pairs further apart than this (in Angstrom) are ignored, V(100) is about 3.5 meV
+DEFAULT_CUTOFF = 100.0
+# In eV
+DEFAULT_THRESHOLD = 0.05
+
+# Cells (dx, dy) that are compared with every cell: itself and half of its neighbours
+HALF_NEIGHBOUR_CELLS = ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+
+# Every flagged pair of an entry: the dots (indices into dots) and their designs as (position, key), distance in Angstrom and energy in eV
+FlaggedPair = namedtuple("FlaggedPair", ["dotA", "dotB", "tileA", "tileB", "distance", "energy"])
+# maxPotential is the largest potential of a dot caused by all other dots of the entry (in eV)
+EntryCheck = namedtuple("EntryCheck", ["slot", "dotCount", "maxPotential", "flagged"])
+
+# Physical locations (x, y) in Angstrom of (n, m, l) dots, y grows to the south
+def dotLocations(dots) :
+    dots = np.asarray(dots, dtype=np.float64)
+    return np.stack((dots[:, 0] * COLUMN_DISTANCE, dots[:, 1] * ROW_DISTANCE + dots[:, 2] * DIMER_DISTANCE), axis=1)
+
+# Every pair (i < j) of locations that are less than cutoff apart and belong to the same group, as two index arrays
+def neighbourPairs(locations, groups, cutoff) :
+    if len(locations) < 2 :
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    cells = np.floor((locations - locations.min(axis=0)) / cutoff).astype(np.int64)
+    # One key per cell, with a border of one empty cell in every direction, so the neighbours of a cell never get the key of another cell
+    width = int(cells[:, 0].max()) + 3
+    height = int(cells[:, 1].max()) + 3
+    keys = (groups.astype(np.int64) * height + cells[:, 1] + 1) * width + cells[:, 0] + 1
+    order = np.argsort(keys, kind="stable")
+    sortedKeys = keys[order]
+    cellKeys, cellStarts, cellCounts = np.unique(sortedKeys, return_index=True, return_counts=True)
+
+    firsts = []
+    seconds = []
+    for dx, dy in HALF_NEIGHBOUR_CELLS :
+        neighbourKeys = sortedKeys + dy * width + dx
+        cellIndices = np.searchsorted(cellKeys, neighbourKeys)
+        cellIndices = np.minimum(cellIndices, len(cellKeys) - 1)
+        found = cellKeys[cellIndices] == neighbourKeys
+        starts = np.where(found, cellStarts[cellIndices], 0)
+        counts = np.where(found, cellCounts[cellIndices], 0)
+        if dx == 0 and dy == 0 :
+            # Within a cell, only the dots after the dot itself (in the sorted order)
+            starts, counts = np.arange(len(sortedKeys)) + 1, starts + counts - np.arange(len(sortedKeys)) - 1
+        # The pairs of every dot with every dot of the cell: repeat the dot for each of them, then step through the cell
+        first = np.repeat(np.arange(len(sortedKeys)), counts)
+        offsets = np.arange(len(first)) - np.repeat(np.cumsum(counts) - counts, counts)
+        firsts.append(first)
+        seconds.append(np.repeat(starts, counts) + offsets)
+
+    first = order[np.concatenate(firsts)]
+    second = order[np.concatenate(seconds)]
+    distances = np.linalg.norm(locations[first] - locations[second], axis=1)
+    inside = distances < cutoff
+    first, second = first[inside], second[inside]
+    swap = first > second
+    return np.where(swap, second, first), np.where(swap, first, second)
+
+def screenedCoulomb(distances, permittivity=DEFAULT_PERMITTIVITY, screeningLength=DEFAULT_SCREENING_LENGTH) :
+    with np.errstate(divide="ignore") :
+        return COULOMB_CONSTANT / (permittivity * distances) * np.exp(-distances / screeningLength)
+
+# The sides of the tile that a design uses
+def keySides(key) :
+    if isinstance(key, int) :
+        return set(WIRE_CONNECTIONS[key.bit_length() - 1])
+    _, inputSides, outputSides = key
+    return set(inputSides) | set(outputSides)
+
+# Whether the designs (position, key) a and b are connected by a wire across the side between their tiles
+def connected(a, b) :
+    side = int(ENTRY_SIDES[a[0], b[0]])
+    if side < 0 :
+        return False
+    return side in keySides(a[1]) and (side + 3) % 6 in keySides(b[1])
+
+class ElectrostaticCheck :
+    def __init__(self, library=None, permittivity=DEFAULT_PERMITTIVITY, screeningLength=DEFAULT_SCREENING_LENGTH, cutoff=DEFAULT_CUTOFF,
+            threshold=DEFAULT_THRESHOLD) :
+        self.library = library if library is not None else SiDBGateLibrary()
+        self.permittivity = permittivity
+        self.screeningLength = screeningLength
+        self.cutoff = cutoff
+        self.threshold = threshold
+
+    # Checks all entries (slot, entry) of a table at once and returns an EntryCheck for every entry that has SiDB designs
+    # and the entries that don't as (slot, reason)
+    def checkTable(self, name, entries, gateType=None) :
+        if gateType is None and name in TABLE_GATES :
+            gateType = TABLE_GATES[name].gateType
+        parts = []
+        entryDots = []
+        groups = []
+        designs = []
+        slots = []
+        skipped = []
+        for slot, entry in entries :
+            try :
+                entryTiles = self.library.entryTiles(name, entry, gateType)
+                entryParts = [self.library.tileDots(key, position) for position, key in entryTiles]
+            except ValueError as error :
+                skipped.append((slot, str(error)))
+                continue
+            for part, dots in zip(range(len(designs), len(designs) + len(entryTiles)), entryParts) :
+                parts.append(np.full(len(dots), part, dtype=np.int64))
+                groups.append(np.full(len(dots), len(slots), dtype=np.int64))
+            entryDots.append(np.concatenate(entryParts))
+            designs += entryTiles
+            slots.append(slot)
+        if len(slots) == 0 :
+            return [], skipped
+
+        dots = np.concatenate(entryDots)
+        parts = np.concatenate(parts)
+        groups = np.concatenate(groups)
+        locations = dotLocations(dots)
+        first, second = neighbourPairs(locations, groups, self.cutoff)
+        distances = np.linalg.norm(locations[first] - locations[second], axis=1)
+        energies = screenedCoulomb(distances, self.permittivity, self.screeningLength)
+        potentials = np.bincount(first, energies, len(dots)) + np.bincount(second, energies, len(dots))
+
+        # Only pairs of dots of two designs that aren't connected with each other
+        candidates = np.flatnonzero((energies > self.threshold) & (parts[first] != parts[second]))
+        flagged = [[] for _ in slots]
+        for pair in candidates.tolist() :
+            a, b = designs[parts[first[pair]]], designs[parts[second[pair]]]
+            if connected(a, b) or connected(b, a) :
+                continue
+            flagged[groups[first[pair]]].append(FlaggedPair(int(first[pair]), int(second[pair]), a, b, float(distances[pair]), float(energies[pair])))
+
+        starts = np.searchsorted(groups, np.arange(len(slots) + 1))
+        checks = []
+        for group, slot in enumerate(slots) :
+            start, stop = starts[group], starts[group + 1]
+            # The dots of a group are numbered from the first dot of its entry
+            pairs = [pair._replace(dotA=pair.dotA - start, dotB=pair.dotB - start) for pair in flagged[group]]
+            checks.append(EntryCheck(slot, int(stop - start), float(potentials[start:stop].max()), pairs))
+        return checks, skipped
+
+def describeTile(tile) :
+    return "tile " + str(tile[0]) + " (" + describeKey(tile[1]) + ")"
+
+def main() :
+    parser = argparse.ArgumentParser(description="Places the SiDB designs of every entry of the lookup tables and flags dots of neighbouring designs that interact too strongly.")
+    parser.add_argument("--header", default="supertile_lookup_tables.hpp", help="the lookup tables to check (default: supertile_lookup_tables.hpp)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="largest interaction energy in eV of two dots of designs that aren't connected (default: " + str(DEFAULT_THRESHOLD) + ")")
+    parser.add_argument("--cutoff", type=float, default=DEFAULT_CUTOFF, help="distance in Angstrom beyond which dots are ignored (default: " + str(DEFAULT_CUTOFF) + ")")
+    parser.add_argument("--permittivity", type=float, default=DEFAULT_PERMITTIVITY, help="relative permittivity (default: " + str(DEFAULT_PERMITTIVITY) + ")")
+    parser.add_argument("--screening-length", type=float, default=DEFAULT_SCREENING_LENGTH, help="Thomas-Fermi screening length in Angstrom (default: " + str(DEFAULT_SCREENING_LENGTH) + ")")
+    parser.add_argument("--verbose", action="store_true", help="print every flagged pair and every entry that was skipped")
+    parser.add_argument("--allow-skipped", action="store_true", help="don't fail if entries can't be checked because SiDB designs are missing "
+        + "(by default the check fails, as these entries weren't checked at all)")
+    arguments = parser.parse_args()
+
+    with open(arguments.header) as headerFile :
+        tables = parseHeaderTables(headerFile.read())
+    check = ElectrostaticCheck(None, arguments.permittivity, arguments.screening_length, arguments.cutoff, arguments.threshold)
+    flaggedEntries = 0
+    skippedEntries = 0
+    for name, values in tables.items() :
+        checks, skipped = check.checkTable(name, list(enumerate(values.tolist())))
+        flagged = [entryCheck for entryCheck in checks if len(entryCheck.flagged) > 0]
+        flaggedEntries += len(flagged)
+        dotCount = sum(entryCheck.dotCount for entryCheck in checks)
+        maxPotential = max((entryCheck.maxPotential for entryCheck in checks), default=0)
+        skippedEntries += len(skipped)
+        print(name + ": " + str(len(checks)) + " entries checked (" + str(dotCount) + " dots, largest potential " + format(maxPotential, ".3f") + " eV), "
+            + str(len(flagged)) + " flagged")
+        if len(checks) == 0 :
+            print("Warning: no entry of " + name + " was checked, " + str(len(skipped)) + " entries can't be expanded into SiDB designs", file=sys.stderr)
+        elif len(skipped) > 0 :
+            print("Warning: " + str(len(skipped)) + " entries of " + name + " were skipped, they can't be expanded into SiDB designs (--verbose prints why)", file=sys.stderr)
+        if arguments.verbose :
+            for entryCheck in flagged :
+                for pair in entryCheck.flagged :
+                    print("  entry " + str(entryCheck.slot) + ": " + describeTile(pair.tileA) + " and " + describeTile(pair.tileB) + ", "
+                        + format(pair.distance, ".2f") + " A, " + format(pair.energy, ".3f") + " eV")
+            for slot, reason in skipped :
+                print("  entry " + str(slot) + " skipped: " + reason)
+    if flaggedEntries > 0 :
+        sys.exit(1)
+    # Entries that weren't checked can't pass the check
+    if skippedEntries > 0 and not arguments.allow_skipped :
+        print("Error: " + str(skippedEntries) + " entries weren't checked (see the warnings above), use --allow-skipped to accept this", file=sys.stderr)
+        sys.exit(2)
+
+if __name__ == "__main__" :
+    main()
@@ -0,0 +1,408 @@
+import argparse
+import mmap
+import os
+import tempfile
+import xml.etree.ElementTree as ElementTree
+from collections import deque, namedtuple
+from multiprocessing import Pool
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+from lookup_table_generator import checkIfCrossing
+from supertile_lookup import HEADER_PATH, SLOTS, SupertileLookup
+from supertile_paths import CORE
+from supertile_table_formats import HEX_DIRECTIONS
+
+# Turns a hexagonal gate-level layout (fiction's .fgl format) into the layout of its supertiles, using the lookup tables instead of the solver.
+# Every tile becomes a supertile of seven tiles: the core holds the gate of the tile, the paths of its table entry become wires (BUF) around it.
+# Tiles with two wires (z = 0 and z = 1, crossings or two wires that don't cross) become one Crossing or Bypass supertile.
+#
+# The layout is read once with iterparse, so it is never in memory as a whole, and expanded in two passes:
+#   1. Every tile gets its gate type and the directions of its incoming and outgoing signals in a grid, and every gate a record in a file in the order
+#      of the layout. Both are memory-mapped files in a temporary directory, they are written a chunk at a time.
+#   2. The gates are expanded in chunks of records by worker processes, the chunks are written in the order of the layout.
+#      The slot of a tile is the perfect hash of its directions (see SLOTS in supertile_lookup.py), every slot has a template with the tiles of its
+#      supertile that is built once from the tables, so expanding a gate is a constant amount of work.
+# Only the chunks that are waiting for a worker or for being written are in memory, so the memory use depends on the chunk size and not on the size of the layout.
+#
+# The supertiles keep the order of the signals, a gate is written after the gates it gets its signals from if the original layout does that as well (fiction needs this to read it).
+# The clock zones of the supertiles are not derived, the expanded layout uses open clocking.
+
+DEFAULT_CHUNK_SIZE = 4096
+
+X = HEX_DIRECTIONS["X"]
+
+# The tile grid, one entry per tile and layer (z = 0 and z = 1)
+TYPE = 0 # index in the list of gate types + 1, 0 for an empty tile
+INCOMING = 1 # bit d is set if a signal comes from direction d
+OUTGOING = 2 # bit d is set if a signal goes to direction d
+TILE_FIELDS = 3
+
+# Axial coordinates (q, r) of the six neighbours of a pointy-top hexagon, in the order of 'enum hex_direction' (NE, E, SE, SW, W, NW), y grows to the south
+AXIAL_DIRECTIONS = ((1, -1), (1, 0), (0, 1), (-1, 1), (-1, 0), (0, -1))
+
+# Axial offset of a neighbour (+ 1) -> its direction, -1 if it is no neighbour
+NEIGHBOUR_DIRECTIONS = np.full((3, 3), -1, dtype=np.int8)
+for direction, (q, r) in enumerate(AXIAL_DIRECTIONS) :
+    NEIGHBOUR_DIRECTIONS[q + 1, r + 1] = direction
+
+# Which rows are shifted to the right
+TOPOLOGY_PARITIES = {"odd_row_hex" : 1, "even_row_hex" : 0}
+
+# Directions of every bit mask
+MASK_DIRECTIONS = [tuple(direction for direction in range(6) if mask & (1 << direction)) for mask in range(64)]
+
+LayoutHeader = namedtuple("LayoutHeader", ["name", "topology", "width", "height"])
+FglGate = namedtuple("FglGate", ["type", "name", "x", "y", "z", "incoming"])
+
+# position of the tile in the supertile (0 to 5 or CORE), layer (z), role ("wire", "core" or "crossing") and the tiles it gets its signals from,
+# which are ("tile", position, layer) within the supertile or ("outside", direction) for the neighbouring supertile
+TemplateNode = namedtuple("TemplateNode", ["position", "layer", "role", "incoming"])
+# chains are lists of TemplateNodes in an order in which they can be written, exitLayers the layer of the tile through which the supertile leaves in a direction
+SupertileTemplate = namedtuple("SupertileTemplate", ["chains", "exitLayers"])
+
+def toAxial(x, y, parity) :
+    if parity :
+        return x - (y - (y & 1)) // 2, y
+    return x - (y + (y & 1)) // 2, y
+
+def toOffset(q, r, parity) :
+    if parity :
+        return q + (r - (r & 1)) // 2, r
+    return q + (r + (r & 1)) // 2, r
+
+# The supertiles are placed so that the tile at position p of a supertile and the tile at position (p + 3) % 6 of its neighbour in direction p
+# touch through side (p + 1) % 6 (see ENTRY_SIDES in supertile_paths.py), so the core of the neighbour is 2 * direction p + direction (p + 1) away
+def superCenter(x, y, parity) :
+    q, r = toAxial(x, y, parity)
+    return 2 * q - r, q + 3 * r
+
+def superTileCell(center, position) :
+    if position == CORE :
+        return center
+    return center[0] + AXIAL_DIRECTIONS[position][0], center[1] + AXIAL_DIRECTIONS[position][1]
+
+def neighbour(x, y, direction, parity) :
+    q, r = toAxial(x, y, parity)
+    return toOffset(q + AXIAL_DIRECTIONS[direction][0], r + AXIAL_DIRECTIONS[direction][1], parity)
+
+def coordinate(element, tag) :
+    return int(element.findtext(tag))
+
+# Yields the LayoutHeader and then every gate of the .fgl file, the elements are removed as soon as they have been read
+def readFgl(path) :
+    gatesElement = None
+    for event, element in ElementTree.iterparse(path, events=("start", "end")) :
+        if event == "start" :
+            if element.tag == "gates" :
+                gatesElement = element
+            continue
+        if element.tag == "layout" :
+            yield LayoutHeader(element.findtext("name", ""), element.findtext("topology"), coordinate(element, "size/x") + 1, coordinate(element, "size/y") + 1)
+        elif element.tag == "gate" :
+            location = element.find("loc")
+            incoming = tuple((coordinate(signal, "x"), coordinate(signal, "y"), coordinate(signal, "z")) for signal in element.iterfind("incoming/signal"))
+            yield FglGate(element.findtext("type"), element.findtext("name"), coordinate(location, "x"), coordinate(location, "y"), coordinate(location, "z"), incoming)
+            if gatesElement is not None :
+                gatesElement.clear()
+
+# Splits a table entry into its paths, which are separated by X (the entries are padded with X at the end)
+def entryPaths(entry) :
+    paths = [[]]
+    for position in entry :
+        if position == X :
+            paths.append([])
+        else :
+            paths[-1].append(position)
+    return [path for path in paths if len(path) > 0]
+
+def buildTemplate(name, entry) :
+    paths = entryPaths(entry)
+    usedLayers = {}
+    exitLayers = {}
+
+    def node(position, role, incoming) :
+        layer = usedLayers.get(position, 0)
+        usedLayers[position] = layer + 1
+        return TemplateNode(position, layer, role, incoming)
+
+    def reference(templateNode) :
+        return ("tile", templateNode.position, templateNode.layer)
+
+    # A path of the entry, the first tile gets its signal from first (or from the neighbouring supertile), leavesSupertile if the last tile is connected to a neighbour
+    def chain(path, first=None, coreRole="core", leavesSupertile=False) :
+        nodes = []
+        incoming = (("outside", path[0]),) if first is None else (first,)
+        for position in path :
+            nodes.append(node(position, coreRole if position == CORE else "wire", incoming))
+            incoming = (reference(nodes[-1]),)
+        if leavesSupertile :
+            exitLayers[nodes[-1].position] = nodes[-1].layer
+        return nodes
+
+    match name :
+        case "lookup_table_2in1out" :
+            input1 = chain(paths[0])
+            input2 = chain(paths[1])
+            core = node(CORE, "core", (reference(input1[-1]), reference(input2[-1])))
+            chains = [input1 + input2 + [core] + chain(paths[2], reference(core), leavesSupertile=True)]
+        case "lookup_table_1in2out" :
+            inputPath = chain(paths[0])
+            core = node(CORE, "core", (reference(inputPath[-1]),))
+            chains = [inputPath + [core] + chain(paths[1], reference(core), leavesSupertile=True) + chain(paths[2], reference(core), leavesSupertile=True)]
+        case "lookup_table_1in1out_INVERTER" :
+            inputPath = chain(paths[0])
+            core = node(CORE, "core", (reference(inputPath[-1]),))
+            chains = [inputPath + [core] + chain(paths[1], reference(core), leavesSupertile=True)]
+        case "lookup_table_1in1out_WIRE" :
+            chains = [chain(paths[0], leavesSupertile=True)]
+        case "lookup_table_1in0out" :
+            chains = [chain(paths[0])]
+        case "lookup_table_0in1out" :
+            core = node(CORE, "core", ())
+            chains = [[core] + chain(paths[0], reference(core), leavesSupertile=True)]
+        case "lookup_table_2in2out_CROSSING" | "lookup_table_2in2out_BYPASS" :
+            # One chain per wire, in the order of the arguments (the wire on z = 0 first)
+            chains = [chain(path, coreRole="crossing", leavesSupertile=True) for path in paths]
+        case _ :
+            raise ValueError("There is no template for the table " + name)
+    return SupertileTemplate(chains, exitLayers)
+
+# table name -> template of every slot
+def buildTemplates(lookup) :
+    return {name : [buildTemplate(name, entry) for entry in table.tolist()] for name, table in lookup.tables.items()}
+
+# Returns the table and its arguments (in the order of TABLE_ARGUMENTS in supertile_lookup.py) for the tile at x, y
+def classifyTile(tiles, typeNames, x, y) :
+    tile = tiles[y, x].tolist()
+    layers = [z for z in (0, 1) if tile[z][TYPE] != 0]
+    if len(layers) == 0 :
+        raise ValueError("There is no gate on tile (" + str(x) + ", " + str(y) + ")")
+    if len(layers) == 2 :
+        wires = [(MASK_DIRECTIONS[tile[z][INCOMING]], MASK_DIRECTIONS[tile[z][OUTGOING]]) for z in layers]
+        if any(len(inputs) != 1 or len(outputs) != 1 for inputs, outputs in wires) :
+            raise ValueError("Tile (" + str(x) + ", " + str(y) + ") has two layers, but they are not two wires")
+        (in1,), (out1,) = wires[0]
+        (in2,), (out2,) = wires[1]
+        name = "lookup_table_2in2out_CROSSING" if checkIfCrossing(in1, in2, out1, out2) else "lookup_table_2in2out_BYPASS"
+        return name, (in1, out1, in2, out2)
+
+    z = layers[0]
+    gateType = typeNames[tile[z][TYPE] - 1]
+    inputs = MASK_DIRECTIONS[tile[z][INCOMING]]
+    outputs = MASK_DIRECTIONS[tile[z][OUTGOING]]
+    match len(inputs), len(outputs) :
+        case 2, 1 :
+            return "lookup_table_2in1out", (outputs[0], inputs[0], inputs[1])
+        case 1, 2 :
+            return "lookup_table_1in2out", (inputs[0], outputs[0], outputs[1])
+        case 1, 1 :
+            return ("lookup_table_1in1out_INVERTER" if gateType == "INV" else "lookup_table_1in1out_WIRE"), (inputs[0], outputs[0])
+        case 1, 0 :
+            return "lookup_table_1in0out", (inputs[0],)
+        case 0, 1 :
+            return "lookup_table_0in1out", (outputs[0],)
+        case _ :
+            raise ValueError("There is no supertile for the " + gateType + " on tile (" + str(x) + ", " + str(y) + ") with "
+                + str(len(inputs)) + " inputs and " + str(len(outputs)) + " outputs")
+
+def templateOfTile(state, x, y) :
+    name, arguments = classifyTile(state.tiles, state.typeNames, x, y)
+    return state.templates[name][SLOTS[name][arguments]]
+
+# Gates of the layout in the order of the file, written in pass 1 so pass 2 doesn't have to parse the layout again.
+# The names (only PIs and POs have one) are in a separate file, nameLength is -1 for gates without name.
+GATE_RECORD = np.dtype([("x", np.int32), ("y", np.int32), ("z", np.uint8), ("type", np.uint8), ("nameOffset", np.int64), ("nameLength", np.int32)])
+
+# Pass 1: parses the layout once and writes the tile grid (see TYPE, INCOMING and OUTGOING) and the gate records into directory, a chunk at a time.
+# Returns the header, the parity of its topology, the number of gates, the gate types and the bounds of the expanded layout (min x, min y, max x, max y).
+def scanLayout(path, directory, chunkSize) :
+    gates = readFgl(path)
+    header = next(gates)
+    parity = TOPOLOGY_PARITIES.get(header.topology)
+    if parity is None :
+        raise ValueError("Only the topologies " + ", ".join(TOPOLOGY_PARITIES) + " can be expanded, not " + str(header.topology))
+    tiles = np.lib.format.open_memmap(os.path.join(directory, "tiles.npy"), mode="w+", dtype=np.uint8, shape=(header.height, header.width, 2, TILE_FIELDS))
+    typeCodes = {}
+    bounds = None
+    gateCount = 0
+    nameOffset = 0
+    with open(os.path.join(directory, "gates.bin"), "wb") as recordFile, open(os.path.join(directory, "names.bin"), "wb") as nameFile :
+        for chunk in chunksOf(gates, chunkSize) :
+            records = np.zeros(len(chunk), dtype=GATE_RECORD)
+            signals = []
+            for index, gate in enumerate(chunk) :
+                if gate.type not in typeCodes :
+                    if len(typeCodes) == 255 :
+                        raise ValueError("The layout has more than 255 different gate types")
+                    typeCodes[gate.type] = len(typeCodes) + 1
+                name = -1
+                if gate.name is not None :
+                    encodedName = gate.name.encode()
+                    nameFile.write(encodedName)
+                    name = len(encodedName)
+                records[index] = (gate.x, gate.y, gate.z, typeCodes[gate.type], nameOffset, name)
+                nameOffset += max(name, 0)
+                signals += [(gate.x, gate.y, gate.z, signalX, signalY, signalZ) for signalX, signalY, signalZ in gate.incoming]
+            records.tofile(recordFile)
+            gateCount += len(chunk)
+
+            tiles[records["y"], records["x"], records["z"], TYPE] = records["type"]
+            if len(signals) > 0 :
+                gateX, gateY, gateZ, signalX, signalY, signalZ = np.array(signals, dtype=np.int64).T
+                gateQ, gateR = toAxial(gateX, gateY, parity)
+                signalQ, signalR = toAxial(signalX, signalY, parity)
+                offsetQ = signalQ - gateQ
+                offsetR = signalR - gateR
+                valid = (np.abs(offsetQ) <= 1) & (np.abs(offsetR) <= 1)
+                directions = np.where(valid, NEIGHBOUR_DIRECTIONS[np.clip(offsetQ + 1, 0, 2), np.clip(offsetR + 1, 0, 2)], -1)
+                if (directions == -1).any() :
+                    first = np.flatnonzero(directions == -1)[0]
+                    raise ValueError("The tiles (" + str(gateX[first]) + ", " + str(gateY[first]) + ") and (" + str(signalX[first]) + ", " + str(signalY[first]) + ") are not neighbours")
+                np.bitwise_or.at(tiles[..., INCOMING], (gateY, gateX, gateZ), (1 << directions).astype(np.uint8))
+                np.bitwise_or.at(tiles[..., OUTGOING], (signalY, signalX, signalZ), (1 << ((directions + 3) % 6)).astype(np.uint8))
+
+            center = superCenter(records["x"].astype(np.int64), records["y"].astype(np.int64), parity)
+            for position in (*range(6), CORE) :
+                cellX, cellY = toOffset(*superTileCell(center, position), parity)
+                chunkBounds = [cellX.min(), cellY.min(), cellX.max(), cellY.max()]
+                if bounds is None :
+                    bounds = chunkBounds
+                else :
+                    bounds = [min(bounds[0], chunkBounds[0]), min(bounds[1], chunkBounds[1]), max(bounds[2], chunkBounds[2]), max(bounds[3], chunkBounds[3])]
+    tiles.flush()
+    return header, parity, gateCount, sorted(typeCodes, key=typeCodes.get), [int(bound) for bound in bounds] if bounds is not None else [0, 0, 0, 0]
+
+ExpansionState = namedtuple("ExpansionState", ["tiles", "records", "names", "typeNames", "parity", "templates", "shift", "width"])
+
+# Set in every worker process by initializeWorker()
+workerState = None
+
+def initializeWorker(directory, gateCount, typeNames, parity, templates, shift, width) :
+    global workerState
+    tiles = np.load(os.path.join(directory, "tiles.npy"), mmap_mode="r")
+    records = np.memmap(os.path.join(directory, "gates.bin"), dtype=GATE_RECORD, mode="r", shape=(gateCount,)) if gateCount > 0 else np.zeros(0, dtype=GATE_RECORD)
+    with open(os.path.join(directory, "names.bin"), "rb") as nameFile :
+        names = mmap.mmap(nameFile.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(nameFile.name) > 0 else b""
+    workerState = ExpansionState(tiles, records, names, typeNames, parity, templates, shift, width)
+
+def gateElement(identifier, gateType, name, x, y, z, signals) :
+    parts = ['    <gate>\n      <id>', str(identifier), '</id>\n      <type>', escape(gateType), '</type>\n']
+    if name is not None :
+        parts += ['      <name>', escape(name), '</name>\n']
+    parts += ['      <loc>\n        <x>', str(x), '</x>\n        <y>', str(y), '</y>\n        <z>', str(z), '</z>\n      </loc>\n']
+    if len(signals) > 0 :
+        parts.append('      <incoming>\n')
+        for signalX, signalY, signalZ in signals :
+            parts += ['        <signal>\n          <x>', str(signalX), '</x>\n          <y>', str(signalY), '</y>\n          <z>', str(signalZ), '</z>\n        </signal>\n']
+        parts.append('      </incoming>\n')
+    parts.append('    </gate>\n')
+    return "".join(parts)
+
+# The gates of the supertile of one gate of the original layout (only its own wire for tiles with two wires)
+def expandGate(state, gateX, gateY, gateZ, gateType, gateName) :
+    template = templateOfTile(state, gateX, gateY)
+    if len(template.chains) == 1 :
+        chains = template.chains
+    else :
+        chains = [template.chains[gateZ]]
+    center = superCenter(gateX, gateY, state.parity)
+
+    def location(axial, layer) :
+        cellX, cellY = toOffset(*axial, state.parity)
+        return cellX + state.shift[0], cellY + state.shift[1], layer
+
+    parts = []
+    for nodes in chains :
+        for templateNode in nodes :
+            signals = []
+            for source in templateNode.incoming :
+                if source[0] == "tile" :
+                    signals.append(location(superTileCell(center, source[1]), source[2]))
+                else :
+                    direction = source[1]
+                    neighbourX, neighbourY = neighbour(gateX, gateY, direction, state.parity)
+                    exitLayer = templateOfTile(state, neighbourX, neighbourY).exitLayers.get((direction + 3) % 6)
+                    if exitLayer is None :
+                        raise ValueError("The supertile of tile (" + str(neighbourX) + ", " + str(neighbourY) + ") doesn't leave towards tile (" + str(gateX) + ", " + str(gateY) + ")")
+                    cell = superTileCell(center, direction)
+                    signals.append(location(superTileCell(cell, (direction + 1) % 6), exitLayer))
+            x, y, z = location(superTileCell(center, templateNode.position), templateNode.layer)
+            if templateNode.role == "core" :
+                gateElementType, name = gateType, gateName
+            else :
+                gateElementType, name = "BUF", None
+            parts.append(gateElement((y * state.width + x) * 2 + z, gateElementType, name, x, y, z, signals))
+    return "".join(parts)
+
+# Expands the gates start to stop of the records
+def expandRange(start, stop) :
+    state = workerState
+    parts = []
+    for x, y, z, typeCode, nameOffset, nameLength in state.records[start:stop].tolist() :
+        name = state.names[nameOffset:nameOffset + nameLength].decode() if nameLength >= 0 else None
+        parts.append(expandGate(state, x, y, z, state.typeNames[typeCode - 1], name))
+    return "".join(parts)
+
+def chunksOf(gates, chunkSize) :
+    chunk = []
+    for gate in gates :
+        chunk.append(gate)
+        if len(chunk) == chunkSize :
+            yield chunk
+            chunk = []
+    if len(chunk) > 0 :
+        yield chunk
+
+def writeHeader(outputFile, header, width, height) :
+    outputFile.write('<?xml version="1.0" encoding="UTF-8"?>\n<fgl>\n  <layout>\n    <name>' + escape(header.name + "_supertiles") + '</name>\n'
+        '    <topology>' + header.topology + '</topology>\n    <size>\n      <x>' + str(width - 1) + '</x>\n      <y>' + str(height - 1) + '</y>\n      <z>1</z>\n    </size>\n'
+        '    <clocking>\n      <name>OPEN</name>\n    </clocking>\n  </layout>\n  <gates>\n')
+
+# Pass 2: expands the gates in chunks with up to workers processes (1 expands them in this process) and writes the chunks in the order of the file.
+# At most two chunks per worker are on their way at any time.
+def expandLayout(inputPath, outputPath, lookup, workers=1, chunkSize=DEFAULT_CHUNK_SIZE) :
+    templates = buildTemplates(lookup)
+    with tempfile.TemporaryDirectory() as temporaryDirectory :
+        header, parity, gateCount, typeNames, bounds = scanLayout(inputPath, temporaryDirectory, chunkSize)
+        # The rows may only be shifted by an even number, otherwise the shifted rows would change
+        shift = (-bounds[0], -bounds[1] + (bounds[1] & 1))
+        width = bounds[2] + shift[0] + 1
+        height = bounds[3] + shift[1] + 1
+        initializeArguments = (temporaryDirectory, gateCount, typeNames, parity, templates, shift, width)
+        ranges = [(start, min(start + chunkSize, gateCount)) for start in range(0, gateCount, chunkSize)]
+
+        with open(outputPath, "w") as outputFile :
+            writeHeader(outputFile, header, width, height)
+            if workers <= 1 :
+                initializeWorker(*initializeArguments)
+                for start, stop in ranges :
+                    outputFile.write(expandRange(start, stop))
+            else :
+                with Pool(workers, initializeWorker, initializeArguments) as pool :
+                    pending = deque()
+                    for start, stop in ranges :
+                        pending.append(pool.apply_async(expandRange, (start, stop)))
+                        if len(pending) >= 2 * workers :
+                            outputFile.write(pending.popleft().get())
+                    while len(pending) > 0 :
+                        outputFile.write(pending.popleft().get())
+            outputFile.write('  </gates>\n</fgl>\n')
+    return width, height
+
+def main() :
+    parser = argparse.ArgumentParser(description="Expands a hexagonal gate-level layout (.fgl) into the layout of its supertiles with the lookup tables.")
+    parser.add_argument("layout", help="gate-level layout in fiction's .fgl format (odd_row_hex or even_row_hex)")
+    parser.add_argument("output", help="file for the expanded layout (.fgl)")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(), help="number of processes that expand the chunks (default: number of cores)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="gates per chunk (default: " + str(DEFAULT_CHUNK_SIZE) + ")")
+    parser.add_argument("--tables", default=HEADER_PATH, help="the lookup tables, a header of lookup_table_generator.py or a file of its --binary option (default: " + HEADER_PATH + ")")
+    arguments = parser.parse_args()
+
+    lookup = SupertileLookup.fromBinary(arguments.tables) if not arguments.tables.endswith((".hpp", ".h")) else SupertileLookup.fromHeader(arguments.tables)
+    width, height = expandLayout(arguments.layout, arguments.output, lookup, max(1, arguments.workers), max(1, arguments.chunk_size))
+    print("Wrote " + arguments.output + " (" + str(width) + " x " + str(height) + " tiles)")
+
+if __name__ == "__main__" :
+    main()
@@ -0,0 +1,152 @@
+import argparse
+import itertools
+import math
+
+from supertile_lookup import TABLE_ARGUMENTS
+
+# Synthesis and verification of perfect hash functions for the slots of the lookup tables.
+# A gate class is described by its valid configurations (tuples of positions, see TABLE_ARGUMENTS in supertile_lookup.py).
+# synthesizeHash() builds a hash-and-displace function for them: the configuration is encoded as a number (base 6), mixed once to find
+# its bucket and mixed again with the displacement of that bucket to find its slot. The displacements are searched bucket by bucket,
+# largest bucket first, until all configurations land on different slots. With as many slots as configurations the hash is minimal.
+
+# Pairs of arguments whose order doesn't matter, both orders have to end up in the same slot
+UNORDERED_ARGUMENTS = {
+    "lookup_table_2in1out" : ((1, 2),),
+    "lookup_table_1in2out" : ((1, 2),),
+}
+
+MIX_MULTIPLIER = 0x9E3779B1
+DEFAULT_BUCKET_SIZE = 4
+MAX_DISPLACEMENT = 1 << 16
+
+def mix(key, seed) :
+    return (((key + 1) * (2 * seed + 1) * MIX_MULTIPLIER) & 0xFFFFFFFF) >> 16
+
+def normalizeArguments(arguments, unorderedArguments) :
+    arguments = list(arguments)
+    for first, second in unorderedArguments :
+        if arguments[second] < arguments[first] :
+            arguments[first], arguments[second] = arguments[second], arguments[first]
+    return tuple(arguments)
+
+def encodeArguments(arguments) :
+    key = 0
+    for position in reversed(arguments) :
+        key = 6 * key + position
+    return key
+
+# The different configurations of a table, every configuration only once even if the order of some arguments doesn't matter
+def tableConfigurations(name) :
+    argumentNames, isValid, _ = TABLE_ARGUMENTS[name]
+    unorderedArguments = UNORDERED_ARGUMENTS.get(name, ())
+    return sorted({normalizeArguments(arguments, unorderedArguments) for arguments in itertools.product(range(6), repeat=len(argumentNames)) if isValid(*arguments)})
+
+class PerfectHash :
+    def __init__(self, argumentCount, unorderedArguments, displacements, slots) :
+        self.argumentCount = argumentCount
+        self.unorderedArguments = unorderedArguments
+        self.displacements = displacements
+        self.slots = slots
+
+    def __call__(self, *arguments) :
+        key = encodeArguments(normalizeArguments(arguments, self.unorderedArguments))
+        return mix(key, self.displacements[mix(key, 0) % len(self.displacements)]) % self.slots
+
+# slack is the number of slots on top of the number of configurations, 0 gives a minimal perfect hash.
+# Raises ValueError if no displacement works for some bucket, a smaller bucketSize or more slack usually helps then.
+def synthesizeHash(configurations, unorderedArguments=(), slack=0, bucketSize=DEFAULT_BUCKET_SIZE) :
+    keys = [encodeArguments(configuration) for configuration in configurations]
+    if len(set(keys)) != len(keys) :
+        raise ValueError("The configurations contain duplicates")
+    slots = len(keys) + slack
+    bucketCount = max(1, math.ceil(len(keys) / bucketSize))
+    buckets = [[] for _ in range(bucketCount)]
+    for key in keys :
+        buckets[mix(key, 0) % bucketCount].append(key)
+
+    displacements = [0] * bucketCount
+    occupied = [False] * slots
+    for bucket in sorted(range(bucketCount), key=lambda bucket : -len(buckets[bucket])) :
+        if len(buckets[bucket]) == 0 :
+            continue
+        for displacement in range(1, MAX_DISPLACEMENT) :
+            positions = [mix(key, displacement) % slots for key in buckets[bucket]]
+            if len(set(positions)) == len(positions) and not any(occupied[position] for position in positions) :
+                break
+        else :
+            raise ValueError("No displacement found for a bucket of " + str(len(buckets[bucket])) + " configurations")
+        displacements[bucket] = displacement
+        for position in positions :
+            occupied[position] = True
+    return PerfectHash(len(configurations[0]), tuple(unorderedArguments), displacements, slots)
+
+# Checks every configuration, returns a report with the density of the table and every problem that was found.
+# The hash is a bijection onto its slots if there are no collisions, no slot is out of range and the density is 1.
+def verifyHash(hashFunction, configurations, slots) :
+    used = {}
+    collisions = []
+    outOfRange = []
+    for configuration in configurations :
+        slot = hashFunction(*configuration)
+        if not 0 <= slot < slots :
+            outOfRange.append(configuration)
+        elif slot in used :
+            collisions.append((used[slot], configuration))
+        else :
+            used[slot] = configuration
+    return {
+        "configurations" : len(configurations),
+        "slots" : slots,
+        "density" : len(configurations) / slots,
+        "collisions" : collisions,
+        "outOfRange" : outOfRange,
+        "bijective" : len(collisions) == 0 and len(outOfRange) == 0 and len(configurations) == slots,
+    }
+
+CPP_MIX = ('inline constexpr std::uint32_t supertile_hash_mix(std::uint32_t key, std::uint32_t seed) {\n'
+    '    return ((key + 1u) * (2u * seed + 1u) * ' + format(MIX_MULTIPLIER, '#x') + 'u) >> 16;\n'
+    '}\n')
+
+# The C++ counterpart of a PerfectHash, <name>_slot(...) returns the same slot as the Python object. CPP_MIX has to be emitted once before.
+def emitCppHash(name, perfectHash) :
+    arguments = ["a" + str(index) for index in range(perfectHash.argumentCount)]
+    lines = ['constexpr std::uint16_t ' + name + '_displacements[' + str(len(perfectHash.displacements)) + '] = {' + ', '.join(map(str, perfectHash.displacements)) + '};',
+        'inline constexpr std::size_t ' + name + '_slot(' + ', '.join('std::uint32_t ' + argument for argument in arguments) + ') {']
+    for first, second in perfectHash.unorderedArguments :
+        lines.append('    if (' + arguments[second] + ' < ' + arguments[first] + ') { const std::uint32_t swapped = ' + arguments[first] + '; '
+            + arguments[first] + ' = ' + arguments[second] + '; ' + arguments[second] + ' = swapped; }')
+    key = arguments[-1]
+    for argument in reversed(arguments[:-1]) :
+        key = argument + ' + 6u * (' + key + ')'
+    lines += ['    const std::uint32_t key = ' + key + ';',
+        '    return supertile_hash_mix(key, ' + name + '_displacements[supertile_hash_mix(key, 0u) % ' + str(len(perfectHash.displacements)) + 'u]) % ' + str(perfectHash.slots) + 'u;',
+        '}']
+    return '\n'.join(lines) + '\n'
+
+def main() :
+    parser = argparse.ArgumentParser(description="Verifies the perfect hash functions of the lookup tables and synthesizes new ones.")
+    parser.add_argument("--slack", type=int, default=0, help="additional slots for the synthesized hashes (default: 0, a minimal perfect hash)")
+    parser.add_argument("--bucket-size", type=int, default=DEFAULT_BUCKET_SIZE, help="average number of configurations per displacement (default: " + str(DEFAULT_BUCKET_SIZE) + ")")
+    parser.add_argument("--emit-cpp", metavar="FILE", help="write the synthesized hashes as C++ header to FILE")
+    arguments = parser.parse_args()
+
+    cppParts = ['#include <cstddef>\n#include <cstdint>\n\n', CPP_MIX]
+    for name, (_, _, perfectHashFunction) in TABLE_ARGUMENTS.items() :
+        configurations = tableConfigurations(name)
+        handwritten = verifyHash(perfectHashFunction, configurations, len(configurations))
+        perfectHash = synthesizeHash(configurations, UNORDERED_ARGUMENTS.get(name, ()), arguments.slack, max(1, arguments.bucket_size))
+        synthesized = verifyHash(perfectHash, configurations, perfectHash.slots)
+        print(name + ": " + str(len(configurations)) + " configurations, handwritten hash "
+            + ("bijective" if handwritten["bijective"] else str(len(handwritten["collisions"])) + " collisions, " + str(len(handwritten["outOfRange"])) + " out of range")
+            + ", synthesized hash " + ("bijective" if synthesized["bijective"] else "density " + format(synthesized["density"], ".2f")
+            + (" (" + str(len(synthesized["collisions"])) + " collisions)" if synthesized["collisions"] else ""))
+            + " with " + str(len(perfectHash.displacements)) + " displacements")
+        cppParts.append('\n' + emitCppHash(name, perfectHash))
+
+    if arguments.emit_cpp :
+        with open(arguments.emit_cpp, "w") as cppFile :
+            cppFile.write("".join(cppParts))
+
+if __name__ == "__main__" :
+    main()
@@ -1,6 +1,11 @@
 #include <iostream>
 #include <getopt.h>
+#include <stdint.h>
+#include <stdlib.h>
 #include <string.h>
+#include <thread>
+#include <vector>
+#include "supertile_layout_generator.h"
 
 const char* helpMessage =
     "Program usage:\n"
@@ -19,6 +24,18 @@ const char* helpMessage =
     "    -p                    Print the wire paths for better visualisation, this will HEAVILY impact the measured time for the layout calculation, which is show by -t\n"
     "    -r                    Prints a reduced output, usefull for further processing. The order of the gates is:\n"
     "                          [Core, 0, 1, 2, 3, 4, 5]\n"
+    "    -b                    Batch mode, the positional arguments are read from stdin instead, one query per line (e.g. 'BLG 40 2').\n"
+    "                          Every query is answered with exactly one line in the reduced output format (see -r), or a line starting with 'ERROR'.\n"
+    "                          In combination with -t the time in milliseconds is appended to each line as the last entry.\n"
+    "    -e original-gate-type Enumerate mode, solves every valid combination of input and output positions of this original gate type\n"
+    "                          and prints one line per combination, always in the same order, no positional arguments are needed:\n"
+    "                          'original-gate-type input-positions output-positions, ' followed by the reduced output (see -r) or a message starting with 'ERROR'.\n"
+    "                          In combination with -t the time in milliseconds is appended to each solved line as the last entry.\n"
+    "    -j threads            Number of threads for the enumerate mode (default: 1).\n"
+    "    -n runs               Benchmark mode, solves every valid combination of every original gate type (or only of the one given with -e) runs times\n"
+    "                          and prints the throughput and the latency percentiles of each original gate type. If compiled with -DSUPERTILE_PROFILE,\n"
+    "                          the time is also broken down by phase (core selection, routing, wire gate names, output formatting).\n"
+    "    -v                    Checks the decision tables for the core gates against the original code for every possible input (only if compiled with -DSUPERTILE_LEGACY_CORES).\n"
     "  Example:\n"
     "    %s BLG 40 2 -t\n"
     "    (This generates a tile-layout with an or-gate in the middle and the two super-tile-inputs 4 and 0 and the super-tile-output 2,\n"
@@ -53,22 +70,25 @@ const char* layoutExplanation =
     "    C = Connections to the core (which contains the logic gate) of the supertile\n";
 
 //For wires the naming "inPositions" and "outPositions" may not necessarily be true, since they are uni-directional
+//Gates and super tiles are plain values (no gate has more than two inputs or outputs), so a solver call doesn't need the heap at all:
+//the caller provides the superTile, e.g. on its stack, and the solvers fill it in.
 struct gate {
     const char* name;
-    int* inPositions;
-    int* outPositions;
-    int inPositionsSize;
-    int outPositionsSize;
+    uint8_t inPositions[2];
+    uint8_t outPositions[2];
+    uint8_t inPositionsSize;
+    uint8_t outPositionsSize;
+    uint16_t shape; //The value of the corresponding 'enum wire', only set for wire gates
 };
 
 struct superTile {
-    gate** wires; //They are listed clockwise, starting at position 0, see help message for further info (Length of this list is always 6)
-    gate* core;
+    gate wires[6]; //They are listed clockwise, starting at position 0, see help message for further info
+    gate core;
 };
 
 //up to 5 is probably overkill, but better be save then sorry
 //"NaW" = "Not a Wire" (This is a placeholder for initialisation of the matrix)
-enum wireType {
+enum wireType : uint8_t {
     NaW, in1, in2, in3, in4, in5, out1, out2, out3, out4, out5
 };
 
@@ -80,37 +100,161 @@ enum wire {
     wire12_34 = 4128, wire23_45 = 16896, wire34_05 = 4112, wire45_01 =16385, wire05_12 = 48, wire01_23 = 513 //double wires with two bend wires
 };
 
+//The connections of a tile of the ring, numbered clockwise starting with the connection to the outside of the super tile (see routeNet())
+enum tilePort : uint8_t {
+    PORT_OUTSIDE, PORT_NEXT_TILE, PORT_CORE, PORT_PREVIOUS_TILE
+};
+
+//One combination of input and output positions for the enumerate mode (-e)
+struct supertileQuery {
+    int inPositions[2];
+    int outPositions[2];
+    int inPositionsSize;
+    int outPositionsSize;
+};
+
+//Bypass has the most valid combinations, every ordered pair of paths that don't cross
+#define MAX_CONFIGURATIONS 240
+
+//Counters for the benchmark mode (-n), which break the time of the solvers down by phase. They are only compiled in with -DSUPERTILE_PROFILE,
+//otherwise PROFILE_PHASE() is empty and the solvers are exactly the same as without the counters.
+//PROFILE_PHASE(phase) counts the call and the time from there to the end of the enclosing block, phases can be nested (routing includes the wire gate names).
+#ifdef SUPERTILE_PROFILE
+enum profilePhase {
+    PHASE_CORE_SELECTION, PHASE_ROUTING, PHASE_WIRE_GATE_NAME, PHASE_FORMATTING, PHASE_COUNT
+};
+
+const char* profilePhaseNames[PHASE_COUNT] = {"core selection", "routing", "wire gate names", "output formatting"};
+
+struct profileCounter {
+    uint64_t calls;
+    uint64_t nanoseconds;
+};
+
+//Every thread has its own counters, the benchmark mode only runs on the main thread
+thread_local profileCounter profileCounters[PHASE_COUNT];
+
+struct profileScope {
+    profilePhase phase;
+    struct timespec start;
+
+    profileScope(profilePhase phase) : phase(phase) {
+        clock_gettime(CLOCK_MONOTONIC, &start);
+    }
+
+    ~profileScope() {
+        struct timespec end;
+        clock_gettime(CLOCK_MONOTONIC, &end);
+        profileCounters[phase].calls++;
+        profileCounters[phase].nanoseconds += (end.tv_sec - start.tv_sec) * 1000000000ll + (end.tv_nsec - start.tv_nsec);
+    }
+};
+
+#define PROFILE_PHASE(phase) profileScope profileScopeOfThisBlock(phase)
+#else
+#define PROFILE_PHASE(phase)
+#endif
+
 //Section for defining methods
 void printHelpMessage(const char*);
 void printLayoutExplanation();
 void printCoreGateList();
-int* extractPositions(char*, int);
-superTile* solver2in1out(int*, int*, char*, bool);
-    gate* getYCore(int*, int*);
-    gate* getYCoreUpright(int*, int*);
+void extractPositions(char*, int, int*);
+int findPositionConflict(int*, int, int*, int);
+superTile* solveSupertile(char*, int*, int, int*, int, bool, bool*, double*, superTile*);
+int runBatchMode(bool);
+int runEnumerateMode(char*, bool, int);
+    int enumerateConfigurations(char*, supertileQuery*);
+int runBenchmarkMode(char*, int);
+    int benchmarkGate(char*, int);
+    int compareDoubles(const void*, const void*);
+    double percentile(double*, int, double);
+    bool checkIfCrossing(int, int, int, int);
+superTile* solver2in1out(int*, int*, char*, bool, superTile*);
+    bool getYCore(int*, int*, gate*);
+    bool getYCoreUpright(int*, int*, gate*);
+    void setYCore(gate*, uint8_t);
     bool specialGoClockwise(int, int, int);
     int mod(int, int);
-    int* getWireTileConnections(wireType**, int);
-    bool getWireTile(int*, int, gate*);
-    bool giveWireGateName(wire, gate*);
-superTile* solver1in1out(int*, int*, char*, bool);
+    void initRouting(wireType[6][3], superTile*);
+    bool routeNet(wireType[6][3], superTile*, wireType, int, tilePort, int, tilePort, bool);
+        wireType* portField(wireType[6][3], int, tilePort);
+        bool connectPorts(wireType[6][3], gate*, int, tilePort, tilePort, wireType);
+        wire wireBetween(int, int);
+        bool giveWireGateName(wire, gate*);
+superTile* solver1in1out(int*, int*, char*, bool, superTile*);
     bool goClockwise(int, int, int);
-    gate* getICore(int*, int*);
-superTile* solver0in1out(int*, bool);
-superTile* solver2in2outCROSSING(int*, int*, bool);
-superTile* solver2in2outBYPASS(int*, int*, bool);
+    void getICore(int*, int*, gate*);
+    void setWireGate(gate*, int, int);
+superTile* solver0in1out(int*, bool, superTile*);
+superTile* solver2in2outCROSSING(int*, int*, bool, superTile*);
+    bool getXCore(int*, int*, gate*);
+int perfectHash21(int, int, int);
+int perfectHash11(int, int);
+int perfectHash22CROSSING(int, int, int, int);
+superTile* solver2in2outBYPASS(int*, int*, bool, superTile*);
 void printLayout(superTile*);
     void setNormalisedString(const char*, char*);
-    void setNormalisedNumbers(int*, int, char*);
+    void setNormalisedNumbers(uint8_t*, int, char*);
 void printReducedLayout(superTile*);
-void printWirePaths(wireType**, gate*);
+    int formatReducedLayout(superTile*, char*, int);
+    std::string getReducedCoreName(superTile*);
+void printWirePaths(wireType[6][3], gate*);
     char getWireTypeSynonymA(wireType);
     char getWireTypeSynonymB(wireType);
-void freeGate(gate*);
+#ifdef SUPERTILE_LEGACY_CORES
+int verifyCoreTables();
+    void getYCoreLegacy(int*, int*, gate*);
+    bool getYCoreUprightLegacy(int*, int*, gate*);
+    void getICoreLegacy(int*, int*, gate*);
+    void getXCoreLegacy(int*, int*, gate*);
+#endif
+
+//Decision tables for the orientation of the core gates, they replace the if-chains of getYCoreLegacy(), getYCoreUprightLegacy(), getICoreLegacy() and getXCoreLegacy(),
+//which are only compiled with -DSUPERTILE_LEGACY_CORES, where '-v' checks every possible input against them (see verifyCoreTables()).
+//The tables are indexed with the same perfect hash functions as the lookup tables (see lookup_table_generator.py), so the order of the two inputs of a Y core doesn't matter.
+#define NO_CORE 255
+
+//Output position of the Y-shaped core by perfectHash21(output, input1, input2), one line per output of the super tile, see setYCore() for the inputs
+const uint8_t yCoreTable[60] = {
+    0, 0, 0, 0, 0, 0, 0, 2, 0, 0,
+    0, 0, 0, 2, 0, 0, 2, 2, 2, 2,
+    0, 2, 2, 2, 2, 2, 2, 2, 2, 2,
+    3, 3, 3, 3, 3, 3, 3, 5, 3, 3,
+    3, 3, 3, 3, 3, 5, 5, 5, 5, 5,
+    3, 5, 5, 5, 5, 5, 5, 5, 5, 5
+};
 
-//TODO generally replace int with to locally shortest required variant, like uint8_t DON'T FORGET TO CHANGE THE SIZEOF IN MALLOC FOR THAT!!
+//The same for BLGR, NO_CORE if there is no core gate orientation that would generate a possible layout
+const uint8_t yCoreUprightTable[60] = {
+    NO_CORE, NO_CORE, NO_CORE, NO_CORE, NO_CORE, NO_CORE, NO_CORE, 2, NO_CORE, NO_CORE,
+    2, NO_CORE, 2, 2, NO_CORE, 2, 2, 2, 2, 2,
+    NO_CORE, 2, 2, 2, 2, 2, 2, 2, 2, 2,
+    3, 3, 3, 3, 3, 3, 3, NO_CORE, 3, 3,
+    3, 3, 3, 3, 3, 3, 3, 3, NO_CORE, NO_CORE,
+    3, NO_CORE, NO_CORE, NO_CORE, NO_CORE, NO_CORE, NO_CORE, NO_CORE, NO_CORE, NO_CORE
+};
+
+//{input, output} of the I-shaped core by perfectHash11(input, output)
+const uint8_t iCoreTable[30][2] = {
+    {3, 5}, {0, 2}, {0, 2}, {0, 3}, {0, 3}, {2, 5}, {0, 3}, {2, 5}, {2, 5}, {0, 3}, {2, 5}, {2, 5}, {0, 2}, {3, 5}, {3, 5},
+    {5, 3}, {2, 0}, {2, 0}, {3, 0}, {3, 0}, {3, 0}, {3, 0}, {3, 0}, {5, 2}, {5, 2}, {5, 2}, {5, 2}, {2, 0}, {5, 3}, {5, 3}
+};
+
+//Inputs of the X-shaped core by perfectHash22CROSSING(input1, output1, input2, output2), one line per input1, the outputs are always on the opposite side of the inputs
+const uint8_t xCoreTable[120][2] = {
+    {5, 0}, {0, 2}, {0, 2}, {0, 2}, {0, 2}, {0, 2}, {0, 2}, {0, 2}, {0, 2}, {0, 2}, {5, 3}, {0, 5}, {0, 5}, {0, 5}, {0, 5}, {0, 5}, {0, 5}, {0, 5}, {0, 5}, {0, 5},
+    {0, 2}, {0, 2}, {0, 2}, {0, 2}, {0, 2}, {2, 3}, {2, 3}, {2, 3}, {2, 3}, {2, 3}, {0, 5}, {0, 5}, {0, 5}, {0, 5}, {2, 0}, {2, 0}, {2, 0}, {2, 0}, {2, 0}, {0, 5},
+    {2, 3}, {2, 3}, {2, 3}, {2, 3}, {2, 3}, {2, 3}, {2, 3}, {2, 3}, {3, 5}, {2, 3}, {2, 0}, {2, 0}, {2, 0}, {2, 0}, {2, 0}, {2, 0}, {2, 0}, {2, 0}, {3, 2}, {2, 0},
+    {2, 3}, {3, 5}, {3, 5}, {3, 5}, {3, 5}, {3, 5}, {3, 5}, {3, 5}, {3, 5}, {3, 5}, {2, 0}, {3, 2}, {3, 2}, {3, 2}, {3, 2}, {3, 2}, {3, 2}, {3, 2}, {3, 2}, {3, 2},
+    {3, 5}, {3, 5}, {3, 5}, {3, 5}, {3, 5}, {5, 0}, {5, 0}, {5, 0}, {5, 0}, {5, 0}, {3, 2}, {3, 2}, {3, 2}, {3, 2}, {5, 3}, {5, 3}, {5, 3}, {5, 3}, {5, 3}, {3, 2},
+    {5, 0}, {5, 0}, {5, 0}, {5, 0}, {5, 0}, {5, 0}, {5, 0}, {5, 0}, {0, 2}, {5, 0}, {5, 3}, {5, 3}, {5, 3}, {5, 3}, {5, 3}, {5, 3}, {5, 3}, {5, 3}, {0, 5}, {5, 3}
+};
+
+//TODO generally replace int with to locally shortest required variant, like uint8_t (done for the gates and the wire matrix, the solver arguments are still int)
 //TODO bei der benennung von gates / outergates / tiles / wires konsistent werden
 //TODO im ganzen Programm sind viele checks die davon ausgehen das andere methode quatsch machen könnten, die könnte man für performance los werden
+#ifndef SUPERTILE_LIBRARY
 int main(int argc, char** argv)
 {
 
@@ -120,11 +264,15 @@ int main(int argc, char** argv)
     bool trackTime = false;
     bool reducedOutput = false;
     bool printTheWirePaths = false;
+    bool batchMode = false;
+    char* enumerateCoreName = NULL;
+    int threadCount = 1;
+    int benchmarkRuns = 0;
 
     //Get optional Arguments
     int opt;
     bool exit = false;
-    while ((opt = getopt(argc, argv, "hlctpr")) != -1) {
+    while ((opt = getopt(argc, argv, "hlctprbe:j:n:v")) != -1) {
         switch (opt) {
             case 'h':
                 printHelpMessage(programName);
@@ -147,6 +295,25 @@ int main(int argc, char** argv)
             case 'p':
                 printTheWirePaths = true;
                 break;
+            case 'b':
+                batchMode = true;
+                break;
+            case 'e':
+                enumerateCoreName = optarg;
+                break;
+            case 'j':
+                threadCount = atoi(optarg);
+                break;
+            case 'n':
+                benchmarkRuns = atoi(optarg);
+                break;
+            case 'v':
+#ifdef SUPERTILE_LEGACY_CORES
+                return verifyCoreTables() == 0 ? EXIT_SUCCESS : EXIT_FAILURE;
+#else
+                printf("The original code for the core gates is not compiled in, compile with -DSUPERTILE_LEGACY_CORES to use -v.\n");
+                return EXIT_FAILURE;
+#endif
             default:
                 printf("Reffer to %s -h for further information.\n", programName);
                 return EXIT_FAILURE;
@@ -156,6 +323,18 @@ int main(int argc, char** argv)
         return EXIT_SUCCESS;
     }
 
+    if (batchMode) {
+        return runBatchMode(trackTime);
+    }
+
+    if (benchmarkRuns > 0) {
+        return runBenchmarkMode(enumerateCoreName, benchmarkRuns);
+    }
+
+    if (enumerateCoreName != NULL) {
+        return runEnumerateMode(enumerateCoreName, trackTime, threadCount);
+    }
+
     //Get positional Arguments
     int position = optind;
     if(position >= argc) {
@@ -172,7 +351,8 @@ int main(int argc, char** argv)
     }
     int inPositionsSize;
     for(inPositionsSize = 0; argv[position][inPositionsSize] != 0; inPositionsSize++) {}
-    int* inPositions = extractPositions(argv[position], inPositionsSize);
+    int* inPositions = (int*) malloc(sizeof(int) * inPositionsSize);
+    extractPositions(argv[position], inPositionsSize, inPositions);
 
     position++;
 
@@ -183,79 +363,524 @@ int main(int argc, char** argv)
     }
     int outPositionsSize;
     for(outPositionsSize = 0; argv[position][outPositionsSize] != 0; outPositionsSize++) {}
-    int* outPositions = extractPositions(argv[position], outPositionsSize);
+    int* outPositions = (int*) malloc(sizeof(int) * outPositionsSize);
+    extractPositions(argv[position], outPositionsSize, outPositions);
 
     //Check if there already is a conflict in the given positions:
+    int conflict = findPositionConflict(inPositions, inPositionsSize, outPositions, outPositionsSize);
+    if (conflict != -1) {
+        printf("Conflic between inputs and outputs, position %i is used by both. For more info, add optional argument -h.\n", conflict);
+        free(inPositions);
+        free(outPositions);
+        return EXIT_FAILURE;
+    }
+
+    bool solverFound;
+    double milliseconds;
+    superTile layout;
+    superTile* finishedLayout = solveSupertile(coreName, inPositions, inPositionsSize, outPositions, outPositionsSize, printTheWirePaths, &solverFound, &milliseconds, &layout);
+    if (!solverFound) {
+        printf("There has been no solver implemented for a original gate with %i inputs and %i outputs or you have a typo in the original-gate name. For more info, add optional argument -h.\n", inPositionsSize, outPositionsSize);
+        free(inPositions);
+        free(outPositions);
+        return EXIT_SUCCESS;
+    }
+
+    if (finishedLayout == NULL) {
+        printf("Something went wrong during layout generation.\n");
+        free(inPositions);
+        free(outPositions);
+        return EXIT_FAILURE;
+    }
+
+    if (trackTime) {
+        printf("Time:\n  This calculation took %f milliseconds.\n", milliseconds);
+    }
+
+    //Print finished Layout to the console
+    if(reducedOutput) {
+        printReducedLayout(finishedLayout);
+    } else {
+        printLayout(finishedLayout);
+    }
+    
+    //Free all used recources
+    free(inPositions);
+    free(outPositions);
+}
+#endif
+
+//Returns the first position that is used as input and output at the same time, -1 if there is no such position
+int findPositionConflict(int* inPositions, int inPositionsSize, int* outPositions, int outPositionsSize) {
     for(int x = 0; x < inPositionsSize; x++) {
         for(int y = 0; y < outPositionsSize; y++) {
             if(inPositions[x] == outPositions[y]) {
-                printf("Conflic between inputs and outputs, position %i is used by both. For more info, add optional argument -h.\n", inPositions[x]);
-                free(inPositions);
-                free(outPositions);
-                return EXIT_FAILURE;
+                return inPositions[x];
             }
         }
     }
+    return -1;
+}
 
+//Chooses the fitting solver based on the number of in/outputs and the core name and runs it.
+//solverFound is set to false if there is no fitting solver, milliseconds is set to the time the solver took.
+//The layout is written into super, returns super or NULL if no layout could be generated.
+superTile* solveSupertile(char* coreName, int* inPositions, int inPositionsSize, int* outPositions, int outPositionsSize, bool printTheWirePaths, bool* solverFound, double* milliseconds, superTile* super) {
     struct timespec start;
     struct timespec end;
 
     superTile* finishedLayout;
+    *solverFound = true;
+    //The decision tables of the cores and the wire matrix only have room for the positions 0 to 5
+    for (int x = 0; x < inPositionsSize; x++) {
+        if (inPositions[x] < 0 || inPositions[x] > 5) {
+            *milliseconds = 0;
+            return NULL;
+        }
+    }
+    for (int x = 0; x < outPositionsSize; x++) {
+        if (outPositions[x] < 0 || outPositions[x] > 5) {
+            *milliseconds = 0;
+            return NULL;
+        }
+    }
     //Check number of in/out and chose fitting method
     if(inPositionsSize == 2 && outPositionsSize == 1) {
         clock_gettime(CLOCK_MONOTONIC, &start); //Runtime measurement
-        finishedLayout = solver2in1out(inPositions, outPositions, coreName, printTheWirePaths);
+        finishedLayout = solver2in1out(inPositions, outPositions, coreName, printTheWirePaths, super);
         clock_gettime(CLOCK_MONOTONIC, &end); //Runtime measurement
     } else if (inPositionsSize == 1 && outPositionsSize == 1 && strcmp(coreName, "POutput")) {
         clock_gettime(CLOCK_MONOTONIC, &start); //Runtime measurement
-        finishedLayout = solver1in1out(inPositions, outPositions, coreName, printTheWirePaths);
+        finishedLayout = solver1in1out(inPositions, outPositions, coreName, printTheWirePaths, super);
         clock_gettime(CLOCK_MONOTONIC, &end); //Runtime measurement
     } else if (inPositionsSize == 1 && !strcmp(coreName, "POutput")) {
         clock_gettime(CLOCK_MONOTONIC, &start); //Runtime measurement
-        finishedLayout = solver0in1out(outPositions, printTheWirePaths);
+        finishedLayout = solver0in1out(outPositions, printTheWirePaths, super);
         clock_gettime(CLOCK_MONOTONIC, &end); //Runtime measurement
     } else if (inPositionsSize == 2 && outPositionsSize == 2 && !strcmp(coreName, "Crossing")) {
         clock_gettime(CLOCK_MONOTONIC, &start); //Runtime measurement
-        finishedLayout = solver2in2outCROSSING(inPositions, outPositions, printTheWirePaths);
+        finishedLayout = solver2in2outCROSSING(inPositions, outPositions, printTheWirePaths, super);
         clock_gettime(CLOCK_MONOTONIC, &end); //Runtime measurement
     } else if (inPositionsSize == 2 && outPositionsSize == 2 && !strcmp(coreName, "Bypass")) {
         clock_gettime(CLOCK_MONOTONIC, &start); //Runtime measurement
-        finishedLayout = solver2in2outBYPASS(inPositions, outPositions, printTheWirePaths);
+        finishedLayout = solver2in2outBYPASS(inPositions, outPositions, printTheWirePaths, super);
         clock_gettime(CLOCK_MONOTONIC, &end); //Runtime measurement
     } else {
-        printf("There has been no solver implemented for a original gate with %i inputs and %i outputs or you have a typo in the original-gate name. For more info, add optional argument -h.\n", inPositionsSize, outPositionsSize);
-        free(inPositions);
-        free(outPositions);
-        return EXIT_SUCCESS;
+        *solverFound = false;
+        *milliseconds = 0;
+        return NULL;
     }
 
-    if (finishedLayout == NULL) {
-        printf("Something went wrong during layout generation.\n");
-        free(inPositions);
-        free(outPositions);
+    *milliseconds = (end.tv_sec - start.tv_sec + 1e-9 * (end.tv_nsec - start.tv_nsec))*1000;
+    return finishedLayout;
+}
+
+//Reads one query per line from stdin ("original-gate-type input-positions output-positions", the same as the positional arguments)
+//and answers each of them with exactly one line on stdout, so that one process can be used for a whole lookup table generation.
+//Every answer is either the reduced layout (see -r) or a line starting with "ERROR", if trackTime is set the time in milliseconds is appended as the last entry.
+//Lines are read as a whole however long they are, a malformed line (missing or extra tokens, too many positions) is answered with a single "ERROR" line as well.
+int runBatchMode(bool trackTime) {
+    char* line = NULL;
+    size_t lineCapacity = 0;
+    while (getline(&line, &lineCapacity, stdin) != -1) {
+        char* coreName = strtok(line, " \t\r\n");
+        if (coreName == NULL) {
+            continue; //Empty lines are ignored
+        }
+        char* inPositionsText = strtok(NULL, " \t\r\n");
+        char* outPositionsText = strtok(NULL, " \t\r\n");
+        if (outPositionsText == NULL) {
+            printf("ERROR Missing positional argument, every query needs 'original-gate-type input-positions output-positions'.\n");
+            fflush(stdout);
+            continue;
+        }
+        if (strtok(NULL, " \t\r\n") != NULL) {
+            printf("ERROR Too many arguments, every query needs exactly 'original-gate-type input-positions output-positions'.\n");
+            fflush(stdout);
+            continue;
+        }
+
+        int inPositionsSize = strlen(inPositionsText);
+        int outPositionsSize = strlen(outPositionsText);
+        if (inPositionsSize > 6 || outPositionsSize > 6) {
+            printf("ERROR Too many positions, a supertile has only 6 of them.\n");
+            fflush(stdout);
+            continue;
+        }
+        int inPositions[6];
+        extractPositions(inPositionsText, inPositionsSize, inPositions);
+        int outPositions[6];
+        extractPositions(outPositionsText, outPositionsSize, outPositions);
+        int conflict = findPositionConflict(inPositions, inPositionsSize, outPositions, outPositionsSize);
+        if (conflict != -1) {
+            printf("ERROR Conflic between inputs and outputs, position %i is used by both.\n", conflict);
+        } else {
+            bool solverFound;
+            double milliseconds;
+            superTile layout;
+            superTile* finishedLayout = solveSupertile(coreName, inPositions, inPositionsSize, outPositions, outPositionsSize, false, &solverFound, &milliseconds, &layout);
+            if (!solverFound) {
+                printf("ERROR There has been no solver implemented for a original gate with %i inputs and %i outputs or you have a typo in the original-gate name.\n", inPositionsSize, outPositionsSize);
+            } else if (finishedLayout == NULL) {
+                printf("ERROR Something went wrong during layout generation.\n");
+            } else {
+                printReducedLayout(finishedLayout);
+                if (trackTime) {
+                    printf(", %f", milliseconds);
+                }
+                printf("\n");
+            }
+        }
+        fflush(stdout); //The other side waits for this line before sending the next query
+    }
+    free(line);
+    return EXIT_SUCCESS;
+}
+
+//Solves every valid combination of input and output positions of one original gate type (see enumerateConfigurations()), so a whole lookup table needs only one process.
+//The combinations are split between threadCount threads, every thread writes into its own entries of the result arrays, the lines are printed afterwards in the order of the combinations.
+//Every line is the query as it would be written in batch mode, followed by ", " and the reduced layout or a message starting with "ERROR".
+int runEnumerateMode(char* coreName, bool trackTime, int threadCount) {
+    supertileQuery queries[MAX_CONFIGURATIONS];
+    int queryCount = enumerateConfigurations(coreName, queries);
+    if (queryCount == -1) {
+        printf("There is no original gate with the name '%s' that can be enumerated, for the available ones add optional argument -c.\n", coreName);
         return EXIT_FAILURE;
     }
+    if (threadCount < 1) {
+        threadCount = 1;
+    }
 
-    if (trackTime) {
-        printf("Time:\n  This calculation took %f milliseconds.\n", (end.tv_sec - start.tv_sec + 1e-9 * (end.tv_nsec - start.tv_nsec))*1000);
+    superTile* layouts = (superTile*) malloc(sizeof(superTile) * queryCount);
+    bool* solved = (bool*) malloc(sizeof(bool) * queryCount);
+    double* milliseconds = (double*) malloc(sizeof(double) * queryCount);
+    auto solveEvery = [&](int firstQuery) {
+        for (int x = firstQuery; x < queryCount; x += threadCount) {
+            bool solverFound;
+            solved[x] = solveSupertile(coreName, queries[x].inPositions, queries[x].inPositionsSize, queries[x].outPositions, queries[x].outPositionsSize, false, &solverFound, &milliseconds[x], &layouts[x]) != NULL;
+        }
+    };
+    std::vector<std::thread> threads;
+    for (int thread = 1; thread < threadCount; thread++) {
+        threads.emplace_back(solveEvery, thread);
+    }
+    solveEvery(0);
+    for (std::thread& thread : threads) {
+        thread.join();
     }
 
-    //Print finished Layout to the console
-    if(reducedOutput) {
-        printReducedLayout(finishedLayout);
+    for (int x = 0; x < queryCount; x++) {
+        printf("%s ", coreName);
+        for (int y = 0; y < queries[x].inPositionsSize; y++) {
+            printf("%i", queries[x].inPositions[y]);
+        }
+        printf(" ");
+        for (int y = 0; y < queries[x].outPositionsSize; y++) {
+            printf("%i", queries[x].outPositions[y]);
+        }
+        printf(", ");
+        if (solved[x]) {
+            printReducedLayout(&layouts[x]);
+            if (trackTime) {
+                printf(", %f", milliseconds[x]);
+            }
+            printf("\n");
+        } else {
+            printf("ERROR Something went wrong during layout generation.\n");
+        }
+    }
+
+    free(layouts);
+    free(solved);
+    free(milliseconds);
+    return EXIT_SUCCESS;
+}
+
+//Fills queries with every valid combination of input and output positions for the original gate type and returns how many there are, -1 for an unknown original gate type.
+//The order is the same in every run:
+//    BLG, BLGR: output, then both inputs (the first one is always the smaller one, since their order doesn't matter)
+//    Wire, Inverter: output, then input
+//    POutput: output (the input is ignored by the solver, but has to be a different position)
+//    Crossing, Bypass: first input, first output, second input, second output, only the combinations whose paths cross (Crossing) or don't cross (Bypass)
+int enumerateConfigurations(char* coreName, supertileQuery* queries) {
+    int queryCount = 0;
+    if (!strcmp(coreName, "BLG") || !strcmp(coreName, "BLGR")) {
+        for (int out = 0; out < 6; out++) {
+            for (int in1 = 0; in1 < 6; in1++) {
+                for (int in2 = in1 + 1; in2 < 6; in2++) {
+                    if (in1 != out && in2 != out) {
+                        queries[queryCount] = {{in1, in2}, {out, -1}, 2, 1};
+                        queryCount++;
+                    }
+                }
+            }
+        }
+    } else if (!strcmp(coreName, "Wire") || !strcmp(coreName, "Inverter")) {
+        for (int out = 0; out < 6; out++) {
+            for (int in = 0; in < 6; in++) {
+                if (in != out) {
+                    queries[queryCount] = {{in, -1}, {out, -1}, 1, 1};
+                    queryCount++;
+                }
+            }
+        }
+    } else if (!strcmp(coreName, "POutput")) {
+        for (int out = 0; out < 6; out++) {
+            queries[queryCount] = {{out == 0 ? 1 : 0, -1}, {out, -1}, 1, 1};
+            queryCount++;
+        }
+    } else if (!strcmp(coreName, "Crossing") || !strcmp(coreName, "Bypass")) {
+        bool crossing = !strcmp(coreName, "Crossing");
+        for (int in1 = 0; in1 < 6; in1++) {
+            for (int out1 = 0; out1 < 6; out1++) {
+                for (int in2 = 0; in2 < 6; in2++) {
+                    for (int out2 = 0; out2 < 6; out2++) {
+                        if (out1 == in1 || in2 == in1 || in2 == out1 || out2 == in1 || out2 == out1 || out2 == in2) {
+                            continue;
+                        }
+                        if (checkIfCrossing(in1, in2, out1, out2) == crossing) {
+                            queries[queryCount] = {{in1, in2}, {out1, out2}, 2, 2};
+                            queryCount++;
+                        }
+                    }
+                }
+            }
+        }
     } else {
-        printLayout(finishedLayout);
+        return -1;
     }
-    
-    //Free all used recources
-    free(inPositions);
-    free(outPositions);
-    freeGate(finishedLayout->core);
-    for (uint8_t x = 0; x < 6; x++) {
-        freeGate(finishedLayout->wires[x]);
+    return queryCount;
+}
+
+//Solves every valid combination of input and output positions (see enumerateConfigurations()) of every original gate type, or only of coreName if it isn't NULL,
+//runs times in this process and prints the throughput and the latency percentiles, so changes of the solvers can be compared without the overhead of the Python side.
+//The latency of a call is the solver and the formatting of the reduced output (into a buffer, nothing is printed while measuring).
+//Combinations that can't be solved are found in a first run that isn't measured and left out afterwards, since their error messages would dominate the time.
+int runBenchmarkMode(char* coreName, int runs) {
+    const char* coreNames[] = {"BLG", "BLGR", "Wire", "Inverter", "POutput", "Crossing", "Bypass"};
+    if (coreName != NULL) {
+        return benchmarkGate(coreName, runs) == -1 ? EXIT_FAILURE : EXIT_SUCCESS;
+    }
+    for (const char* name : coreNames) {
+        benchmarkGate((char*) name, runs);
+    }
+#ifndef SUPERTILE_PROFILE
+    printf("For the time of each phase compile with -DSUPERTILE_PROFILE.\n");
+#endif
+    return EXIT_SUCCESS;
+}
+
+//Returns the number of combinations that could not be solved, -1 for an unknown original gate type
+int benchmarkGate(char* coreName, int runs) {
+    supertileQuery queries[MAX_CONFIGURATIONS];
+    int queryCount = enumerateConfigurations(coreName, queries);
+    if (queryCount == -1) {
+        printf("There is no original gate with the name '%s' that can be enumerated, for the available ones add optional argument -c.\n", coreName);
+        return -1;
+    }
+
+    //First run, also warms up the caches
+    supertileQuery solvableQueries[MAX_CONFIGURATIONS];
+    int solvableCount = 0;
+    for (int x = 0; x < queryCount; x++) {
+        bool solverFound;
+        double milliseconds;
+        superTile layout;
+        if (solveSupertile(coreName, queries[x].inPositions, queries[x].inPositionsSize, queries[x].outPositions, queries[x].outPositionsSize, false, &solverFound, &milliseconds, &layout) != NULL) {
+            solvableQueries[solvableCount] = queries[x];
+            solvableCount++;
+        }
+    }
+    int failed = queryCount - solvableCount;
+    if (solvableCount == 0) {
+        printf("%s: %i combinations, none of them could be solved\n", coreName, queryCount);
+        return failed;
+    }
+
+#ifdef SUPERTILE_PROFILE
+    memset(profileCounters, 0, sizeof(profileCounters));
+#endif
+    int sampleCount = solvableCount * runs;
+    double* microseconds = (double*) malloc(sizeof(double) * sampleCount);
+    char reducedLayout[256];
+    struct timespec benchmarkStart;
+    struct timespec benchmarkEnd;
+    clock_gettime(CLOCK_MONOTONIC, &benchmarkStart);
+    for (int run = 0; run < runs; run++) {
+        for (int x = 0; x < solvableCount; x++) {
+            struct timespec start;
+            struct timespec end;
+            bool solverFound;
+            double milliseconds;
+            superTile layout;
+            clock_gettime(CLOCK_MONOTONIC, &start);
+            superTile* finishedLayout = solveSupertile(coreName, solvableQueries[x].inPositions, solvableQueries[x].inPositionsSize, solvableQueries[x].outPositions, solvableQueries[x].outPositionsSize, false, &solverFound, &milliseconds, &layout);
+            formatReducedLayout(finishedLayout, reducedLayout, sizeof(reducedLayout));
+            clock_gettime(CLOCK_MONOTONIC, &end);
+            microseconds[run * solvableCount + x] = (end.tv_sec - start.tv_sec + 1e-9 * (end.tv_nsec - start.tv_nsec)) * 1000000;
+        }
+    }
+    clock_gettime(CLOCK_MONOTONIC, &benchmarkEnd);
+    double seconds = benchmarkEnd.tv_sec - benchmarkStart.tv_sec + 1e-9 * (benchmarkEnd.tv_nsec - benchmarkStart.tv_nsec);
+
+    qsort(microseconds, sampleCount, sizeof(double), compareDoubles);
+    printf("%s: %i combinations (%i failed and left out) x %i runs, %i calls in %f ms, %f calls per second\n", coreName, queryCount, failed, runs, sampleCount, seconds * 1000, sampleCount / seconds);
+    printf("    Latency in microseconds: min %f, p50 %f, p90 %f, p99 %f, max %f\n", microseconds[0], percentile(microseconds, sampleCount, 50), percentile(microseconds, sampleCount, 90), percentile(microseconds, sampleCount, 99), microseconds[sampleCount - 1]);
+#ifdef SUPERTILE_PROFILE
+    for (int phase = 0; phase < PHASE_COUNT; phase++) {
+        printf("    %s: %llu calls, %f ms, %f microseconds per solver call\n", profilePhaseNames[phase], (unsigned long long) profileCounters[phase].calls, profileCounters[phase].nanoseconds / 1e6, profileCounters[phase].nanoseconds / 1e3 / sampleCount);
+    }
+#endif
+
+    free(microseconds);
+    return failed;
+}
+
+int compareDoubles(const void* a, const void* b) {
+    double first = *(const double*) a;
+    double second = *(const double*) b;
+    return (first > second) - (first < second);
+}
+
+//Nearest-rank percentile of the sorted values
+double percentile(double* sortedValues, int valueCount, double percent) {
+    int rank = (int) (percent / 100 * valueCount + 0.999999);
+    if (rank < 1) {
+        rank = 1;
+    }
+    return sortedValues[rank - 1];
+}
+
+//Returns true if the path from in1 to out1 has to cross the path from in2 to out2 (same as checkIfCrossing() in lookup_table_generator.py)
+bool checkIfCrossing(int in1, int in2, int out1, int out2) {
+    int normIn2 = mod(in2 - in1, 6);
+    int normOut1 = mod(out1 - in1, 6);
+    int normOut2 = mod(out2 - in1, 6);
+
+    switch (normOut1) {
+        case 2:
+            return normIn2 == 1 || normOut2 == 1;
+        case 3:
+            return !((normIn2 == 4 && normOut2 == 5) || (normIn2 == 5 && normOut2 == 4) || (normIn2 == 1 && normOut2 == 2) || (normIn2 == 2 && normOut2 == 1));
+        case 4:
+            return normIn2 == 5 || normOut2 == 5;
+        default: //1 or 5, the paths are right next to each other
+            return false;
+    }
+}
+
+//The perfect hash functions of lookup_table_generator.py, used as index into the decision tables of the cores
+int perfectHash21(int a, int b, int c) {
+    b = mod(b - a, 6); //get b and c into the same 1-5 range for all a
+    c = mod(c - a, 6);
+    int basicResult = (b + c) == 9 ? 12 : 2 * (b + c) - abs(b - c); //get 10 different numbers out of b and c
+    return 10 * a + basicResult - 5;
+}
+
+int perfectHash11(int a, int b) {
+    int base = a > b ? 15 : 0;
+    if (a * b == 2) { //move the basic result 5 to the 12, because 5 is used twice and 12 is a single wide gap
+        return 12 + base;
+    } else if (a + b == 9) {
+        return base;
+    }
+    return 2 * (a + b) - abs(a - b) + base;
+}
+
+int perfectHash22CROSSING(int in1, int out1, int in2, int out2) {
+    out1 = mod(out1 - in1, 6);
+    in2 = mod(in2 - in1, 6);
+    out2 = mod(out2 - in1, 6);
+    int basicResult = in2 * out2 == 8 ? 17 : 2 * out1 + in2 + out2;
+    if (in2 < out2) {
+        return 20 * in1 + basicResult - 8;
+    }
+    return 20 * in1 + 10 + basicResult - 8;
+}
+
+#ifdef SUPERTILE_LEGACY_CORES
+bool sameCore(gate* a, gate* b) {
+    if (a->inPositionsSize != b->inPositionsSize || a->outPositionsSize != b->outPositionsSize) {
+        return false;
+    }
+    return !memcmp(a->inPositions, b->inPositions, a->inPositionsSize) && !memcmp(a->outPositions, b->outPositions, a->outPositionsSize);
+}
+
+void printCoreMismatch(const char* coreType, int* inPositions, int inPositionsSize, int* outPositions, int outPositionsSize) {
+    printf("Mismatch for the %s core with the inputs ", coreType);
+    for (int x = 0; x < inPositionsSize; x++) {
+        printf("%i", inPositions[x]);
+    }
+    printf(" and the outputs ");
+    for (int x = 0; x < outPositionsSize; x++) {
+        printf("%i", outPositions[x]);
+    }
+    printf("\n");
+}
+
+//Compares the decision tables with the original code for every combination of positions the solvers can pass, returns the number of mismatches
+int verifyCoreTables() {
+    int checked = 0;
+    int mismatches = 0;
+    for (int out = 0; out < 6; out++) {
+        for (int in1 = 0; in1 < 6; in1++) {
+            for (int in2 = 0; in2 < 6; in2++) {
+                if (in1 == out || in2 == out || in1 == in2) {
+                    continue;
+                }
+                int inPositions[2] = {in1, in2};
+                int outPositions[1] = {out};
+                gate fromTable;
+                gate original;
+                getYCore(inPositions, outPositions, &fromTable);
+                getYCoreLegacy(inPositions, outPositions, &original);
+                if (!sameCore(&fromTable, &original)) {
+                    printCoreMismatch("Y", inPositions, 2, outPositions, 1);
+                    mismatches++;
+                }
+                bool tableFound = getYCoreUpright(inPositions, outPositions, &fromTable);
+                bool originalFound = getYCoreUprightLegacy(inPositions, outPositions, &original);
+                if (tableFound != originalFound || (tableFound && !sameCore(&fromTable, &original))) {
+                    printCoreMismatch("upright Y", inPositions, 2, outPositions, 1);
+                    mismatches++;
+                }
+                checked += 2;
+            }
+        }
+    }
+    for (int out = 0; out < 6; out++) {
+        for (int in = 0; in < 6; in++) {
+            if (in == out) {
+                continue;
+            }
+            gate fromTable;
+            gate original;
+            getICore(&in, &out, &fromTable);
+            getICoreLegacy(&in, &out, &original);
+            if (!sameCore(&fromTable, &original)) {
+                printCoreMismatch("I", &in, 1, &out, 1);
+                mismatches++;
+            }
+            checked++;
+        }
+    }
+    supertileQuery queries[MAX_CONFIGURATIONS];
+    int queryCount = enumerateConfigurations((char*) "Crossing", queries);
+    for (int x = 0; x < queryCount; x++) {
+        gate fromTable;
+        gate original;
+        getXCore(queries[x].inPositions, queries[x].outPositions, &fromTable);
+        getXCoreLegacy(queries[x].inPositions, queries[x].outPositions, &original);
+        if (!sameCore(&fromTable, &original)) {
+            printCoreMismatch("X", queries[x].inPositions, 2, queries[x].outPositions, 2);
+            mismatches++;
+        }
+        checked++;
     }
-    free(finishedLayout);
+    printf("Checked %i core selections, %i mismatches.\n", checked, mismatches);
+    return mismatches;
 }
+#endif
 
 void printHelpMessage (const char* programName) {
     printf(helpMessage, programName, programName);
@@ -277,15 +902,14 @@ void printCoreGateList() {
             "    POutput     short for 'primary output', Note: If this core is chosen, the argument input-positions is ignored.\n");
 }
 
-int* extractPositions (char* positionsText, int textSize) {
-    int* positions = (int*) malloc(sizeof(int) * textSize);
+//positions needs space for textSize entries
+void extractPositions (char* positionsText, int textSize, int* positions) {
     for(int i = 0; i < textSize; i++) {
         positions[i] = positionsText[i] - 48; // Conversion between ascii and the corresponding number
     }
-    return positions;
 }
 
-superTile* solver2in1out(int* inPositions, int* outPosition, char* coreName, bool printTheWirePaths) {
+superTile* solver2in1out(int* inPositions, int* outPosition, char* coreName, bool printTheWirePaths, superTile* super) {
     /** Matrix structure: Each (triple) represents one tile, and the respective [tree numbers] represent the core-connection, the next-clockwise-tile-connection and the outwards-connection, see diagram:
      * 
      *         ˍ---¯ ¯[2]ˍ ˍ---¯ ¯---ˍ
@@ -302,273 +926,118 @@ superTile* solver2in1out(int* inPositions, int* outPosition, char* coreName, boo
      *        |           |   /       |
      *         ¯---ˍ ˍ---¯ ¯[2]ˍ ˍ---¯
      */
-    wireType** outerTiles = (wireType**) malloc(sizeof(wireType*)*6);
-    for (int x = 0; x < 6; x++) {
-        outerTiles[x] = (wireType*) malloc(sizeof(wireType)*3);
-        for (int y = 0; y < 3; y++) {
-            outerTiles[x][y] = NaW;
-        }
-    }
+    wireType outerTiles[6][3];
+    initRouting(outerTiles, super);
 
-    gate* core;
+    gate* core = &super->core;
 
     //TODO Liste von Cores hinzufügen und diese auch nutzen um Hilfsnachricht entsprechend an zu passen.
     //TODO This is a placeholder, in the future an actual lookup has to happen and it would be wise to check if the given core has to required amount of in/out connections
     if (!strcmp(coreName, "BLGR")) {
-        core = getYCoreUpright(inPositions, outPosition);
-        if (core == NULL) {
-            printf("There is no core gate orientation that would generate a possible layout.\n");
+        if (!getYCoreUpright(inPositions, outPosition, core)) {
+            fprintf(stderr, "There is no core gate orientation that would generate a possible layout.\n");
             return NULL;
         }
-        core->name = coreName;
-        
-        //TODO vvvvvv ############################### until this same sigen this has been copied from below, needs refactoring and cleanup ############################### vvvvvv
-        //Connect output
-        outerTiles[core->outPositions[0]][0] = out1;
-        outerTiles[outPosition[0]][2] = out1;
-        bool clockwiseOutput = specialGoClockwise(core->outPositions[0], outPosition[0], (core->outPositions[0] + 1) % 6); //TODO eigene goClockwise methode schreiben, sonst muss man 'otherStart' wie hier mit etwas füllen das eigentlich algorithmisch unnötig ist weil der Output nie gegenüber liegen sollte
-        if (core->outPositions[0] != outPosition[0]) {
-           int currentPos = core->outPositions[0];
-           if (clockwiseOutput) {
-               while (currentPos != outPosition[0]) {
-                   outerTiles[currentPos][1] = out1;
-                   currentPos = (currentPos + 1) % 6;;
-               }
-           } else {
-               do {
-                   currentPos = mod((currentPos - 1), 6);
-                   outerTiles[currentPos][1] = out1;
-               } while (currentPos != outPosition[0]);
-           }
-        }
-
-        //Connect inputs
-
-        //Get the superTileConnections and the coreConnections in an order in which you can connect them without crossings
-        //TODO optimierung durch sortierte Eingabe möglich?
-        int coreIns[2];
-        int superTileIns[2];
-        int temp = 0;
-        int pos = outPosition[0];
-        //TODO beiden Suchen kombinieren
-        while (temp < 2) { //core
-            if (core->inPositions[0] == pos || core->inPositions[1] == pos) {
-                coreIns[temp] = pos;
-                temp++;
-            }
-            if (clockwiseOutput) {
-                pos = (pos + 1 ) % 6;
-            } else {
-                pos = mod((pos - 1 ), 6);
-            }
-        }
-        temp = 0;
-        pos = outPosition[0];
-        while (temp < 2) { //superTile
-            if (inPositions[0] == pos || inPositions[1] == pos) {
-                superTileIns[temp] = pos;
-                temp++;
-            }
-            if (clockwiseOutput) {
-                pos = (pos + 1 ) % 6;
-            } else {
-                pos = mod((pos - 1 ), 6);
-            }
-        }
-        //Generate input path ...
-        //number 1.
-        outerTiles[coreIns[0]][0] = in1;
-        outerTiles[superTileIns[0]][2] = in1;
-        if (coreIns[0] != superTileIns[0]) {
-            int currentPos = coreIns[0];
-            if (specialGoClockwise(coreIns[0], superTileIns[0], coreIns[1])) {
-                while (currentPos != superTileIns[0]) {
-                    outerTiles[currentPos][1] = in1;
-                    currentPos = (currentPos + 1) % 6;
-                }
-            } else {
-                do {
-                    currentPos = mod((currentPos - 1), 6);
-                    outerTiles[currentPos][1] = in1;
-                } while (currentPos != superTileIns[0]);
-            }
-        }
-        //number 2.
-        outerTiles[coreIns[1]][0] = in2;
-        outerTiles[superTileIns[1]][2] = in2;
-        if (coreIns[1] != superTileIns[1]) {
-            int currentPos = coreIns[1];
-            if (specialGoClockwise(coreIns[1], superTileIns[1], coreIns[0])) {
-                while (currentPos != superTileIns[1]) {
-                    outerTiles[currentPos][1] = in2;
-                    currentPos = (currentPos + 1) % 6;
-                }
-            } else {
-                do {
-                    currentPos = mod((currentPos - 1), 6);
-                    outerTiles[currentPos][1] = in2;
-                } while (currentPos != superTileIns[1]);
-            }
-        }
-
-        //TODO ^^^^^^ ############################### this has been copied from below, needs refactoring and cleanup ############################### ^^^^^^
     } else if (!strcmp(coreName, "BLG")) {
         //Get best fitting core rotation
-        core = getYCore(inPositions, outPosition);
-        core->name = coreName;
-
-        //Connect output
-        outerTiles[core->outPositions[0]][0] = out1;
-        outerTiles[outPosition[0]][2] = out1;
-        bool clockwiseOutput = specialGoClockwise(core->outPositions[0], outPosition[0], (core->outPositions[0] + 1) % 6); //TODO eigene goClockwise methode schreiben, sonst muss man 'otherStart' wie hier mit etwas füllen das eigentlich algorithmisch unnötig ist weil der Output nie gegenüber liegen sollte
-        if (core->outPositions[0] != outPosition[0]) {
-           int currentPos = core->outPositions[0];
-           if (clockwiseOutput) {
-               while (currentPos != outPosition[0]) {
-                   outerTiles[currentPos][1] = out1;
-                   currentPos = (currentPos + 1) % 6;;
-               }
-           } else {
-               do {
-                   currentPos = mod((currentPos - 1), 6);
-                   outerTiles[currentPos][1] = out1;
-               } while (currentPos != outPosition[0]);
-           }
+        if (!getYCore(inPositions, outPosition, core)) {
+            fprintf(stderr, "Both inputs use the same position.\n");
+            return NULL;
         }
+    } else {
+        fprintf(stderr, "The given core name has not been found or a gate with this name is not available with 2 inputs and 1 output.\n");
+        return NULL;
+    }
+    core->name = coreName;
 
-        //Connect inputs
-
-        //Get the superTileConnections and the coreConnections in an order in which you can connect them without crossings
-        //TODO optimierung durch sortierte Eingabe möglich?
-        int coreIns[2];
-        int superTileIns[2];
-        int temp = 0;
-        int pos = outPosition[0];
-        //TODO beiden Suchen kombinieren
-        while (temp < 2) { //core
-            if (core->inPositions[0] == pos || core->inPositions[1] == pos) {
-                coreIns[temp] = pos;
-                temp++;
-            }
-            if (clockwiseOutput) {
-                pos = (pos + 1 ) % 6;
-            } else {
-                pos = mod((pos - 1 ), 6);
-            }
-        }
-        temp = 0;
-        pos = outPosition[0];
-        while (temp < 2) { //superTile
-            if (inPositions[0] == pos || inPositions[1] == pos) {
-                superTileIns[temp] = pos;
-                temp++;
-            }
-            if (clockwiseOutput) {
-                pos = (pos + 1 ) % 6;
-            } else {
-                pos = mod((pos - 1 ), 6);
-            }
+    //Connect output
+    bool clockwiseOutput = specialGoClockwise(core->outPositions[0], outPosition[0], (core->outPositions[0] + 1) % 6); //TODO eigene goClockwise methode schreiben, sonst muss man 'otherStart' wie hier mit etwas füllen das eigentlich algorithmisch unnötig ist weil der Output nie gegenüber liegen sollte
+    if (routeNet(outerTiles, super, out1, core->outPositions[0], PORT_CORE, outPosition[0], PORT_OUTSIDE, clockwiseOutput)) {
+        return NULL;
+    }
+
+    //Connect inputs
+
+    //Get the superTileConnections and the coreConnections in the order in which they follow the output around the ring, in this order they can be connected without crossings
+    int coreIns[2];
+    int superTileIns[2];
+    int coreInsFound = 0;
+    int superTileInsFound = 0;
+    int pos = outPosition[0];
+    while (coreInsFound < 2 || superTileInsFound < 2) {
+        if (coreInsFound < 2 && (core->inPositions[0] == pos || core->inPositions[1] == pos)) {
+            coreIns[coreInsFound] = pos;
+            coreInsFound++;
         }
-        //Generate input path ...
-        //number 1.
-        outerTiles[coreIns[0]][0] = in1;
-        outerTiles[superTileIns[0]][2] = in1;
-        if (coreIns[0] != superTileIns[0]) {
-            int currentPos = coreIns[0];
-            if (specialGoClockwise(coreIns[0], superTileIns[0], coreIns[1])) {
-                while (currentPos != superTileIns[0]) {
-                    outerTiles[currentPos][1] = in1;
-                    currentPos = (currentPos + 1) % 6;
-                }
-            } else {
-                do {
-                    currentPos = mod((currentPos - 1), 6);
-                    outerTiles[currentPos][1] = in1;
-                } while (currentPos != superTileIns[0]);
-            }
+        if (superTileInsFound < 2 && (inPositions[0] == pos || inPositions[1] == pos)) {
+            superTileIns[superTileInsFound] = pos;
+            superTileInsFound++;
         }
-        //number 2.
-        outerTiles[coreIns[1]][0] = in2;
-        outerTiles[superTileIns[1]][2] = in2;
-        if (coreIns[1] != superTileIns[1]) {
-            int currentPos = coreIns[1];
-            if (specialGoClockwise(coreIns[1], superTileIns[1], coreIns[0])) {
-                while (currentPos != superTileIns[1]) {
-                    outerTiles[currentPos][1] = in2;
-                    currentPos = (currentPos + 1) % 6;
-                }
-            } else {
-                do {
-                    currentPos = mod((currentPos - 1), 6);
-                    outerTiles[currentPos][1] = in2;
-                } while (currentPos != superTileIns[1]);
-            }
+        if (clockwiseOutput) {
+            pos = (pos + 1 ) % 6;
+        } else {
+            pos = mod((pos - 1 ), 6);
         }
-    } else {
-        printf("The given core name has not been found or a gate with this name is not available with 2 inputs and 1 output.\n");
+    }
+    if (routeNet(outerTiles, super, in1, coreIns[0], PORT_CORE, superTileIns[0], PORT_OUTSIDE, specialGoClockwise(coreIns[0], superTileIns[0], coreIns[1]))) {
         return NULL;
     }
-    
-    superTile* super = (superTile*) malloc(sizeof(superTile));
-    super->core = core;
-    super->wires = (gate**) malloc(sizeof(gate*)*6);
-
-    //Get the wire-gates which are required on the outside
-    for (int currentGate = 0; currentGate < 6; currentGate++) {
-        int* currentWirePositions = getWireTileConnections(outerTiles, currentGate);
-        if (currentWirePositions == NULL) {
-            for (int x = 0; x < 6; x++) {
-                free(outerTiles[x]);
-            }
-            free(outerTiles);
-            for (int x = 0; x < currentGate; x++) {
-                free(super->wires[x]);
-            }
-            free(super);
-            return NULL;
-        }
-
-        gate* wireGate = (gate*) malloc(sizeof(gate));
-    
-        if (getWireTile(currentWirePositions, currentGate, wireGate)) {
-            printf("A wire gate is required that is not yet implemented.\n");
-            for (int x = 0; x < 6; x++) {
-                free(outerTiles[x]);
-            }
-            free(outerTiles);
-            for (int x = 0; x < currentGate; x++) {
-                free(super->wires[x]);
-            }
-            free(super);
-            free(wireGate);
-            free(currentWirePositions);
-            return NULL;
-        }
-        free(currentWirePositions);
-
-        super->wires[currentGate] = wireGate;
+    if (routeNet(outerTiles, super, in2, coreIns[1], PORT_CORE, superTileIns[1], PORT_OUTSIDE, specialGoClockwise(coreIns[1], superTileIns[1], coreIns[0]))) {
+        return NULL;
     }
 
     if (printTheWirePaths) {
         printWirePaths(outerTiles, core); //Can be use for debugging
     }
-   
-    for (int x = 0; x < 6; x++) {
-        free(outerTiles[x]);
-    }
-    free(outerTiles);
 
     return super;
 }
 
+//Sets a Y-shaped core with the given output position, the inputs always lie on the other side of it
+void setYCore(gate* core, uint8_t outPosition) {
+    core->inPositionsSize = 2;
+    core->outPositionsSize = 1;
+    core->outPositions[0] = outPosition;
+    if (outPosition == 0 || outPosition == 5) {
+        core->inPositions[0] = 2;
+        core->inPositions[1] = 3;
+    } else {
+        core->inPositions[0] = 0;
+        core->inPositions[1] = 5;
+    }
+}
+
+//Returns the Y-shaped core from yCoreTable, which assumes it can be mirrored along the horizontal and vertical axis.
+//Returns false if both inputs use the same position.
+bool getYCore(int* inPositions, int* outPosition, gate* core) {
+    PROFILE_PHASE(PHASE_CORE_SELECTION);
+    if (inPositions[0] == inPositions[1]) {
+        return false;
+    }
+    setYCore(core, yCoreTable[perfectHash21(outPosition[0], inPositions[0], inPositions[1])]);
+    return true;
+}
+
+//Returns false if there is no core gate orientation that would generate a possible layout (see yCoreUprightTable)
+bool getYCoreUpright(int* inPositions, int* outPosition, gate* core) {
+    PROFILE_PHASE(PHASE_CORE_SELECTION);
+    if (inPositions[0] == inPositions[1]) {
+        return false;
+    }
+    uint8_t outPositionOfCore = yCoreUprightTable[perfectHash21(outPosition[0], inPositions[0], inPositions[1])];
+    if (outPositionOfCore == NO_CORE) {
+        return false;
+    }
+    setYCore(core, outPositionOfCore);
+    return true;
+}
+
+#ifdef SUPERTILE_LEGACY_CORES
 //Returns a Y-shaped core gate that assumes it can be mirrored along the horizontal and vertical axis
-gate* getYCore(int* inPositions, int* outPosition) {
+void getYCoreLegacy(int* inPositions, int* outPosition, gate* core) {
     //TODO optimize by grouping the core position setting together, and maybe creating a truth table OR decision tree and have a switch statement, this may be the ugliest code I have ever written
     //TODO other/additional optimization could be to sort the in/outPositions bevorhand to reduce the ammount of if-statements
-    gate* core = (gate*) malloc(sizeof(gate));
-    core->outPositions = (int*) malloc(sizeof(int)*1);
     core->outPositionsSize = 1;
-    core->inPositions = (int*) malloc(sizeof(int)*2);
     core->inPositionsSize = 2;
 
     if (outPosition[0] == 5) {
@@ -682,18 +1151,14 @@ gate* getYCore(int* inPositions, int* outPosition) {
             core->inPositions[1] = 5;
         }
     }
-
-    return core;
 }
 
-gate* getYCoreUpright(int* inPositions, int* outPosition) {
+//Returns false if there is no core gate orientation that would generate a possible layout
+bool getYCoreUprightLegacy(int* inPositions, int* outPosition, gate* core) {
     //TODO this is a modified clone of the method above, both can be reduced by:
     //TODO optimize by grouping the core position setting together, and maybe creating a truth table OR decision tree and have a switch statement, this may be the ugliest code I have ever written
     //TODO other/additional optimization could be to sort the in/outPositions bevorhand to reduce the ammount of if-statements
-    gate* core = (gate*) malloc(sizeof(gate));
-    core->outPositions = (int*) malloc(sizeof(int)*1);
     core->outPositionsSize = 1;
-    core->inPositions = (int*) malloc(sizeof(int)*2);
     core->inPositionsSize = 2;
 
     if (outPosition[0] == 5) {
@@ -702,8 +1167,7 @@ gate* getYCoreUpright(int* inPositions, int* outPosition) {
             core->inPositions[0] = 0;
             core->inPositions[1] = 5;
         } else {
-            freeGate(core);
-            return NULL;
+            return false;
         }
     } else if(outPosition[0] == 0) {
         if (inPositions[0] == 4 && inPositions[1] == 5 || inPositions[1] == 4 && inPositions[0] == 5) {
@@ -711,13 +1175,11 @@ gate* getYCoreUpright(int* inPositions, int* outPosition) {
             core->inPositions[0] = 0;
             core->inPositions[1] = 5;
         } else {
-            freeGate(core);
-            return NULL;
+            return false;
         }
     } else if (outPosition[0] == 2) {
         if (inPositions[0] == 3 && inPositions[1] == 4 || inPositions[1] == 3 && inPositions[0] == 4) {
-            freeGate(core);
-            return NULL;
+            return false;
         } else {
             core->outPositions[0] = 2;
             core->inPositions[0] = 0;
@@ -725,8 +1187,7 @@ gate* getYCoreUpright(int* inPositions, int* outPosition) {
         }
     } else if (outPosition[0] == 3) {
         if (inPositions[0] == 1 && inPositions[1] == 2 || inPositions[1] == 1 && inPositions[0] == 2) {
-            freeGate(core);
-            return NULL;
+            return false;
         } else {
             core->outPositions[0] = 3;
             core->inPositions[0] = 0;
@@ -739,8 +1200,7 @@ gate* getYCoreUpright(int* inPositions, int* outPosition) {
                 core->inPositions[0] = 0;
                 core->inPositions[1] = 5;
             } else { //inPositions[1] == 2 || inPositions[1] == 3
-                freeGate(core);
-                return NULL;
+                return false;
             }
         } else if (inPositions[1] == 4) {
             if (inPositions[0] == 0 || inPositions[0] == 5) {
@@ -748,8 +1208,7 @@ gate* getYCoreUpright(int* inPositions, int* outPosition) {
                 core->inPositions[0] = 0;
                 core->inPositions[1] = 5;
             } else { //inPositions[1] == 2 || inPositions[1] == 3
-                freeGate(core);
-                return NULL;
+                return false;
             }
         } else {
             //This option and the same orientation, just mirrored by the horizontal axis would be ok
@@ -764,8 +1223,7 @@ gate* getYCoreUpright(int* inPositions, int* outPosition) {
                 core->inPositions[0] = 0;
                 core->inPositions[1] = 5;
             } else { //inPositions[1] == 2 || inPositions[1] == 3
-                freeGate(core);
-                return NULL;
+                return false;
             }
         } else if (inPositions[1] == 1) {
             if (inPositions[0] == 0 || inPositions[0] == 5) {
@@ -773,8 +1231,7 @@ gate* getYCoreUpright(int* inPositions, int* outPosition) {
                 core->inPositions[0] = 0;
                 core->inPositions[1] = 5;
             } else { //inPositions[1] == 2 || inPositions[1] == 3
-                freeGate(core);
-                return NULL;
+                return false;
             }
         } else {
             //This option and the same orientation, just mirrored by the horizontal axis would be ok
@@ -784,149 +1241,61 @@ gate* getYCoreUpright(int* inPositions, int* outPosition) {
         }
     }
 
-    return core;
+    return true;
 }
+#endif
 
-superTile* solver1in1out(int* inPosition, int* outPosition, char* coreName, bool printTheWirePaths) {
-    wireType** outerTiles = (wireType**) malloc(sizeof(wireType*)*6);
-    for (int x = 0; x < 6; x++) {
-        outerTiles[x] = (wireType*) malloc(sizeof(wireType)*3);
-        for (int y = 0; y < 3; y++) {
-            outerTiles[x][y] = NaW;
-        }
-    }
+superTile* solver1in1out(int* inPosition, int* outPosition, char* coreName, bool printTheWirePaths, superTile* super) {
+    wireType outerTiles[6][3];
+    initRouting(outerTiles, super);
 
-    gate* core;
+    gate* core = &super->core;
 
     if (!strcmp(coreName, "Wire")) {
-        //Get best fitting core rotation
-        core = (gate*) malloc(sizeof(gate));
-        core->outPositions = (int*) malloc(sizeof(int)*1);
-        core->outPositionsSize = 1;
-        core->inPositions = (int*) malloc(sizeof(int)*1);
-        core->inPositionsSize = 1;
-
+        //The core is a straight wire itself, so both paths just go straight through their tile
         //core->name = coreName;
-        int* inOutPositions = (int*) malloc(sizeof(int)*4);
-        inOutPositions[0] = inPosition[0];
-        inOutPositions[1] = outPosition[0];
-        inOutPositions[2] = 42;
-        
-        getWireTile(inOutPositions, 5, core);
-        free(inOutPositions);
-
-        //Connect output
-        outerTiles[core->outPositions[0]][0] = out1;
-        outerTiles[outPosition[0]][2] = out1;
-
-        //Connect input
-        outerTiles[core->inPositions[0]][0] = in1;
-        outerTiles[inPosition[0]][2] = in1;
+        setWireGate(core, inPosition[0], outPosition[0]);
+        if (routeNet(outerTiles, super, out1, core->outPositions[0], PORT_CORE, outPosition[0], PORT_OUTSIDE, true)
+                || routeNet(outerTiles, super, in1, core->inPositions[0], PORT_CORE, inPosition[0], PORT_OUTSIDE, true)) {
+            return NULL;
+        }
     } else if (!strcmp(coreName, "Inverter")) {
         //Get best fitting core rotation
-        core = getICore(inPosition, outPosition);
+        getICore(inPosition, outPosition, core);
         core->name = coreName;
 
-        //Connect ouput
-        outerTiles[core->outPositions[0]][0] = out1;
-        outerTiles[outPosition[0]][2] = out1;
-        if (core->outPositions[0] != outPosition[0]) {
-           int currentPos = core->outPositions[0];
-           if (goClockwise(core->outPositions[0], outPosition[0], core->inPositions[0])) {
-               while (currentPos != outPosition[0]) {
-                   outerTiles[currentPos][1] = out1;
-                   currentPos = (currentPos + 1) % 6;;
-               }
-           } else {
-               do {
-                   currentPos = mod((currentPos - 1), 6);
-                   outerTiles[currentPos][1] = out1;
-               } while (currentPos != outPosition[0]);
-           }
-        }
-
-        //Connect input
-        outerTiles[core->inPositions[0]][0] = in1;
-        outerTiles[inPosition[0]][2] = in1;
-        if (core->inPositions[0] != inPosition[0]) {
-           int currentPos = core->inPositions[0];
-           if (goClockwise(core->inPositions[0], inPosition[0], core->outPositions[0])) {
-               while (currentPos != inPosition[0]) {
-                   outerTiles[currentPos][1] = in1;
-                   currentPos = (currentPos + 1) % 6;
-               }
-           } else {
-               do {
-                   currentPos = mod((currentPos - 1), 6);
-                   outerTiles[currentPos][1] = in1;
-               } while (currentPos != inPosition[0]);
-           }
+        if (routeNet(outerTiles, super, out1, core->outPositions[0], PORT_CORE, outPosition[0], PORT_OUTSIDE, goClockwise(core->outPositions[0], outPosition[0], core->inPositions[0]))
+                || routeNet(outerTiles, super, in1, core->inPositions[0], PORT_CORE, inPosition[0], PORT_OUTSIDE, goClockwise(core->inPositions[0], inPosition[0], core->outPositions[0]))) {
+            return NULL;
         }
     } else {
-        printf("The given core name has not been found or a gate with this name is not available with 1 inputs and 1 output.\n");
+        fprintf(stderr, "The given core name has not been found or a gate with this name is not available with 1 inputs and 1 output.\n");
         return NULL;
     }
 
-    superTile* super = (superTile*) malloc(sizeof(superTile));
-    super->core = core;
-    super->wires = (gate**) malloc(sizeof(gate*)*6);
-
-    //Get the wire-gates which are required on the outside
-    for (int currentGate = 0; currentGate < 6; currentGate++) {
-        int* currentWirePositions = getWireTileConnections(outerTiles, currentGate);
-        if (currentWirePositions == NULL) {
-            for (int x = 0; x < 6; x++) {
-                free(outerTiles[x]);
-            }
-            free(outerTiles);
-            for (int x = 0; x < currentGate; x++) {
-                free(super->wires[x]);
-            }
-            free(super);
-            return NULL;
-        }
-
-        gate* wireGate = (gate*) malloc(sizeof(gate));
-        if(getWireTile(currentWirePositions, currentGate, wireGate)){
-            printf("A wire gate is required that is not yet implemented.\n");
-            for (int x = 0; x < 6; x++) {
-                free(outerTiles[x]);
-            }
-            free(outerTiles);
-            for (int x = 0; x < currentGate; x++) {
-                free(super->wires[x]);
-            }
-            free(super);
-            free(wireGate);
-            free(currentWirePositions);
-            return NULL;
-        }
-        free(currentWirePositions);
-        //TODO combine the methods getWireTile() and giveWireGateName() (Besser gesagt man verschiebt giveWireGateName() in getWireTile()), there is no reason they should be seperate
-
-        super->wires[currentGate] = wireGate;
-    }
-    
     if (printTheWirePaths) {
         printWirePaths(outerTiles, core); // can be used for debugging
     }
-    
-    for (int x = 0; x < 6; x++) {
-        free(outerTiles[x]);
-    }
-    free(outerTiles);
 
     return super;
 }
 
-gate* getICore(int* inPosition, int* outPosition) {
+//Returns the orientation of the I-shaped core from iCoreTable
+void getICore(int* inPosition, int* outPosition, gate* core) {
+    PROFILE_PHASE(PHASE_CORE_SELECTION);
+    const uint8_t* orientation = iCoreTable[perfectHash11(inPosition[0], outPosition[0])];
+    core->inPositionsSize = 1;
+    core->outPositionsSize = 1;
+    core->inPositions[0] = orientation[0];
+    core->outPositions[0] = orientation[1];
+}
+
+#ifdef SUPERTILE_LEGACY_CORES
+void getICoreLegacy(int* inPosition, int* outPosition, gate* core) {
     // This is just copied and modified code from getYCore(), could be reworked
     //TODO optimize by grouping the core position setting together, and maybe creating a truth table OR decision tree and have a switch statement, this may be the ugliest code I have ever written
     //TODO other/additional optimization could be to sort the in/outPositions bevorhand to reduce the ammount of if-statements
-    gate* core = (gate*) malloc(sizeof(gate));
-    core->outPositions = (int*) malloc(sizeof(int)*1);
     core->outPositionsSize = 1;
-    core->inPositions = (int*) malloc(sizeof(int)*1);
     core->inPositionsSize = 1;
 
     switch (outPosition[0]) {
@@ -1005,98 +1374,50 @@ gate* getICore(int* inPosition, int* outPosition) {
             }
             break;
     }
-
-    return core;
 }
+#endif
 
-superTile* solver0in1out(int* outPosition, bool printTheWirePaths) {
-    wireType** outerTiles = (wireType**) malloc(sizeof(wireType*)*6);
-    for (int x = 0; x < 6; x++) {
-        outerTiles[x] = (wireType*) malloc(sizeof(wireType)*3);
-        for (int y = 0; y < 3; y++) {
-            outerTiles[x][y] = NaW;
-        }
-    }
+superTile* solver0in1out(int* outPosition, bool printTheWirePaths, superTile* super) {
+    wireType outerTiles[6][3];
+    initRouting(outerTiles, super);
 
-    gate* core;
+    gate* core = &super->core;
 
     //Get best fitting core rotation
-    core = (gate*) malloc(sizeof(gate));
-    core->outPositions = (int*) malloc(sizeof(int)*1);
-    core->outPositionsSize = 1;
-    core->inPositions = (int*) malloc(sizeof(int)*1);
-    core->inPositionsSize = 1;
-
     //core->name = coreName;
-    int* inOutPositions = (int*) malloc(sizeof(int)*4);
-    inOutPositions[0] = outPosition[0];
-    inOutPositions[1] = (outPosition[0] + 3) % 6; //to trick the method into giving us a "straight" wire
-    inOutPositions[2] = 42;
-    
-    getWireTile(inOutPositions, 5, core);
-    free(inOutPositions);
+    setWireGate(core, outPosition[0], (outPosition[0] + 3) % 6); //The second position is there to get a "straight" wire
 
     //Connect input
-    outerTiles[core->inPositions[0]][0] = in1;
-    outerTiles[outPosition[0]][2] = in1;
-
-    superTile* super = (superTile*) malloc(sizeof(superTile));
-    super->core = core;
-    super->wires = (gate**) malloc(sizeof(gate*)*6);
-
-    //Get the wire-gates which are required on the outside
-    for (int currentGate = 0; currentGate < 6; currentGate++) {
-        int* currentWirePositions = getWireTileConnections(outerTiles, currentGate);
-        if (currentWirePositions == NULL) {
-            for (int x = 0; x < 6; x++) {
-                free(outerTiles[x]);
-            }
-            free(outerTiles);
-            for (int x = 0; x < currentGate; x++) {
-                free(super->wires[x]);
-            }
-            free(super);
-            return NULL;
-        }
-
-        gate* wireGate = (gate*) malloc(sizeof(gate));
-        if(getWireTile(currentWirePositions, currentGate, wireGate)){
-            printf("A wire gate is required that is not yet implemented.\n");
-            for (int x = 0; x < 6; x++) {
-                free(outerTiles[x]);
-            }
-            free(outerTiles);
-            for (int x = 0; x < currentGate; x++) {
-                free(super->wires[x]);
-            }
-            free(super);
-            free(wireGate);
-            free(currentWirePositions);
-            return NULL;
-        }
-        free(currentWirePositions);
-        //TODO combine the methods getWireTile() and giveWireGateName() (Besser gesagt man verschiebt giveWireGateName() in getWireTile()), there is no reason they should be seperate
-
-        super->wires[currentGate] = wireGate;
+    if (routeNet(outerTiles, super, in1, core->inPositions[0], PORT_CORE, outPosition[0], PORT_OUTSIDE, true)) {
+        return NULL;
     }
-    
+
     if (printTheWirePaths) {
         printWirePaths(outerTiles, core); // can be used for debugging
     }
-    
-    for (int x = 0; x < 6; x++) {
-        free(outerTiles[x]);
-    }
-    free(outerTiles);
 
     return super;
 }
 
-gate* getXCore(int* inPositions, int* outPositions) {
-    gate* core = (gate*) malloc(sizeof(gate));
-    core->outPositions = (int*) malloc(sizeof(int)*2);
+//Returns the orientation of the X-shaped core from xCoreTable, false if the paths don't cross (then there is no orientation that would generate a possible layout)
+bool getXCore(int* inPositions, int* outPositions, gate* core) {
+    PROFILE_PHASE(PHASE_CORE_SELECTION);
+    if (inPositions[0] == inPositions[1] || outPositions[0] == outPositions[1] || !checkIfCrossing(inPositions[0], inPositions[1], outPositions[0], outPositions[1])) {
+        return false;
+    }
+    const uint8_t* orientation = xCoreTable[perfectHash22CROSSING(inPositions[0], outPositions[0], inPositions[1], outPositions[1])];
+    core->inPositionsSize = 2;
+    core->outPositionsSize = 2;
+    core->inPositions[0] = orientation[0];
+    core->inPositions[1] = orientation[1];
+    core->outPositions[0] = (orientation[0] + 3) % 6;
+    core->outPositions[1] = (orientation[1] + 3) % 6;
+    return true;
+}
+
+#ifdef SUPERTILE_LEGACY_CORES
+void getXCoreLegacy(int* inPositions, int* outPositions, gate* core) {
     core->outPositionsSize = 2;
-    core->inPositions = (int*) malloc(sizeof(int)*2);
     core->inPositionsSize = 2;
 
     bool mirrored = false;
@@ -1223,11 +1544,10 @@ gate* getXCore(int* inPositions, int* outPositions) {
 
     core->outPositions[0] = (core->inPositions[0] + 3) % 6;
     core->outPositions[1] = (core->inPositions[1] + 3) % 6;
-    
-    return core;
 }
+#endif
 
-superTile* solver2in2outCROSSING(int* inPositions, int* outPositions, bool printTheWirePaths) {
+superTile* solver2in2outCROSSING(int* inPositions, int* outPositions, bool printTheWirePaths, superTile* super) {
     /** Matrix structure: Each (triple) represents one tile, and the respective [tree numbers] represent the core-connection, the next-clockwise-tile-connection and the outwards-connection, see diagram:
      * 
      *         ˍ---¯ ¯[2]ˍ ˍ---¯ ¯---ˍ
@@ -1244,140 +1564,36 @@ superTile* solver2in2outCROSSING(int* inPositions, int* outPositions, bool print
      *        |           |   /       |
      *         ¯---ˍ ˍ---¯ ¯[2]ˍ ˍ---¯
      */
-    wireType** outerTiles = (wireType**) malloc(sizeof(wireType*)*6);
-    for (int x = 0; x < 6; x++) {
-        outerTiles[x] = (wireType*) malloc(sizeof(wireType)*3);
-        for (int y = 0; y < 3; y++) {
-            outerTiles[x][y] = NaW;
-        }
-    }
+    wireType outerTiles[6][3];
+    initRouting(outerTiles, super);
 
-    gate* core = getXCore(inPositions, outPositions);
+    gate* core = &super->core;
+    if (!getXCore(inPositions, outPositions, core)) {
+        fprintf(stderr, "The given paths don't cross, there is no core gate orientation that would generate a possible layout.\n");
+        return NULL;
+    }
     core->name = "CROSSING";
 
     //Connect inputs
-    outerTiles[core->inPositions[0]][0] = in1;
-    outerTiles[inPositions[0]][2] = in1;
-    if (core->inPositions[0] != inPositions[0]) {
-        int currentPos = core->inPositions[0];
-        if (goClockwise(core->inPositions[0], inPositions[0], inPositions[1])) {
-            while (currentPos != inPositions[0]) {
-                outerTiles[currentPos][1] = in1;
-                currentPos = (currentPos + 1) % 6;
-            }
-        } else {
-            do {
-                currentPos = mod((currentPos - 1), 6);
-                outerTiles[currentPos][1] = in1;
-            } while (currentPos != inPositions[0]);
-        }
-    }
-
-    outerTiles[core->inPositions[1]][0] = in2;
-    outerTiles[inPositions[1]][2] = in2;
-    if (core->inPositions[1] != inPositions[1]) {
-        int currentPos = core->inPositions[1];
-        if (goClockwise(core->inPositions[1], inPositions[1], inPositions[0])) {
-            while (currentPos != inPositions[1]) {
-                outerTiles[currentPos][1] = in2;
-                currentPos = (currentPos + 1) % 6;
-            }
-        } else {
-            do {
-                currentPos = mod((currentPos - 1), 6);
-                outerTiles[currentPos][1] = in2;
-            } while (currentPos != inPositions[1]);
-        }
+    if (routeNet(outerTiles, super, in1, core->inPositions[0], PORT_CORE, inPositions[0], PORT_OUTSIDE, goClockwise(core->inPositions[0], inPositions[0], inPositions[1]))
+            || routeNet(outerTiles, super, in2, core->inPositions[1], PORT_CORE, inPositions[1], PORT_OUTSIDE, goClockwise(core->inPositions[1], inPositions[1], inPositions[0]))) {
+        return NULL;
     }
 
     //Connect outputs
-    outerTiles[core->outPositions[0]][0] = out1;
-    outerTiles[outPositions[0]][2] = out1;
-    if (core->outPositions[0] != outPositions[0]) {
-        int currentPos = core->outPositions[0];
-        if (goClockwise(core->outPositions[0], outPositions[0], outPositions[1])) {
-            while (currentPos != outPositions[0]) {
-                outerTiles[currentPos][1] = out1;
-                currentPos = (currentPos + 1) % 6;
-            }
-        } else {
-            do {
-                currentPos = mod((currentPos - 1), 6);
-                outerTiles[currentPos][1] = out1;
-            } while (currentPos != outPositions[0]);
-        }
-    }
-
-    outerTiles[core->outPositions[1]][0] = out2;
-    outerTiles[outPositions[1]][2] = out2;
-    if (core->outPositions[1] != outPositions[1]) {
-        int currentPos = core->outPositions[1];
-        if (goClockwise(core->outPositions[1], outPositions[1], outPositions[0])) {
-            while (currentPos != outPositions[1]) {
-                outerTiles[currentPos][1] = out2;
-                currentPos = (currentPos + 1) % 6;
-            }
-        } else {
-            do {
-                currentPos = mod((currentPos - 1), 6);
-                outerTiles[currentPos][1] = out2;
-            } while (currentPos != outPositions[1]);
-        }
-    }
-
-    superTile* super = (superTile*) malloc(sizeof(superTile));
-    super->core = core;
-    super->wires = (gate**) malloc(sizeof(gate*)*6);
-
-    //Get the wire-gates which are required on the outside
-    for (int currentGate = 0; currentGate < 6; currentGate++) {
-        int* currentWirePositions = getWireTileConnections(outerTiles, currentGate);
-        if (currentWirePositions == NULL) {
-            for (int x = 0; x < 6; x++) {
-                free(outerTiles[x]);
-            }
-            free(outerTiles);
-            for (int x = 0; x < currentGate; x++) {
-                free(super->wires[x]);
-            }
-            free(super);
-            return NULL;
-        }
-
-        gate* wireGate = (gate*) malloc(sizeof(gate));
-    
-        if (getWireTile(currentWirePositions, currentGate, wireGate)) {
-            printf("A wire gate is required that is not yet implemented.\n");
-            for (int x = 0; x < 6; x++) {
-                free(outerTiles[x]);
-            }
-            free(outerTiles);
-            for (int x = 0; x < currentGate; x++) {
-                free(super->wires[x]);
-            }
-            free(super);
-            free(wireGate);
-            free(currentWirePositions);
-            return NULL;
-        }
-        free(currentWirePositions);
-
-        super->wires[currentGate] = wireGate;
+    if (routeNet(outerTiles, super, out1, core->outPositions[0], PORT_CORE, outPositions[0], PORT_OUTSIDE, goClockwise(core->outPositions[0], outPositions[0], outPositions[1]))
+            || routeNet(outerTiles, super, out2, core->outPositions[1], PORT_CORE, outPositions[1], PORT_OUTSIDE, goClockwise(core->outPositions[1], outPositions[1], outPositions[0]))) {
+        return NULL;
     }
 
     if (printTheWirePaths) {
         printWirePaths(outerTiles, core); //Can be use for debugging
     }
 
-    for (int x = 0; x < 6; x++) {
-        free(outerTiles[x]);
-    }
-    free(outerTiles);
-
     return super;
 }
 
-superTile* solver2in2outBYPASS(int* inPositions, int* outPositions, bool printTheWirePaths) {
+superTile* solver2in2outBYPASS(int* inPositions, int* outPositions, bool printTheWirePaths, superTile* super) {
     /** Matrix structure: Each (triple) represents one tile, and the respective [tree numbers] represent the core-connection, the next-clockwise-tile-connection and the outwards-connection, see diagram:
      * 
      *         ˍ---¯ ¯[2]ˍ ˍ---¯ ¯---ˍ
@@ -1394,100 +1610,25 @@ superTile* solver2in2outBYPASS(int* inPositions, int* outPositions, bool printTh
      *        |           |   /       |
      *         ¯---ˍ ˍ---¯ ¯[2]ˍ ˍ---¯
      */
-    wireType** outerTiles = (wireType**) malloc(sizeof(wireType*)*6);
-    for (int x = 0; x < 6; x++) {
-        outerTiles[x] = (wireType*) malloc(sizeof(wireType)*3);
-        for (int y = 0; y < 3; y++) {
-            outerTiles[x][y] = NaW;
-        }
-    }
+    wireType outerTiles[6][3];
+    initRouting(outerTiles, super);
 
-    gate* core = (gate*) malloc(sizeof(gate));
+    gate* core = &super->core;
     core->outPositionsSize = 0;
     core->inPositionsSize = 0;
+    core->shape = empty;
     core->name = "Bypass"; // Core is not actually used, but this is required for the reduced output later on
 
-    //Connect wire 1
-    outerTiles[inPositions[0]][2] = in1;
-    outerTiles[outPositions[0]][2] = in1;
-    int currentPos = inPositions[0];
-    if (goClockwise(inPositions[0], outPositions[0], outPositions[1])) {
-        do {
-            outerTiles[currentPos][1] = in1;
-            currentPos = (currentPos + 1) % 6;
-        } while (currentPos != outPositions[0]);
-    } else {
-        do {
-            currentPos = mod((currentPos - 1), 6);
-            outerTiles[currentPos][1] = in1;
-        } while (currentPos != outPositions[0]);
-    }
-
-    //Connect wire 2
-    outerTiles[inPositions[1]][2] = in2;
-    outerTiles[outPositions[1]][2] = in2;
-    currentPos = inPositions[1];
-    if (goClockwise(inPositions[1], outPositions[1], outPositions[0])) {
-        do {
-            outerTiles[currentPos][1] = in2;
-            currentPos = (currentPos + 1) % 6;
-        } while (currentPos != outPositions[1]);
-    } else {
-        do {
-            currentPos = mod((currentPos - 1), 6);
-            outerTiles[currentPos][1] = in2;
-        } while (currentPos != outPositions[1]);
+    //Both wires go from the outside of the super tile around the core back to the outside
+    if (routeNet(outerTiles, super, in1, inPositions[0], PORT_OUTSIDE, outPositions[0], PORT_OUTSIDE, goClockwise(inPositions[0], outPositions[0], outPositions[1]))
+            || routeNet(outerTiles, super, in2, inPositions[1], PORT_OUTSIDE, outPositions[1], PORT_OUTSIDE, goClockwise(inPositions[1], outPositions[1], outPositions[0]))) {
+        return NULL;
     }
 
     if (printTheWirePaths) {
         printWirePaths(outerTiles, core); //Can be use for debugging
     }
 
-    superTile* super = (superTile*) malloc(sizeof(superTile));
-    super->core = core;
-    super->wires = (gate**) malloc(sizeof(gate*)*6);
-
-    //Get the wire-gates which are required on the outside
-    for (int currentGate = 0; currentGate < 6; currentGate++) {
-        int* currentWirePositions = getWireTileConnections(outerTiles, currentGate);
-        if (currentWirePositions == NULL) {
-            for (int x = 0; x < 6; x++) {
-                free(outerTiles[x]);
-            }
-            free(outerTiles);
-            for (int x = 0; x < currentGate; x++) {
-                free(super->wires[x]);
-            }
-            free(super);
-            return NULL;
-        }
-
-        gate* wireGate = (gate*) malloc(sizeof(gate));
-    
-        if (getWireTile(currentWirePositions, currentGate, wireGate)) {
-            printf("A wire gate is required that is not yet implemented.\n");
-            for (int x = 0; x < 6; x++) {
-                free(outerTiles[x]);
-            }
-            free(outerTiles);
-            for (int x = 0; x < currentGate; x++) {
-                free(super->wires[x]);
-            }
-            free(super);
-            free(wireGate);
-            free(currentWirePositions);
-            return NULL;
-        }
-        free(currentWirePositions);
-
-        super->wires[currentGate] = wireGate;
-    }
-
-    for (int x = 0; x < 6; x++) {
-        free(outerTiles[x]);
-    }
-    free(outerTiles);
-
     return super;
 }
 
@@ -1551,288 +1692,113 @@ int mod(int k, int n) {
     return ((k %= n) < 0) ? k+n : k;
 }
 
-//Returns NULL when error happens
-//Returns input and output positions, sorted by their connection, for the selected tile, generated from the general wire positions specified by outerTiles.
-int* getWireTileConnections(wireType** outerTiles, int tile) {
-    //get Positions for each wire (the positions 0 to 3 numbered clockwise, starting with 0 for the position of the connections to another supertile)
-    //                            (this makes the calculations in getWireTile() easier)
-    wireType firstType = NaW;
-    int firstPosition[2];
-    int firstCount = 0;
-    wireType secondType = NaW;
-    int secondPosition[2];
-    int secondCount = 0;
-
-    if (outerTiles[mod(tile - 1, 6)][1] != NaW) {
-        firstType = outerTiles[mod(tile - 1, 6)][1];
-        firstPosition[0] = 3;
-        firstCount = 1;
-    }
-    if (outerTiles[tile][0] != NaW) {
-        if (firstCount == 0) {
-            firstType = outerTiles[tile][0];
-            firstPosition[0] = 2;
-            firstCount = 1;
-        } else if (outerTiles[tile][0] == firstType) {
-            firstPosition[1] = 2;
-            firstCount = 2;
-        } else {
-            secondType = outerTiles[tile][0];
-            secondPosition[0] = 2;
-            secondCount = 1;
-        }
-    }
-    if (outerTiles[tile][1] != NaW) {
-        if (firstCount == 0) {
-            firstType = outerTiles[tile][1];
-            firstPosition[0] = 1;
-            firstCount = 1;
-        } else if (outerTiles[tile][1] == firstType && firstCount < 2) {
-            firstPosition[firstCount] = 1;
-            firstCount++;
-        } else if (secondCount == 0) {
-            secondType = outerTiles[tile][1];
-            secondPosition[0] = 1;
-            secondCount = 1;
-        } else if (outerTiles[tile][1] == secondType) {
-            secondPosition[1] = 1;
-            secondCount = 2;
-        } else {
-            printf("ERROR Third wire in a tile or tile with wire with more then 3 connections found, this means the supertile layout generation was faulty.\n");
-            return NULL;
-        }
-    }
-    if (outerTiles[tile][2] != NaW) {
-        if (firstCount == 0) {
-            firstCount = 1; //Nothing more needed here, is just here to throw the error in the following check.
-        } else if (outerTiles[tile][2] == firstType && firstCount < 2) {
-            firstPosition[firstCount] = 0;
-            firstCount++;
-        }  else if (secondCount == 0) {
-            secondCount = 1; //Nothing more needed here, is just here to throw the error in the following check.
-        } else if (outerTiles[tile][2] == secondType && secondCount < 2) {
-            secondPosition[secondCount] = 0;
-            secondCount++;
-        } else {
-            printf("ERROR Third wire in a tile or tile with wire with more then 3 connections found, this means the supertile layout generation was faulty.\n");
-            return NULL;
-        }
-    }
-
-    //Check if there are two connections for each wire
-    if (firstCount == 1 || secondCount == 1) {
-        printf("ERROR impossible tile with a wire with just one connections was found.\n");
-        return NULL;
-    }
+//Routing of the wires around the core: every path (net) is walked once from its start to its end, every tile it passes gets the wire between the two connections the path uses in this tile.
+//The wire gates are built while walking, the 'enum wire' value of a tile is just the combination of the wires of all paths through it.
+//outerTiles keeps which path uses which connection, to find paths that would share a connection, and for printWirePaths().
 
-    //Check if a wire has three or more connections
-    if (firstCount > 2 || secondCount > 2) {
-        printf("ERROR impossible tile with a wire with three ore more connections was found.\n");
-        return NULL;
+//Clears the matrix and makes every outer tile an empty wire gate
+void initRouting(wireType outerTiles[6][3], superTile* super) {
+    for (int x = 0; x < 6; x++) {
+        for (int y = 0; y < 3; y++) {
+            outerTiles[x][y] = NaW;
+        }
+        super->wires[x].name = "-";
+        super->wires[x].inPositionsSize = 0;
+        super->wires[x].outPositionsSize = 0;
+        super->wires[x].shape = empty;
     }
+}
 
-    int* connectionPositions = (int*) malloc(sizeof(int)*4);
-    if (firstCount == 0) {
-        connectionPositions[0] = 42; //Represents empty connectionsPositons array and by extension, an empty tile (42 was chosen because it is the answer the Ultimate Question of Life, the Universe, and Everything.)
-    } else if (secondCount == 0) {
-        connectionPositions[0] = firstPosition[0];
-        connectionPositions[1] = firstPosition[1];
-        connectionPositions[2] = 42;
-    } else {
-        connectionPositions[0] = firstPosition[0];
-        connectionPositions[1] = firstPosition[1];
-        connectionPositions[2] = secondPosition[0];
-        connectionPositions[3] = secondPosition[1];
+//Routes a path from the connection fromPort of the tile fromTile around the core to the connection toPort of the tile toTile, returns true when error happend
+bool routeNet(wireType outerTiles[6][3], superTile* super, wireType net, int fromTile, tilePort fromPort, int toTile, tilePort toPort, bool clockwise) {
+    PROFILE_PHASE(PHASE_ROUTING);
+    int tile = fromTile;
+    tilePort entry = fromPort;
+    while (tile != toTile) {
+        if (connectPorts(outerTiles, &super->wires[tile], tile, entry, clockwise ? PORT_NEXT_TILE : PORT_PREVIOUS_TILE, net)) {
+            return true;
+        }
+        entry = clockwise ? PORT_PREVIOUS_TILE : PORT_NEXT_TILE;
+        tile = clockwise ? (tile + 1) % 6 : mod(tile - 1, 6);
     }
-    
-    return connectionPositions;
+    return connectPorts(outerTiles, &super->wires[tile], tile, entry, toPort, net);
 }
 
-//This method also sets the in/out connections in the gate it is given, returns true when error happend
-bool getWireTile(int* connectionPositions, int tile, gate* wireGate) {
-    wire name;
-    if (connectionPositions[0] == 42) { // => Empty array
-        name = empty;
-    } else {
-        //Getting the "true" positions of the tile in question
-        int trueFirstA = (connectionPositions[0] + (tile + 1)) % 6;
-        int trueFirstB = (connectionPositions[1] + (tile + 1)) % 6;
-        int trueFirstCombi = trueFirstA * 10 + trueFirstB;
-
-        wire firstWire = empty;
-        switch (trueFirstCombi) //TODO maybe make this switch it's own method to have cleaner code
-                                //TODO maybe sort the wire bevorehand to have less cases and more optimal code ?!
-        {
-        case 01:
-        case 10:
-            firstWire = wire01;
-            break;
-        case 02:
-        case 20:
-            firstWire = wire02;
-            break;
-        case 03:
-        case 30:
-            firstWire = wire03;
-            break;
-        case 04:
-        case 40:
-            firstWire = wire04;
-            break;
-        case 05:
-        case 50:
-            firstWire = wire05;
-            break;
-        case 12:
-        case 21:
-            firstWire = wire12;
-            break;
-        case 13:
-        case 31:
-            firstWire = wire13;
-            break;
-        case 14:
-        case 41:
-            firstWire = wire14;
-            break;
-        case 15:
-        case 51:
-            firstWire = wire15;
-            break;
-        case 23:
-        case 32:
-            firstWire = wire23;
-            break;
-        case 24:
-        case 42:
-            firstWire = wire24;
-            break;
-        case 25:
-        case 52:
-            firstWire = wire25;
-            break;
-        case 34:
-        case 43:
-            firstWire = wire34;
-            break;
-        case 35:
-        case 53:
-            firstWire = wire35;
-            break;
-        case 45:
-        case 54:
-            firstWire = wire45;
-            break;
+//The field of outerTiles that represents the connection of the tile (the connections to the neighbouring tiles are shared by both tiles)
+wireType* portField(wireType outerTiles[6][3], int tile, tilePort port) {
+    switch (port) {
+        case PORT_OUTSIDE:
+            return &outerTiles[tile][2];
+        case PORT_NEXT_TILE:
+            return &outerTiles[tile][1];
+        case PORT_CORE:
+            return &outerTiles[tile][0];
         default:
-            //TODO have error here, this should be impossible
-            break;
-        }
-
-        if (connectionPositions[2] == 42) {
-            wireGate->inPositions = (int*) malloc(sizeof(int)*1);
-            wireGate->inPositionsSize = 1;
-            wireGate->outPositions = (int*) malloc(sizeof(int)*1);
-            wireGate->outPositionsSize = 1;
-            wireGate->inPositions[0] = trueFirstA;
-            wireGate->outPositions[0] = trueFirstB;
-            name = firstWire;
-        } else {
-            //Getting the "true" positions of the tile in question
-            int trueSecondA = (connectionPositions[2] + (tile + 1)) % 6;
-            int trueSecondB = (connectionPositions[3] + (tile + 1)) % 6;
-            int trueSecondCombi = trueSecondA * 10 + trueSecondB;
-
-            wire secondWire = empty;
-            switch (trueSecondCombi) //TODO maybe makes this switch it's own method to have cleaner code
-                                     //TODO maybe sort the wire bevorehand to have less cases and more optimal code ?!
-            {
-            case 01:
-            case 10:
-                secondWire = wire01;
-                break;
-            case 02:
-            case 20:
-                secondWire = wire02;
-                break;
-            case 03:
-            case 30:
-                secondWire = wire03;
-                break;
-            case 04:
-            case 40:
-                secondWire = wire04;
-                break;
-            case 05:
-            case 50:
-                secondWire = wire05;
-                break;
-            case 12:
-            case 21:
-                secondWire = wire12;
-                break;
-            case 13:
-            case 31:
-                secondWire = wire13;
-                break;
-            case 14:
-            case 41:
-                secondWire = wire14;
-                break;
-            case 15:
-            case 51:
-                secondWire = wire15;
-                break;
-            case 23:
-            case 32:
-                secondWire = wire23;
-                break;
-            case 24:
-            case 42:
-                secondWire = wire24;
-                break;
-            case 25:
-            case 52:
-                secondWire = wire25;
-                break;
-            case 34:
-            case 43:
-                secondWire = wire34;
-                break;
-            case 35:
-            case 53:
-                secondWire = wire35;
-                break;
-            case 45:
-            case 54:
-                secondWire = wire45;
-                break;
-            default:
-                //TODO have error here, this should be impossible
-                break;
-            }
-
-            wireGate->inPositions = (int*) malloc(sizeof(int)*2);
-            wireGate->inPositionsSize = 2;
-            wireGate->outPositions = (int*) malloc(sizeof(int)*2);
-            wireGate->outPositionsSize = 2;
-            wireGate->inPositions[0] = trueFirstA;
-            wireGate->outPositions[0] = trueFirstB;
-            wireGate->inPositions[1] = trueSecondA;
-            wireGate->outPositions[1] = trueSecondB;
-            //Try to combine the two wires
-            name = (wire) (firstWire + secondWire);
-        }
+            return &outerTiles[mod(tile - 1, 6)][1];
     }
+}
 
-    if (!giveWireGateName(name, wireGate)) {
+//Adds the wire between the two connections of the tile to its wire gate, returns true when error happend
+bool connectPorts(wireType outerTiles[6][3], gate* wireGate, int tile, tilePort portA, tilePort portB, wireType net) {
+    wireType* fieldA = portField(outerTiles, tile, portA);
+    wireType* fieldB = portField(outerTiles, tile, portB);
+    if ((*fieldA != NaW && *fieldA != net) || (*fieldB != NaW && *fieldB != net)) {
+        fprintf(stderr, "ERROR Two wires would have to use the same connection of tile %i, this means the supertile layout generation was faulty.\n", tile);
+        return true;
+    }
+    *fieldA = net;
+    *fieldB = net;
+
+    //The wire goes from the connection with the higher number to the one with the lower number
+    if (portA < portB) {
+        tilePort temp = portA;
+        portA = portB;
+        portB = temp;
+    }
+    //Getting the "true" positions of the tile in question
+    uint8_t trueA = (portA + (tile + 1)) % 6;
+    uint8_t trueB = (portB + (tile + 1)) % 6;
+
+    //The wire that uses the connection with the highest number comes first
+    uint8_t index = wireGate->inPositionsSize;
+    if (index == 1 && portA > mod(wireGate->inPositions[0] - (tile + 1), 6)) {
+        wireGate->inPositions[1] = wireGate->inPositions[0];
+        wireGate->outPositions[1] = wireGate->outPositions[0];
+        index = 0;
+    }
+    wireGate->inPositions[index] = trueA;
+    wireGate->outPositions[index] = trueB;
+    wireGate->inPositionsSize++;
+    wireGate->outPositionsSize++;
+    wireGate->shape |= wireBetween(trueA, trueB);
+    if (!giveWireGateName((wire) wireGate->shape, wireGate)) {
+        fprintf(stderr, "A wire gate is required that is not yet implemented.\n");
         return true;
     }
+    return false;
+}
+
+//Makes the gate a single wire from inPosition to outPosition, e.g. for cores that are just a wire
+void setWireGate(gate* wireGate, int inPosition, int outPosition) {
+    PROFILE_PHASE(PHASE_CORE_SELECTION);
+    wireGate->inPositionsSize = 1;
+    wireGate->outPositionsSize = 1;
+    wireGate->inPositions[0] = inPosition;
+    wireGate->outPositions[0] = outPosition;
+    wireGate->shape = wireBetween(inPosition, outPosition);
+    giveWireGateName((wire) wireGate->shape, wireGate);
+}
 
-    return false; //represents a successfull execution
+//The standard wire between two different positions, the bits of 'enum wire' are ordered by the smaller and then the larger position
+wire wireBetween(int a, int b) {
+    int low = a < b ? a : b;
+    int high = a < b ? b : a;
+    return (wire) (1 << (low * (11 - low) / 2 + high - low - 1));
 }
 
 //Returns true if a wiregate with this name is implemented, false otherwise (Not all wires in this function have been implemented so far, but for testing it was assumend that they would be possible)
 bool giveWireGateName(wire wireName, gate* wireGate) {
+    PROFILE_PHASE(PHASE_WIRE_GATE_NAME);
     switch (wireName)
     {
     case empty:
@@ -1925,7 +1891,7 @@ bool giveWireGateName(wire wireName, gate* wireGate) {
 }
 
 //Mainly used for debugging
-void printWirePaths(wireType** outerTiles, gate* core) {
+void printWirePaths(wireType outerTiles[6][3], gate* core) {
     printf("Wire Paths:\n\n");
     printf("         ˍ---¯¯¯-%c-ˍ ˍ---¯¯¯---ˍ             The paths are not depicted directly, but at each position where a path corsses\n", getWireTypeSynonymA(outerTiles[5][2]));
     printf("        |           |           |            the border of a tile, a corresponding character is displayed.\n");
@@ -1975,49 +1941,45 @@ char getWireTypeSynonymB(wireType wire) {
 }
 
 void printLayout(superTile* finishedLayout) {
-    char* name = (char*) malloc(sizeof(char)*10);
-    char* inputs = (char*) malloc(sizeof(char)*10);
-    char* outputs = (char*) malloc(sizeof(char)*10);
+    char name[11] = {0}; //10 characters and the terminating 0, which setNormalised...() doesn't write
+    char inputs[11] = {0};
+    char outputs[11] = {0};
 
     printf("Finished Layout:\n\n");
     printf("         ˍ---¯¯¯---ˍ ˍ---¯¯¯---ˍ             Used gates:\n");
     printf("        |           |           |\n");
     printf("        |    (5)    |    (0)    |              Position  |   Name    |  Inputs   |  Outputs  \n");
     printf("        |           |           |            ------------|-----------|-----------|-----------\n");
-    setNormalisedString(finishedLayout->core->name, name);
-    setNormalisedNumbers(finishedLayout->core->inPositions, finishedLayout->core->inPositionsSize, inputs);
-    setNormalisedNumbers(finishedLayout->core->outPositions, finishedLayout->core->outPositionsSize, outputs);
-    printf("   ˍ---¯ ¯---ˍ ˍ---¯ ¯---ˍ ˍ---¯ ¯---ˍ        (Core)     | %s| %s| %s\n", !strcmp(finishedLayout->core->name, "Bypass")?("-         "):(name), inputs, outputs);
-    setNormalisedString(finishedLayout->wires[0]->name, name);
-    setNormalisedNumbers(finishedLayout->wires[0]->inPositions, finishedLayout->wires[0]->inPositionsSize, inputs);
-    setNormalisedNumbers(finishedLayout->wires[0]->outPositions, finishedLayout->wires[0]->outPositionsSize, outputs);
+    setNormalisedString(finishedLayout->core.name, name);
+    setNormalisedNumbers(finishedLayout->core.inPositions, finishedLayout->core.inPositionsSize, inputs);
+    setNormalisedNumbers(finishedLayout->core.outPositions, finishedLayout->core.outPositionsSize, outputs);
+    printf("   ˍ---¯ ¯---ˍ ˍ---¯ ¯---ˍ ˍ---¯ ¯---ˍ        (Core)     | %s| %s| %s\n", !strcmp(finishedLayout->core.name, "Bypass")?("-         "):(name), inputs, outputs);
+    setNormalisedString(finishedLayout->wires[0].name, name);
+    setNormalisedNumbers(finishedLayout->wires[0].inPositions, finishedLayout->wires[0].inPositionsSize, inputs);
+    setNormalisedNumbers(finishedLayout->wires[0].outPositions, finishedLayout->wires[0].outPositionsSize, outputs);
     printf("  |           |           |           |       (0)        | %s| %s| %s\n", name, inputs, outputs);
-    setNormalisedString(finishedLayout->wires[1]->name, name);
-    setNormalisedNumbers(finishedLayout->wires[1]->inPositions, finishedLayout->wires[1]->inPositionsSize, inputs);
-    setNormalisedNumbers(finishedLayout->wires[1]->outPositions, finishedLayout->wires[1]->outPositionsSize, outputs);
+    setNormalisedString(finishedLayout->wires[1].name, name);
+    setNormalisedNumbers(finishedLayout->wires[1].inPositions, finishedLayout->wires[1].inPositionsSize, inputs);
+    setNormalisedNumbers(finishedLayout->wires[1].outPositions, finishedLayout->wires[1].outPositionsSize, outputs);
     printf("  |    (4)    |   (Core)  |    (1)    |       (1)        | %s| %s| %s\n", name, inputs, outputs);
-    setNormalisedString(finishedLayout->wires[2]->name, name);
-    setNormalisedNumbers(finishedLayout->wires[2]->inPositions, finishedLayout->wires[2]->inPositionsSize, inputs);
-    setNormalisedNumbers(finishedLayout->wires[2]->outPositions, finishedLayout->wires[2]->outPositionsSize, outputs);
+    setNormalisedString(finishedLayout->wires[2].name, name);
+    setNormalisedNumbers(finishedLayout->wires[2].inPositions, finishedLayout->wires[2].inPositionsSize, inputs);
+    setNormalisedNumbers(finishedLayout->wires[2].outPositions, finishedLayout->wires[2].outPositionsSize, outputs);
     printf("  |           |           |           |       (2)        | %s| %s| %s\n", name, inputs, outputs);
-    setNormalisedString(finishedLayout->wires[3]->name, name);
-    setNormalisedNumbers(finishedLayout->wires[3]->inPositions, finishedLayout->wires[3]->inPositionsSize, inputs);
-    setNormalisedNumbers(finishedLayout->wires[3]->outPositions, finishedLayout->wires[3]->outPositionsSize, outputs);
+    setNormalisedString(finishedLayout->wires[3].name, name);
+    setNormalisedNumbers(finishedLayout->wires[3].inPositions, finishedLayout->wires[3].inPositionsSize, inputs);
+    setNormalisedNumbers(finishedLayout->wires[3].outPositions, finishedLayout->wires[3].outPositionsSize, outputs);
     printf("   ¯---ˍ ˍ---¯ ¯---ˍ ˍ---¯ ¯---ˍ ˍ---¯        (3)        | %s| %s| %s\n", name, inputs, outputs);
-    setNormalisedString(finishedLayout->wires[4]->name, name);
-    setNormalisedNumbers(finishedLayout->wires[4]->inPositions, finishedLayout->wires[4]->inPositionsSize, inputs);
-    setNormalisedNumbers(finishedLayout->wires[4]->outPositions, finishedLayout->wires[4]->outPositionsSize, outputs);
+    setNormalisedString(finishedLayout->wires[4].name, name);
+    setNormalisedNumbers(finishedLayout->wires[4].inPositions, finishedLayout->wires[4].inPositionsSize, inputs);
+    setNormalisedNumbers(finishedLayout->wires[4].outPositions, finishedLayout->wires[4].outPositionsSize, outputs);
     printf("        |           |           |             (4)        | %s| %s| %s\n", name, inputs, outputs);
-    setNormalisedString(finishedLayout->wires[5]->name, name);
-    setNormalisedNumbers(finishedLayout->wires[5]->inPositions, finishedLayout->wires[5]->inPositionsSize, inputs);
-    setNormalisedNumbers(finishedLayout->wires[5]->outPositions, finishedLayout->wires[5]->outPositionsSize, outputs);
+    setNormalisedString(finishedLayout->wires[5].name, name);
+    setNormalisedNumbers(finishedLayout->wires[5].inPositions, finishedLayout->wires[5].inPositionsSize, inputs);
+    setNormalisedNumbers(finishedLayout->wires[5].outPositions, finishedLayout->wires[5].outPositionsSize, outputs);
     printf("        |    (3)    |    (2)    |             (5)        | %s| %s| %s\n", name, inputs, outputs);
     printf("        |           |           |\n");
     printf("         ¯---ˍˍˍ---¯ ¯---ˍˍˍ---¯\n\n");
-
-    free(name);
-    free(inputs);
-    free(outputs);
 }
 
 void setNormalisedString(const char* name, char* normalised) {
@@ -2030,7 +1992,7 @@ void setNormalisedString(const char* name, char* normalised) {
     }
 }
 
-void setNormalisedNumbers(int* positions, int positionsSize, char* normalised) {
+void setNormalisedNumbers(uint8_t* positions, int positionsSize, char* normalised) {
     int x;
     for (x = 0; x < positionsSize * 2; x = x + 2) {
         normalised[x] = (char) (positions[x/2] + 48);
@@ -2042,10 +2004,23 @@ void setNormalisedNumbers(int* positions, int positionsSize, char* normalised) {
 }
 
 void printReducedLayout(superTile* layout) {
-    std::string coreName = layout->core->name;
+    char reducedLayout[256];
+    formatReducedLayout(layout, reducedLayout, sizeof(reducedLayout));
+    fputs(reducedLayout, stdout);
+}
+
+//Writes the reduced output into buffer, returns its length like snprintf()
+int formatReducedLayout(superTile* layout, char* buffer, int bufferSize) {
+    PROFILE_PHASE(PHASE_FORMATTING);
+    return snprintf(buffer, bufferSize, "%s, %s, %s, %s, %s, %s, %s", getReducedCoreName(layout).c_str(), layout->wires[0].name, layout->wires[1].name, layout->wires[2].name, layout->wires[3].name, layout->wires[4].name, layout->wires[5].name);
+}
+
+//The core name with the orientation of the core appended, as it is used in the reduced output
+std::string getReducedCoreName(superTile* layout) {
+    std::string coreName = layout->core.name;
 
-    if (!strcmp(layout->core->name, "Inverter")) {
-        switch (layout->core->inPositions[0]) {
+    if (!strcmp(layout->core.name, "Inverter")) {
+        switch (layout->core.inPositions[0]) {
             case 3:
                 coreName += "_3";
                 break;
@@ -2062,7 +2037,7 @@ void printReducedLayout(superTile* layout) {
                 coreName += "_Unknown core orientation";
                 break;
         }
-        switch (layout->core->outPositions[0]) {
+        switch (layout->core.outPositions[0]) {
             case 3:
                 coreName += "_3";
                 break;
@@ -2079,8 +2054,8 @@ void printReducedLayout(superTile* layout) {
                 coreName += "_Unknown core orientation";
                 break;
         }
-    } else if (!strcmp(layout->core->name, "CROSSING")) {
-         switch (layout->core->inPositions[0]) {
+    } else if (!strcmp(layout->core.name, "CROSSING")) {
+         switch (layout->core.inPositions[0]) {
             case 3:
                 coreName += "_3";
                 break;
@@ -2097,7 +2072,7 @@ void printReducedLayout(superTile* layout) {
                 coreName += "_Unknown core orientation";
                 break;
         }
-         switch (layout->core->inPositions[1]) {
+         switch (layout->core.inPositions[1]) {
             case 3:
                 coreName += "_3";
                 break;
@@ -2114,10 +2089,10 @@ void printReducedLayout(superTile* layout) {
                 coreName += "_Unknown core orientation";
                 break;
         }
-    } else if (!strcmp(layout->core->name, "Bypass")) {
+    } else if (!strcmp(layout->core.name, "Bypass")) {
         // Do nothing
     } else if (std::string::npos == (coreName.find("wire")) && std::string::npos == (coreName.find("WIRE"))) { // Used to identify the core gates based on their output direction, not required for wires since they are specified already
-        switch (layout->core->outPositions[0]) {
+        switch (layout->core.outPositions[0]) {
             case 3:
                 coreName += "_3";
                 break;
@@ -2135,11 +2110,47 @@ void printReducedLayout(superTile* layout) {
                 break;
         }
     }
-    printf("%s, %s, %s, %s, %s, %s, %s", coreName.c_str(), layout->wires[0]->name, layout->wires[1]->name, layout->wires[2]->name, layout->wires[3]->name, layout->wires[4]->name, layout->wires[5]->name);
+    return coreName;
 }
 
-void freeGate(gate* toFree) {
-    free(toFree->inPositions);
-    free(toFree->outPositions);
-    free(toFree);
-}
\ No newline at end of file
+//C interface for using the solvers without starting this program, e.g. from Python via ctypes (see supertile_library.py).
+//The CLI above uses the same solveSupertile() underneath. Returns one of the SUPERTILE_* status codes.
+extern "C" int supertileSolve(const char* coreName, const int* inPositions, int inPositionsSize, const int* outPositions, int outPositionsSize, supertileResult* result) {
+    if (inPositionsSize < 0 || inPositionsSize > 2 || outPositionsSize < 0 || outPositionsSize > 2) {
+        return SUPERTILE_NO_SOLVER;
+    }
+    //The solvers don't change their arguments, they are just not declared as const
+    int in[2];
+    int out[2];
+    memcpy(in, inPositions, sizeof(int) * inPositionsSize);
+    memcpy(out, outPositions, sizeof(int) * outPositionsSize);
+    if (findPositionConflict(in, inPositionsSize, out, outPositionsSize) != -1) {
+        return SUPERTILE_CONFLICT;
+    }
+
+    bool solverFound;
+    double milliseconds;
+    superTile layout;
+    superTile* finishedLayout = solveSupertile((char*) coreName, in, inPositionsSize, out, outPositionsSize, false, &solverFound, &milliseconds, &layout);
+    if (!solverFound) {
+        return SUPERTILE_NO_SOLVER;
+    }
+    if (finishedLayout == NULL) {
+        return SUPERTILE_FAILED;
+    }
+
+    std::string reducedCoreName = getReducedCoreName(finishedLayout);
+    strncpy(result->coreName, reducedCoreName.c_str(), sizeof(result->coreName) - 1);
+    result->coreName[sizeof(result->coreName) - 1] = 0;
+    result->coreInPositionsSize = finishedLayout->core.inPositionsSize;
+    result->coreOutPositionsSize = finishedLayout->core.outPositionsSize;
+    for (int x = 0; x < 2; x++) {
+        result->coreInPositions[x] = x < result->coreInPositionsSize ? finishedLayout->core.inPositions[x] : -1;
+        result->coreOutPositions[x] = x < result->coreOutPositionsSize ? finishedLayout->core.outPositions[x] : -1;
+    }
+    for (int x = 0; x < 6; x++) {
+        result->wires[x] = finishedLayout->wires[x].shape;
+    }
+    result->milliseconds = milliseconds;
+    return SUPERTILE_OK;
+}
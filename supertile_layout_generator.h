@@ -0,0 +1,34 @@
+#ifndef SUPERTILE_LAYOUT_GENERATOR_H
+#define SUPERTILE_LAYOUT_GENERATOR_H
+
+//C interface of supertile_layout_generator.cpp, build it as shared library with:
+//    g++ -shared -fPIC -DSUPERTILE_LIBRARY -o libsupertile_layout_generator.so supertile_layout_generator.cpp
+
+enum supertileStatus {
+    SUPERTILE_OK = 0,
+    SUPERTILE_NO_SOLVER = 1, //There is no solver for this core and number of in/outputs
+    SUPERTILE_FAILED = 2, //The solver could not generate a layout
+    SUPERTILE_CONFLICT = 3 //A position is used as input and output at the same time
+};
+
+struct supertileResult {
+    char coreName[32]; //The core name with its orientation, as in the reduced output (-r), e.g. "BLG_2"
+    int coreInPositions[2]; //Unused positions are -1
+    int coreInPositionsSize;
+    int coreOutPositions[2];
+    int coreOutPositionsSize;
+    int wires[6]; //The 'enum wire' value of each of the six outer tiles, listed clockwise starting at position 0
+    double milliseconds; //The time the solver took
+};
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+int supertileSolve(const char* coreName, const int* inPositions, int inPositionsSize, const int* outPositions, int outPositionsSize, struct supertileResult* result);
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif
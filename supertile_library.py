@@ -0,0 +1,82 @@
+import ctypes
+from collections import namedtuple
+
+# Binding for the C interface of supertile_layout_generator.cpp (see supertile_layout_generator.h), build the library with
+#     g++ -shared -fPIC -DSUPERTILE_LIBRARY -o libsupertile_layout_generator.so supertile_layout_generator.cpp
+
+LIBRARY_PATH = "./libsupertile_layout_generator.so"
+
+# Same values as 'enum supertileStatus'
+SUPERTILE_OK = 0
+SUPERTILE_NO_SOLVER = 1
+SUPERTILE_FAILED = 2
+SUPERTILE_CONFLICT = 3
+
+# coreName is the name with the core orientation, as in the reduced output (e.g. "BLG_2"),
+# wires holds the 'enum wire' value of the six outer tiles (clockwise, starting at position 0)
+SuperTile = namedtuple("SuperTile", ["coreName", "coreInPositions", "coreOutPositions", "wires"])
+
+# The values of 'enum wire'
+WIRE_CODES = {
+    "-" : 0,
+    # Standard wires:
+    "wire01" : 1, "wire02" : 2, "wire03" : 4, "wire04" : 8, "wire05" : 16, "wire12" : 32, "wire13" : 64, "wire14" : 128,
+    "wire15" : 256, "wire23" : 512, "wire24" : 1024, "wire25" : 2048, "wire34" : 4096, "wire35" : 8192, "wire45" : 16384,
+    # Double wires with on straight wire
+    "wire14_23" : 640, "wire25_34" : 6144, "wire03_45" : 16388, "wire14_05" : 144, "wire25_01" : 2049, "wire03_12" : 36,
+    # Double wires with both wires bend
+    "wire12_34" : 4128, "wire23_45" : 16896, "wire34_05" : 4112, "wire45_01" : 16385, "wire05_12" : 48, "wire01_23" : 513
+}
+WIRE_NAMES = {wireCode : wireName for wireName, wireCode in WIRE_CODES.items()}
+
+# Each bit of an 'enum wire' value stands for one of these connections, starting with the lowest bit
+WIRE_CONNECTIONS = [[0, 1], [0, 2], [0, 3], [0, 4], [0, 5], [1, 2], [1, 3], [1, 4], [1, 5], [2, 3], [2, 4], [2, 5], [3, 4], [3, 5], [4, 5]]
+
+class SupertileResult(ctypes.Structure) :
+    _fields_ = [
+        ("coreName", ctypes.c_char * 32),
+        ("coreInPositions", ctypes.c_int * 2),
+        ("coreInPositionsSize", ctypes.c_int),
+        ("coreOutPositions", ctypes.c_int * 2),
+        ("coreOutPositionsSize", ctypes.c_int),
+        ("wires", ctypes.c_int * 6),
+        ("milliseconds", ctypes.c_double),
+    ]
+
+# The positions of wire cores are dropped, like parseReducedLayout() of lookup_table_generator.py has to, so both backends return the same SuperTile
+def superTileOfResult(result) :
+    coreName = result.coreName.decode()
+    if coreName.startswith("wire") :
+        return SuperTile(coreName, (), (), tuple(result.wires))
+    return SuperTile(
+        coreName,
+        tuple(result.coreInPositions[:result.coreInPositionsSize]),
+        tuple(result.coreOutPositions[:result.coreOutPositionsSize]),
+        tuple(result.wires))
+
+class SupertileLibrary :
+    def __init__(self, path=LIBRARY_PATH) :
+        self.library = ctypes.CDLL(path)
+        self.library.supertileSolve.argtypes = [ctypes.c_char_p, ctypes.POINTER(ctypes.c_int), ctypes.c_int, ctypes.POINTER(ctypes.c_int), ctypes.c_int, ctypes.POINTER(SupertileResult)]
+        self.library.supertileSolve.restype = ctypes.c_int
+
+    # inputPositions and outputPositions are sequences of positions (0 to 5), the same as the positional arguments of the CLI
+    def solve(self, gate, inputPositions, outputPositions) :
+        return superTileOfResult(self.solveRaw(gate, inputPositions, outputPositions))
+
+    # returns the SupertileResult itself, which additionally contains the time the solver took
+    def solveRaw(self, gate, inputPositions, outputPositions) :
+        inPositions = (ctypes.c_int * len(inputPositions))(*inputPositions)
+        outPositions = (ctypes.c_int * len(outputPositions))(*outputPositions)
+        result = SupertileResult()
+        status = self.library.supertileSolve(gate.encode(), inPositions, len(inputPositions), outPositions, len(outputPositions), ctypes.byref(result))
+        if status == SUPERTILE_OK :
+            return result
+        elif status == SUPERTILE_NO_SOLVER :
+            raise RuntimeError("There has been no solver implemented for " + gate + " with " + str(len(inputPositions)) + " inputs and " + str(len(outputPositions)) + " outputs")
+        elif status == SUPERTILE_FAILED :
+            raise RuntimeError("Something went wrong during layout generation of " + gate + " " + str(list(inputPositions)) + " " + str(list(outputPositions)))
+        elif status == SUPERTILE_CONFLICT :
+            raise RuntimeError("Conflict between inputs and outputs of " + gate + " " + str(list(inputPositions)) + " " + str(list(outputPositions)))
+        else :
+            raise RuntimeError("Unknown status " + str(status) + " from supertileSolve")
@@ -0,0 +1,84 @@
+import itertools
+
+import numpy as np
+
+from lookup_table_generator import (checkIfCrossing, perfectHashFunction10, perfectHashFunction11, perfectHashFunction21,
+    perfectHashFunction22BYPASS, perfectHashFunction22CROSSING)
+from supertile_table_formats import HEX_DIRECTIONS, parseHeaderTables, readBinaryTables
+
+# Answers queries on the tables of supertile_lookup_tables.hpp from Python, without running the generator again.
+# Every table is one contiguous uint8 array (entries x supertileSize) with the values of 'enum hex_direction'.
+# The slot of an entry is found with the same perfect hash functions the generator used, evaluated once for every
+# possible argument and stored in a small array, so a batch of queries is just two fancy indexing operations.
+
+HEADER_PATH = "supertile_lookup_tables.hpp"
+
+X = HEX_DIRECTIONS["X"]
+C = HEX_DIRECTIONS["C"]
+
+INVALID_SLOT = -1
+
+def distinct(*positions) :
+    return len(set(positions)) == len(positions)
+
+# The arguments of every table in the order of its perfect hash function, which arguments are valid and the hash function itself
+TABLE_ARGUMENTS = {
+    "lookup_table_2in1out" : (("output", "input1", "input2"), distinct, perfectHashFunction21),
+    "lookup_table_1in2out" : (("input", "output1", "output2"), distinct, perfectHashFunction21),
+    "lookup_table_1in1out_WIRE" : (("input", "output"), distinct, perfectHashFunction11),
+    "lookup_table_1in1out_INVERTER" : (("input", "output"), distinct, perfectHashFunction11),
+    "lookup_table_1in0out" : (("input",), distinct, perfectHashFunction10),
+    "lookup_table_0in1out" : (("output",), distinct, perfectHashFunction10),
+    "lookup_table_2in2out_CROSSING" : (("input1", "output1", "input2", "output2"),
+        lambda in1, out1, in2, out2 : distinct(in1, out1, in2, out2) and checkIfCrossing(in1, in2, out1, out2), perfectHashFunction22CROSSING),
+    "lookup_table_2in2out_BYPASS" : (("input1", "output1", "input2", "output2"),
+        lambda in1, out1, in2, out2 : distinct(in1, out1, in2, out2) and not checkIfCrossing(in1, in2, out1, out2), perfectHashFunction22BYPASS),
+}
+
+# position x ... x position -> slot, INVALID_SLOT for arguments that are not in the table
+def buildSlotArray(argumentCount, isValid, perfectHashFunction) :
+    slots = np.full((6,) * argumentCount, INVALID_SLOT, dtype=np.int16)
+    for arguments in itertools.product(range(6), repeat=argumentCount) :
+        if isValid(*arguments) :
+            slots[arguments] = perfectHashFunction(*arguments)
+    return slots
+
+SLOTS = {name : buildSlotArray(len(argumentNames), isValid, perfectHashFunction) for name, (argumentNames, isValid, perfectHashFunction) in TABLE_ARGUMENTS.items()}
+
+class SupertileLookup :
+    def __init__(self, tables) :
+        self.tables = {name : np.ascontiguousarray(table, dtype=np.uint8) for name, table in tables.items()}
+
+    @classmethod
+    def fromHeader(cls, path=HEADER_PATH) :
+        with open(path) as headerFile :
+            return cls(parseHeaderTables(headerFile.read()))
+
+    # The binary format of supertile_table_formats.py (lookup_table_generator.py --binary)
+    @classmethod
+    def fromBinary(cls, path) :
+        return cls(readBinaryTables(path))
+
+    # Arrays (or single positions) in the order of TABLE_ARGUMENTS[name], returns the slots with the shape of the arguments
+    def slots(self, name, *arguments) :
+        argumentNames = TABLE_ARGUMENTS[name][0]
+        if len(arguments) != len(argumentNames) :
+            raise TypeError(name + " needs the arguments " + ", ".join(argumentNames))
+        positions = [np.asarray(argument, dtype=np.intp) for argument in arguments]
+        outOfRange = np.zeros(np.broadcast(*positions).shape, dtype=bool)
+        for position in positions :
+            outOfRange |= (position < 0) | (position > 5)
+        slots = SLOTS[name][tuple(np.where(outOfRange, 0, position) for position in positions)]
+        slots = np.where(outOfRange, INVALID_SLOT, slots)
+        if (slots == INVALID_SLOT).any() :
+            raise ValueError(str(np.count_nonzero(slots == INVALID_SLOT)) + " of the arguments are not part of " + name)
+        return slots
+
+    # The entry of one supertile, e.g. lookup("lookup_table_2in1out", output, input1, input2)
+    def lookup(self, name, *arguments) :
+        return self.tables[name][int(self.slots(name, *arguments))]
+
+    # The entries of many supertiles at once, every argument is an array with one position per supertile.
+    # Returns an array with one row (entry) per supertile.
+    def lookupBatch(self, name, *arguments) :
+        return self.tables[name][self.slots(name, *arguments)]
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+from collections import namedtuple
+
+from supertile_expansion import entryPaths
+from supertile_paths import CORE
+from supertile_router import Router, SupertileGraph, addCosts, gateOptions, subtractCosts, NO_COST
+from supertile_sidb import SiDBGateLibrary
+
+# Optimisation of the lookup tables: the solvers of supertile_layout_generator.cpp take the first routing they find for a configuration
+# (the first core orientation and direction that works), which isn't always the shortest one. For every entry of a table, all routings of
+# its configuration are searched with Router.routeOptimal() (every core orientation and every path, with branch and bound) and the cheapest
+# replaces the entry of the solver if it costs less and fits into the width of the table.
+#
+# The cost of a routing are its SiDBs, then the tiles with wires and then the number of wires (compared in this order). The SiDBs of a wire
+# are the dots of its design in SiDBImplementations (see SiDBGateLibrary.wireDotCounts()), the gates in the core are the same for every
+# routing of a configuration, so they aren't counted. Entries are only ever replaced by cheaper ones, so an optimised table never costs more.
+# The wires without a design only have an estimated cost, so an entry is only replaced if neither it nor its replacement uses one of them,
+# the savings are always counted in real dots.
+
+# Table -> gate class of the router, number of paths that go from an input to the core (None if every path goes from an input to an output)
+# and gate type of the core (as in fiction's .fgl files, only to look up the tiles of an entry)
+TableGate = namedtuple("TableGate", ["gate", "inputPaths", "gateType"])
+TABLE_GATES = {
+    "lookup_table_2in1out" : TableGate("BLG", 2, "AND"),
+    "lookup_table_1in2out" : TableGate("BLGR", 1, "FANOUT"),
+    "lookup_table_1in1out_WIRE" : TableGate("Wire", None, None),
+    "lookup_table_1in1out_INVERTER" : TableGate("Inverter", 1, "NOT"),
+    "lookup_table_1in0out" : TableGate("POutput", 1, "PO"),
+    "lookup_table_2in2out_CROSSING" : TableGate("Crossing", None, None),
+    "lookup_table_2in2out_BYPASS" : TableGate("Bypass", None, None),
+}
+
+EMPTY = "-1"
+X = 6
+
+# Totals of a table before and after the optimisation, costs as (SiDBs, tiles, wires). estimated counts the entries with a cheaper
+# routing that wasn't used because it or the entry has wires without a design. cached is set for the reports of tables
+# that were reused from the cache of lookup_table_generator.py instead of being optimised again.
+TableReport = namedtuple("TableReport", ["name", "entries", "improved", "estimated", "before", "after", "cached"], defaults=(False,))
+
+def sourceHash(*modules) :
+    digest = hashlib.sha256()
+    for module in modules :
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), module), "rb") as sourceFile :
+            digest.update(sourceFile.read())
+    return digest.hexdigest()
+
+# The ports of an entry (ints, X as separator) as (inputs, outputs)
+def entryPorts(name, entry) :
+    paths = entryPaths(entry)
+    inputPaths = TABLE_GATES[name].inputPaths
+    if inputPaths is None :
+        return tuple(path[0] for path in paths), tuple(path[-1] for path in paths)
+    return tuple(path[0] for path in paths[:inputPaths]), tuple(path[-1] for path in paths[inputPaths:])
+
+# The entry (strings like the entries of lookup_table_generator.py) of a routing of the supertile with one ring, None if it doesn't fit into supertileSize
+def routingEntry(graph, name, routing, supertileSize) :
+    paths = [[graph.position(tile) for tile in path] for path in routing.paths]
+    match TABLE_GATES[name].gate :
+        case "Wire" :
+            parts = [paths[0] + [CORE] + paths[1]]
+        case "POutput" :
+            parts = [paths[0] + [CORE]]
+        case "Crossing" :
+            parts = [paths[0] + [CORE] + paths[1], paths[2] + [CORE] + paths[3]]
+        case "BLGR" :
+            # The outputs are ordered by the side of the core they come from, like entry1in2out()
+            outputs = sorted(zip(routing.option.nets[1:], paths[1:]), key=lambda output : (output[0].entrySide + 3) % 6)
+            parts = [paths[0]] + [path for _, path in outputs]
+        case _ :
+            parts = paths
+    entry = []
+    for part in parts :
+        if len(entry) > 0 :
+            entry.append(X)
+        entry += part
+    if len(entry) > supertileSize :
+        return None
+    return [EMPTY if position == X else str(position) for position in entry] + [EMPTY] * (supertileSize - len(entry))
+
+class TableOptimizer :
+    def __init__(self, library=None, maxPathLength=None) :
+        library = library if library is not None else SiDBGateLibrary()
+        self.library = library
+        self.wireCosts = tuple(library.wireDotCounts())
+        self.graph = SupertileGraph(1)
+        self.router = Router(self.graph, maxPathLength)
+        self.reports = []
+
+    # Part of the fingerprint of an optimised table (see tableFingerprint()), changes with the costs and the code of the optimisation
+    def fingerprint(self) :
+        return "optimized " + " ".join(map(str, self.wireCosts)) + " " + sourceHash("supertile_optimizer.py", "supertile_router.py")
+
+    # Whether optimize() replaces the entries of the table (and keeps a report of it)
+    def optimizes(self, name) :
+        return name in TABLE_GATES
+
+    # The report of a table as text for the cache (see SolverCache.putTableReport()) and back
+    def reportText(self, name) :
+        report = next(report for report in self.reports if report.name == name)
+        return json.dumps([report.entries, report.improved, report.estimated, report.before, report.after])
+
+    def cachedReport(self, name, text) :
+        entries, improved, estimated, before, after = json.loads(text)
+        return TableReport(name, entries, improved, estimated, tuple(before), tuple(after), True)
+
+    # The cost of an entry, like the costs of Router.routeOptimal()
+    def entryCost(self, name, entry) :
+        sidbs = 0
+        wires = 0
+        tiles = set()
+        for position, key in self.library.entryTiles(name, entry, TABLE_GATES[name].gateType) :
+            if isinstance(key, int) :
+                sidbs += self.wireCosts[key.bit_length() - 1]
+                wires += 1
+                tiles.add(position)
+        return (sidbs, len(tiles), wires)
+
+    # Whether the entry uses a wire without a design in SiDBImplementations, whose cost is only estimated (see wireDotCounts())
+    def estimated(self, name, entry) :
+        return any(isinstance(key, int) and not self.library.hasDesign(key) for _, key in self.library.entryTiles(name, entry, TABLE_GATES[name].gateType))
+
+    # Replaces every entry of the table (a list of entries as strings, see runJobs()) by its cheapest routing if that costs less
+    # and returns the totals of the table before and after
+    def optimizeTable(self, table, entries) :
+        gate = TABLE_GATES[table.name].gate
+        before = NO_COST
+        after = NO_COST
+        improved = 0
+        estimated = 0
+        for index, entry in enumerate(entries) :
+            positions = [X if position == EMPTY else int(position) for position in entry]
+            cost = self.entryCost(table.name, positions)
+            before = addCosts(before, cost)
+            inputs, outputs = entryPorts(table.name, positions)
+            result = self.router.routeOptimal(gateOptions(self.graph, gate, inputs, outputs), self.wireCosts)
+            if result is not None and result[1] < cost :
+                optimizedEntry = routingEntry(self.graph, table.name, result[0], table.supertileSize)
+                if optimizedEntry is not None and (self.estimated(table.name, positions)
+                        or self.estimated(table.name, [X if position == EMPTY else int(position) for position in optimizedEntry])) :
+                    estimated += 1
+                elif optimizedEntry is not None :
+                    entries[index] = optimizedEntry
+                    cost = result[1]
+                    improved += 1
+            after = addCosts(after, cost)
+        return TableReport(table.name, len(entries), improved, estimated, before, after)
+
+    # Optimises every table that has a gate class of the router (in place) and keeps a report of each.
+    # Tables in cachedReports (reports by name, see cachedReport()) were optimised in an earlier run, only their reports are kept.
+    def optimize(self, tables, lookupTables, cachedReports=None) :
+        for table in tables :
+            if cachedReports is not None and table.name in cachedReports :
+                self.reports.append(cachedReports[table.name])
+            elif self.optimizes(table.name) and table.name in lookupTables :
+                self.reports.append(self.optimizeTable(table, lookupTables[table.name]))
+
+    def printReports(self) :
+        for report in self.reports :
+            savings = subtractCosts(report.before, report.after)
+            percent = 100 * savings[0] / report.before[0] if report.before[0] > 0 else 0
+            print(report.name + ": " + str(report.improved) + " of " + str(report.entries) + " entries improved, "
+                + str(report.before[0]) + " -> " + str(report.after[0]) + " SiDBs (-" + str(savings[0]) + ", -" + format(percent, ".1f") + " %), "
+                + str(report.before[1]) + " -> " + str(report.after[1]) + " tiles, " + str(report.before[2]) + " -> " + str(report.after[2]) + " wires"
+                + (", " + str(report.estimated) + " cheaper routings not used as they rely on estimated wires" if report.estimated > 0 else "")
+                + (" (reused from the cache)" if report.cached else ""))
@@ -0,0 +1,151 @@
+import numpy as np
+
+from supertile_library import WIRE_CONNECTIONS
+
+# Path tracing through a solved supertile, driven by precomputed tables instead of per-step lookups.
+# Positions are 0 to 5 for the outer tiles (see the diagram in lookup_table_generator.py), CORE for the core and OUTSIDE for everything
+# around the supertile. A step from a tile leaves it through one of its six sides, which are numbered like the directions.
+
+CORE = 7
+OUTSIDE = 8
+POSITIONS = 9 # 0 to 8, position 6 is unused
+INVALID = -1
+
+# A path can't visit more than the seven tiles of the supertile
+MAX_PATH_LENGTH = 7
+
+def buildTransitions() :
+    transitions = np.full((POSITIONS, 6), INVALID, dtype=np.int8)
+    for position in range(6) :
+        transitions[position, :] = OUTSIDE
+        transitions[position, (position + 2) % 6] = (position + 1) % 6 # clockwise neighbour
+        transitions[position, (position + 3) % 6] = CORE
+        transitions[position, (position + 4) % 6] = (position - 1) % 6 # counterclockwise neighbour
+    transitions[CORE, :] = range(6)
+    return transitions
+
+# position x side -> position of the tile on the other side
+TRANSITIONS = buildTransitions()
+
+def buildEntrySides() :
+    entrySides = np.full((POSITIONS, POSITIONS), INVALID, dtype=np.int8)
+    for position in (*range(6), CORE) :
+        for side in range(6) :
+            if TRANSITIONS[position, side] != OUTSIDE :
+                entrySides[position, TRANSITIONS[position, side]] = side
+    for position in range(6) :
+        entrySides[position, OUTSIDE] = (position + 1) % 6 # the connection to the neighbouring supertile
+    return entrySides
+
+# position x previous position -> side through which the path entered the tile
+ENTRY_SIDES = buildEntrySides()
+
+def buildWireTables() :
+    # Every 'enum wire' value with at most two wires that don't share a side gets a row, all other values are malformed
+    wireIndex = np.zeros(1 << len(WIRE_CONNECTIONS), dtype=np.int16) # row 0 is the empty tile, which has no exits at all
+    exitSides = [[INVALID] * 6]
+    for firstBit in range(len(WIRE_CONNECTIONS)) :
+        for secondBit in range(firstBit, len(WIRE_CONNECTIONS)) :
+            connections = [WIRE_CONNECTIONS[firstBit]] if firstBit == secondBit else [WIRE_CONNECTIONS[firstBit], WIRE_CONNECTIONS[secondBit]]
+            sides = [side for connection in connections for side in connection]
+            if len(set(sides)) != len(sides) :
+                continue
+            exits = [INVALID] * 6
+            for a, b in connections :
+                exits[a] = b
+                exits[b] = a
+            wireIndex[(1 << firstBit) | (1 << secondBit)] = len(exitSides)
+            exitSides.append(exits)
+    return wireIndex, np.array(exitSides, dtype=np.int8)
+
+# 'enum wire' value -> row of EXIT_SIDES, row x entry side -> exit side
+WIRE_INDEX, EXIT_SIDES = buildWireTables()
+
+# Plain lists of the same tables, indexing them is a lot faster than indexing NumPy arrays one element at a time
+TRANSITION_LIST = TRANSITIONS.tolist()
+ENTRY_SIDE_LIST = ENTRY_SIDES.tolist()
+WIRE_INDEX_LIST = WIRE_INDEX.tolist()
+EXIT_SIDE_LIST = EXIT_SIDES.tolist()
+
+class PathError(ValueError) :
+    def __init__(self, reason, path, position, previousPosition, wireCode) :
+        super().__init__(reason + " at position " + str(position) + " (coming from " + str(previousPosition) + ", wire " + str(wireCode) + ") after " + str(path))
+        self.reason = reason
+        self.path = path
+        self.position = position
+        self.previousPosition = previousPosition
+        self.wireCode = wireCode
+
+# The crossing core connects each of its inputs straight to the other side, like a double wire through the core
+def crossingCoreWire(coreInPositions) :
+    coreWire = 0
+    for position in coreInPositions :
+        coreWire |= 1 << WIRE_CONNECTIONS.index(sorted([position, (position + 3) % 6]))
+    return coreWire
+
+# Follows the wires from start (entered from previous) until the path reaches stop, which is not part of the returned path.
+# wires are the 'enum wire' values of the six outer tiles, coreWire is the value used for the core (0 blocks the core).
+def tracePath(wires, start, previous, stop, coreWire=0) :
+    path = []
+    position = start
+    while position != stop :
+        if position == OUTSIDE or position == CORE and coreWire == 0 :
+            raise PathError("path ends before reaching " + str(stop), path, position, previous, 0)
+        if len(path) == MAX_PATH_LENGTH :
+            raise PathError("path doesn't end", path, position, previous, 0)
+        wireCode = coreWire if position == CORE else wires[position]
+        exitSide = EXIT_SIDE_LIST[WIRE_INDEX_LIST[wireCode]][ENTRY_SIDE_LIST[position][previous]]
+        if exitSide == INVALID :
+            raise PathError("no wire continues the path", path, position, previous, wireCode)
+        path.append(position)
+        previous, position = position, TRANSITION_LIST[position][exitSide]
+    return path
+
+# From the outside of the supertile to the core
+def traceInputPath(superTile, inputPosition) :
+    return tracePath(superTile.wires, inputPosition, OUTSIDE, CORE)
+
+# From the core to the outside of the supertile
+def traceOutputPath(superTile, outputPosition) :
+    return tracePath(superTile.wires, outputPosition, CORE, OUTSIDE)
+
+# From the outside through the crossing core (or past it, for a bypass) to the outside again
+def traceCrossingPath(superTile, inputPosition) :
+    return tracePath(superTile.wires, inputPosition, OUTSIDE, OUTSIDE, crossingCoreWire(superTile.coreInPositions))
+
+# Traces one path in each of N supertiles at the same time, all arguments are arrays with one entry (or row of wires) per supertile.
+# Returns the paths as an (N, MAX_PATH_LENGTH) array padded with INVALID, their lengths and for every path whether it was malformed.
+def tracePaths(wires, starts, previous, stops, coreWires=None) :
+    wires = np.asarray(wires, dtype=np.int64)
+    count = len(wires)
+    position = np.array(starts, dtype=np.int64)
+    previous = np.array(previous, dtype=np.int64)
+    stops = np.asarray(stops, dtype=np.int64)
+    # the core gets its own column, so every position can be looked up in the same array
+    tileWires = np.zeros((count, POSITIONS), dtype=np.int64)
+    tileWires[:, :6] = wires
+    if coreWires is not None :
+        tileWires[:, CORE] = coreWires
+    rows = np.arange(count)
+
+    paths = np.full((count, MAX_PATH_LENGTH), INVALID, dtype=np.int8)
+    lengths = np.zeros(count, dtype=np.int64)
+    errors = np.zeros(count, dtype=bool)
+    active = position != stops
+    for step in range(MAX_PATH_LENGTH + 1) :
+        if not active.any() :
+            break
+        # OUTSIDE has no wires, so a path that leaves the supertile too early fails like any other dead end
+        entrySides = ENTRY_SIDES[position, previous]
+        exitSides = np.where(entrySides == INVALID, INVALID, EXIT_SIDES[WIRE_INDEX[tileWires[rows, position]], entrySides])
+        failed = active & ((exitSides == INVALID) | (step == MAX_PATH_LENGTH))
+        errors |= failed
+        active &= ~failed
+        if step < MAX_PATH_LENGTH :
+            paths[active, step] = position[active]
+        lengths += active
+        nextPosition = np.where(active, TRANSITIONS[position, np.maximum(exitSides, 0)], position)
+        previous = np.where(active, position, previous)
+        position = nextPosition
+        active &= position != stops
+    return paths, lengths, errors
@@ -0,0 +1,451 @@
+import argparse
+import itertools
+import math
+import time
+from collections import namedtuple
+
+from supertile_expansion import AXIAL_DIRECTIONS
+from supertile_library import WIRE_CONNECTIONS, WIRE_NAMES
+from supertile_paths import CORE
+from supertile_sidb import SiDBGateLibrary
+
+# General routing engine for supertiles with any number of rings of tiles around the core (1 ring = the 7 tiles of the solvers in
+# supertile_layout_generator.cpp, 2 rings = 19 tiles, ...). The supertile is a graph of hexagonal tiles, a routing gives every tile
+# a set of wires like 'enum wire': at most two wires that don't share a side and form one of its double wire shapes.
+#
+# A net is routed from a side of a tile (where it enters the tile) to a side of another tile (where it leaves it), so every net is a path of
+# tiles and every step of the path is one wire in one tile. route() tries the nets of an option one after the other:
+#   - the paths of a net are tried from the shortest to the longest, paths that can't reach the end anymore are cut off by the hex distance,
+#   - after every placed path, every net that is still to be routed has to be reachable with the tiles that are left (forward checking).
+#     route() already checks it while a path is built: placing wires can only block nets, so if a part of a path blocks one of the remaining
+#     nets, none of its longer paths are searched. Whether a net is reachable is memoised for the wires of every tile, the same parts of
+#     paths of the same nets come up again for every option and configuration that shares them (most of all those that can't be routed),
+#   - nets can't cross each other (except in a crossing core), so an option whose nets would have to cross is skipped before searching,
+#   - the result of the remaining nets is memoised for the wires that are already placed, so configurations that share a part of their
+#     routing (e.g. the same output net after different input nets) solve it only once, also across calls of route().
+#
+# routeOptimal() doesn't stop at the first routing but returns the cheapest of all options and paths (see there for the costs). It searches the
+# same way, but with branch and bound: every net costs at least one of the cheapest wires per tile of its shortest path, so a path (and every
+# longer path of the same net) is cut off as soon as it and the bounds of the remaining nets can't beat the cheapest routing found so far.
+#
+# The connections to the outside are the ports of the supertile, one per tile of the outer ring: tile t in the part of the ring between the
+# corners in direction d and d + 1 (with the corner d) is connected through its side (d + 1) % 6. For one ring this is the connection
+# of position p through side (p + 1) % 6 that the lookup tables use (see ENTRY_SIDES in supertile_paths.py), port p is tile p.
+
+OUTSIDE_TILE = -1
+
+def wireBit(sideA, sideB) :
+    return 1 << WIRE_CONNECTIONS.index(sorted([sideA, sideB]))
+
+# side x side -> bit of the wire that connects them (0 for the same side)
+WIRE_BITS = [[wireBit(sideA, sideB) if sideA != sideB else 0 for sideB in range(6)] for sideA in range(6)]
+
+# The wires a tile can have, the same shapes as 'enum wire'
+TILE_SHAPES = frozenset(wireCode for wireCode in WIRE_NAMES if wireCode != 0)
+
+# startTile is entered through entrySide, endTile is left through exitSide
+Net = namedtuple("Net", ["startTile", "entrySide", "endTile", "exitSide"])
+# The sides of the core that are taken by the gate (its wires are not routed), coreWire the wires of the core if it is a wire or a crossing (0 for a gate)
+RoutingOption = namedtuple("RoutingOption", ["name", "coreSides", "coreWire", "nets"])
+# paths holds the tiles of every net of the option, in the order of its nets, wires the wire code of every tile
+Routing = namedtuple("Routing", ["option", "paths", "wires"])
+
+# Costs are (SiDBs, tiles, wires), see Router.routeOptimal()
+NO_COST = (0, 0, 0)
+UNBOUNDED_COST = (math.inf, math.inf, math.inf)
+
+def addCosts(a, b) :
+    return (a[0] + b[0], a[1] + b[1], a[2] + b[2])
+
+def subtractCosts(a, b) :
+    return (a[0] - b[0], a[1] - b[1], a[2] - b[2])
+
+def hexDistance(a, b) :
+    dq = a[0] - b[0]
+    dr = a[1] - b[1]
+    return (abs(dq) + abs(dr) + abs(dq + dr)) // 2
+
+class SupertileGraph :
+    def __init__(self, rings=1) :
+        self.rings = rings
+        # The tiles ring by ring, every ring clockwise from its corner in direction 0 (NE), the core is the last tile
+        self.coordinates = []
+        self.ports = []
+        for ring in range(1, rings + 1) :
+            for corner in range(6) :
+                q, r = ring * AXIAL_DIRECTIONS[corner][0], ring * AXIAL_DIRECTIONS[corner][1]
+                stepQ, stepR = AXIAL_DIRECTIONS[(corner + 2) % 6]
+                for step in range(ring) :
+                    if ring == rings :
+                        self.ports.append((len(self.coordinates), (corner + 1) % 6))
+                    self.coordinates.append((q + step * stepQ, r + step * stepR))
+        self.core = len(self.coordinates)
+        self.coordinates.append((0, 0))
+        index = {coordinate : tile for tile, coordinate in enumerate(self.coordinates)}
+        # tile x side -> tile on the other side, OUTSIDE_TILE outside of the supertile
+        self.neighbours = [[index.get((q + dq, r + dr), OUTSIDE_TILE) for dq, dr in AXIAL_DIRECTIONS] for q, r in self.coordinates]
+        self.distances = [[hexDistance(a, b) for b in self.coordinates] for a in self.coordinates]
+
+    def __len__(self) :
+        return len(self.coordinates)
+
+    # The position of a tile like in the lookup tables, only for one ring (0 to 5 and CORE)
+    def position(self, tile) :
+        return CORE if tile == self.core else tile
+
+    # The net from port to the side coreSide of the core, and the other way round
+    def inputNet(self, port, coreSide) :
+        tile, side = self.ports[port]
+        return Net(tile, side, self.neighbours[self.core][coreSide], (coreSide + 3) % 6)
+
+    def outputNet(self, coreSide, port) :
+        tile, side = self.ports[port]
+        return Net(self.neighbours[self.core][coreSide], (coreSide + 3) % 6, tile, side)
+
+    def portNet(self, inputPort, outputPort) :
+        inputTile, inputSide = self.ports[inputPort]
+        outputTile, outputSide = self.ports[outputPort]
+        return Net(inputTile, inputSide, outputTile, outputSide)
+
+# The orientations of the core gates, as (input sides, output sides), like the cores of the solvers (see getReducedCoreName())
+CORE_ORIENTATIONS = {
+    "BLG" : [((2, 3), (0,)), ((2, 3), (5,)), ((0, 5), (2,)), ((0, 5), (3,))],
+    "BLGR" : [((0,), (2, 3)), ((5,), (2, 3)), ((2,), (0, 5)), ((3,), (0, 5))],
+    "Inverter" : [((0,), (2,)), ((0,), (3,)), ((2,), (0,)), ((2,), (5,)), ((3,), (0,)), ((3,), (5,)), ((5,), (2,)), ((5,), (3,))],
+    "POutput" : [((side,), ()) for side in range(6)],
+    "PInput" : [((), (side,)) for side in range(6)],
+    # The core is a single wire
+    "Wire" : [((sideA,), (sideB,)) for sideA in range(6) for sideB in range(6) if sideA != sideB],
+    # The core is wire03 and wire25 (see crossingCoreWire()), every input leaves the core on the opposite side
+    "Crossing" : [((sideA, sideB), ((sideA + 3) % 6, (sideB + 3) % 6)) for sideA, sideB in itertools.permutations((0, 2, 3, 5), 2) if sideA % 3 != sideB % 3],
+}
+
+# The options for routing a gate class with the given ports: every orientation of the core and every assignment of the ports to its sides.
+# The nets of a Bypass go from port to port (inputs[i] to outputs[i]) around the core, which isn't used.
+# The input i of a Crossing leaves through its output i, so only the orientation of the core is chosen, not the assignment.
+def gateOptions(graph, gate, inputs, outputs) :
+    if gate == "Bypass" :
+        return [RoutingOption(gate, (), 0, [graph.portNet(inputPort, outputPort) for inputPort, outputPort in zip(inputs, outputs)])]
+    options = []
+    for coreInputs, coreOutputs in CORE_ORIENTATIONS[gate] :
+        if len(coreInputs) != len(inputs) or len(coreOutputs) != len(outputs) :
+            raise ValueError(gate + " needs " + str(len(coreInputs)) + " inputs and " + str(len(coreOutputs)) + " outputs")
+        name = gate + "_" + "".join(map(str, coreInputs)) + "_" + "".join(map(str, coreOutputs))
+        coreWire = sum(WIRE_BITS[coreInput][coreOutput] for coreInput, coreOutput in zip(coreInputs, coreOutputs)) if gate in ("Wire", "Crossing") else 0
+        if gate == "Crossing" :
+            nets = [net for port, coreInput, coreOutput, outputPort in zip(inputs, coreInputs, coreOutputs, outputs)
+                for net in (graph.inputNet(port, coreInput), graph.outputNet(coreOutput, outputPort))]
+            options.append(RoutingOption(name, coreInputs + coreOutputs, coreWire, nets))
+            continue
+        for inputSides in itertools.permutations(coreInputs) :
+            for outputSides in itertools.permutations(coreOutputs) :
+                nets = [graph.inputNet(port, side) for port, side in zip(inputs, inputSides)] + [graph.outputNet(side, port) for side, port in zip(outputSides, outputs)]
+                options.append(RoutingOption(name, coreInputs + coreOutputs, coreWire, nets))
+    return options
+
+class Router :
+    def __init__(self, graph, maxPathLength=None) :
+        self.graph = graph
+        self.maxPathLength = maxPathLength if maxPathLength is not None else len(graph)
+        # (wires of every tile, remaining nets) -> paths of the remaining nets, None if they can't be routed
+        self.memo = {}
+        # (wires of every tile, remaining nets, wire costs) -> (cost, paths) of the cheapest routing of the remaining nets,
+        # or (cost, None) if there is no routing that is cheaper than cost
+        self.optimalMemo = {}
+        # (wires of every tile, net) -> whether the net can still be routed, see reachableAfter()
+        self.reachableMemo = {}
+        self.memoHits = 0
+        self.reachableHits = 0
+        self.searchedPaths = 0
+
+    # Whether net can still be routed at all with the wires that are already placed (ignoring the other remaining nets)
+    def reachable(self, wires, net) :
+        stack = [(net.startTile, net.entrySide)]
+        seen = set(stack)
+        while len(stack) > 0 :
+            tile, entrySide = stack.pop()
+            for exitSide in range(6) :
+                if wires[tile] | WIRE_BITS[entrySide][exitSide] not in TILE_SHAPES :
+                    continue
+                if tile == net.endTile and exitSide == net.exitSide :
+                    return True
+                following = self.graph.neighbours[tile][exitSide]
+                state = (following, (exitSide + 3) % 6)
+                if following != OUTSIDE_TILE and state not in seen :
+                    seen.add(state)
+                    stack.append(state)
+        return False
+
+    # Like reachable(), but memoised, for the forward checking of paths()
+    def reachableAfter(self, wires, net) :
+        key = (tuple(wires), net)
+        known = self.reachableMemo.get(key)
+        if known is not None :
+            self.reachableHits += 1
+            return known
+        known = self.reachableMemo[key] = self.reachable(wires, net)
+        return known
+
+    # Yields every path of net with exactly length tiles as (tiles, new wires).
+    # Parts of paths after which one of otherNets can't be routed anymore aren't extended.
+    def paths(self, wires, net, length, otherNets=()) :
+        graph = self.graph
+        endCoordinate = graph.coordinates[net.endTile]
+        path = []
+        wires = list(wires)
+
+        def extend(tile, entrySide) :
+            path.append(tile)
+            remaining = length - len(path)
+            oldWire = wires[tile]
+            if remaining == 0 :
+                if tile == net.endTile and oldWire | WIRE_BITS[entrySide][net.exitSide] in TILE_SHAPES :
+                    wires[tile] = oldWire | WIRE_BITS[entrySide][net.exitSide]
+                    self.searchedPaths += 1
+                    yield list(path), tuple(wires)
+                    wires[tile] = oldWire
+            else :
+                for exitSide in range(6) :
+                    following = graph.neighbours[tile][exitSide]
+                    if following == OUTSIDE_TILE or following in path or oldWire | WIRE_BITS[entrySide][exitSide] not in TILE_SHAPES :
+                        continue
+                    if graph.distances[following][net.endTile] >= remaining :
+                        continue
+                    wires[tile] = oldWire | WIRE_BITS[entrySide][exitSide]
+                    if all(self.reachableAfter(wires, otherNet) for otherNet in otherNets) :
+                        yield from extend(following, (exitSide + 3) % 6)
+                    wires[tile] = oldWire
+            path.pop()
+
+        if hexDistance(graph.coordinates[net.startTile], endCoordinate) < length :
+            yield from extend(net.startTile, net.entrySide)
+
+    def solve(self, wires, nets) :
+        if len(nets) == 0 :
+            return ()
+        key = (wires, nets)
+        if key in self.memo :
+            self.memoHits += 1
+            return self.memo[key]
+        result = None
+        net = nets[0]
+        shortest = self.graph.distances[net.startTile][net.endTile] + 1
+        for length in range(shortest, self.maxPathLength + 1) :
+            for path, newWires in self.paths(wires, net, length, nets[1:]) :
+                if not all(self.reachableAfter(newWires, remainingNet) for remainingNet in nets[1:]) :
+                    continue
+                rest = self.solve(newWires, nets[1:])
+                if rest is not None :
+                    result = (tuple(path),) + rest
+                    break
+            if result is not None :
+                break
+        self.memo[key] = result
+        return result
+
+    # Paths that don't cross keep the order of their ends: around the core (a ring between the ports and the core),
+    # the nets have to reach the core in the same clockwise order as they leave the ports, and in a bypass
+    # two nets from port to port can't have their ends alternating around the supertile
+    def planar(self, option) :
+        portOf = {port : index for index, port in enumerate(self.graph.ports)}
+        if len(option.coreSides) > 0 :
+            ends = []
+            for net in option.nets :
+                if (net.startTile, net.entrySide) in portOf :
+                    ends.append((portOf[(net.startTile, net.entrySide)], (net.exitSide + 3) % 6))
+                else :
+                    ends.append((portOf[(net.endTile, net.exitSide)], (net.entrySide + 3) % 6))
+            coreSides = [coreSide for _, coreSide in sorted(ends)]
+            descents = sum(1 for index in range(len(coreSides)) if coreSides[index] > coreSides[(index + 1) % len(coreSides)])
+            return descents <= 1
+        chords = [sorted((portOf[(net.startTile, net.entrySide)], portOf[(net.endTile, net.exitSide)])) for net in option.nets]
+        for (a, b), (c, d) in itertools.combinations(chords, 2) :
+            if (a < c < b) != (a < d < b) :
+                return False
+        return True
+
+    # The wires before routing an option (the core is taken by the gate or by the wires of the option, a net can't pass through it)
+    # and its nets in the order in which they are routed, the longest first as they have the least choice
+    def prepare(self, option) :
+        wires = [0] * len(self.graph)
+        wires[self.graph.core] = -1
+        order = sorted(range(len(option.nets)), key=lambda index : -self.graph.distances[option.nets[index].startTile][option.nets[index].endTile])
+        return tuple(wires), order, tuple(option.nets[index] for index in order)
+
+    def routingOf(self, option, order, paths) :
+        orderedPaths = [None] * len(paths)
+        for index, path in zip(order, paths) :
+            orderedPaths[index] = list(path)
+        return Routing(option, orderedPaths, self.wiresOf(option, orderedPaths))
+
+    # Routes the first option (of gateOptions()) that can be routed, returns None if none can
+    def route(self, options) :
+        for option in options :
+            if not self.planar(option) :
+                continue
+            wires, order, nets = self.prepare(option)
+            if not all(self.reachable(wires, net) for net in nets) :
+                continue
+            paths = self.solve(wires, nets)
+            if paths is not None :
+                return self.routingOf(option, order, paths)
+        return None
+
+    # The cost of the wires that a path added to wires
+    def pathCost(self, wires, newWires, path, wireCosts) :
+        sidbs = 0
+        tiles = 0
+        for tile in path :
+            sidbs += wireCosts[(newWires[tile] & ~wires[tile]).bit_length() - 1]
+            if wires[tile] == 0 :
+                tiles += 1
+        return (sidbs, tiles, len(path))
+
+    # Any path of a net costs at least that much: one of the cheapest wires in each of its tiles, which might all be used already
+    def netBound(self, net, cheapestWire) :
+        length = self.graph.distances[net.startTile][net.endTile] + 1
+        return (length * cheapestWire, 0, length)
+
+    # Like solve(), but returns the cheapest routing of the remaining nets as (cost, paths) if it costs less than budget, otherwise None.
+    # Paths that can't beat the cheapest routing found so far are cut off (branch and bound), the bound is tightened with every routing found.
+    def solveOptimal(self, wires, nets, wireCosts, budget) :
+        if len(nets) == 0 :
+            return (NO_COST, ()) if NO_COST < budget else None
+        key = (wires, nets, wireCosts)
+        known = self.optimalMemo.get(key)
+        if known is not None :
+            self.memoHits += 1
+            cost, paths = known
+            if paths is not None :
+                return known if cost < budget else None
+            if cost >= budget :
+                return None
+        cheapestWire = min(wireCosts)
+        restBound = NO_COST
+        for remainingNet in nets[1:] :
+            restBound = addCosts(restBound, self.netBound(remainingNet, cheapestWire))
+        net = nets[0]
+        best = None
+        shortest = self.graph.distances[net.startTile][net.endTile] + 1
+        for length in range(shortest, self.maxPathLength + 1) :
+            if addCosts((length * cheapestWire, 0, length), restBound) >= budget :
+                break
+            for path, newWires in self.paths(wires, net, length) :
+                cost = self.pathCost(wires, newWires, path, wireCosts)
+                if addCosts(cost, restBound) >= budget :
+                    continue
+                if not all(self.reachable(newWires, remainingNet) for remainingNet in nets[1:]) :
+                    continue
+                rest = self.solveOptimal(newWires, nets[1:], wireCosts, subtractCosts(budget, cost))
+                if rest is not None :
+                    budget = addCosts(cost, rest[0])
+                    best = (budget, (tuple(path),) + rest[1])
+        # Without a routing, nothing is cheaper than the budget
+        self.optimalMemo[key] = best if best is not None else (budget, None)
+        return best
+
+    # The cost of the wires in the core of an option
+    def coreCost(self, option, wireCosts) :
+        bits = [index for index in range(len(wireCosts)) if option.coreWire >> index & 1]
+        return (sum(wireCosts[index] for index in bits), 1 if len(bits) > 0 else 0, len(bits))
+
+    # Routes the cheapest of all options that can be routed and returns it with its cost, None if none can be routed.
+    # wireCosts holds the SiDBs of a single wire in the order of WIRE_CONNECTIONS, a tile with two wires has the SiDBs of both.
+    # Costs are compared lexicographically: the SiDBs of all wires first, then the tiles with wires and then the number of wires
+    # (one per tile of a path), the core counts if it is a wire or a crossing.
+    def routeOptimal(self, options, wireCosts) :
+        wireCosts = tuple(wireCosts)
+        cheapestWire = min(wireCosts)
+        best = None
+        bestCost = UNBOUNDED_COST
+        for option in options :
+            if not self.planar(option) :
+                continue
+            wires, order, nets = self.prepare(option)
+            if not all(self.reachable(wires, net) for net in nets) :
+                continue
+            coreCost = self.coreCost(option, wireCosts)
+            bound = coreCost
+            for net in nets :
+                bound = addCosts(bound, self.netBound(net, cheapestWire))
+            if bound >= bestCost :
+                continue
+            result = self.solveOptimal(wires, nets, wireCosts, subtractCosts(bestCost, coreCost))
+            if result is not None :
+                bestCost = addCosts(coreCost, result[0])
+                best = (option, order, result[1])
+        if best is None :
+            return None
+        return self.routingOf(*best), bestCost
+
+    def wiresOf(self, option, paths) :
+        wires = [0] * len(self.graph)
+        wires[self.graph.core] = option.coreWire
+        for net, path in zip(option.nets, paths) :
+            entrySide = net.entrySide
+            for index, tile in enumerate(path) :
+                exitSide = net.exitSide if index + 1 == len(path) else self.graph.neighbours[tile].index(path[index + 1])
+                wires[tile] |= WIRE_BITS[entrySide][exitSide]
+                entrySide = (exitSide + 3) % 6
+        return wires
+
+# Every configuration of a gate class with the given number of ports, like the enumerate mode of supertile_layout_generator
+# (inputs of BLG and outputs of BLGR are unordered), as (inputs, outputs) tuples of ports
+def gateConfigurations(graph, gate) :
+    ports = range(len(graph.ports))
+    match gate :
+        case "BLG" :
+            return [((in1, in2), (out,)) for out in ports for in1, in2 in itertools.combinations(ports, 2) if out not in (in1, in2)]
+        case "BLGR" :
+            return [((inPort,), (out1, out2)) for inPort in ports for out1, out2 in itertools.combinations(ports, 2) if inPort not in (out1, out2)]
+        case "Inverter" | "Wire" :
+            return [((inPort,), (out,)) for inPort in ports for out in ports if inPort != out]
+        case "POutput" :
+            return [((inPort,), ()) for inPort in ports]
+        case "PInput" :
+            return [((), (out,)) for out in ports]
+        case "Crossing" | "Bypass" :
+            return [((in1, in2), (out1, out2)) for in1, out1, in2, out2 in itertools.permutations(ports, 4)]
+        case _ :
+            raise ValueError("There is no gate class " + gate)
+
+def main() :
+    parser = argparse.ArgumentParser(description="Routes every configuration of a gate class in a supertile with any number of rings and prints how many could be routed.")
+    parser.add_argument("gate", choices=["BLG", "BLGR", "Inverter", "Wire", "POutput", "PInput", "Crossing", "Bypass"])
+    parser.add_argument("--rings", type=int, default=1, help="rings of tiles around the core (default: 1, the supertiles of the lookup tables)")
+    parser.add_argument("--max-path-length", type=int, help="maximum number of tiles of a path (default: all tiles)")
+    parser.add_argument("--print", action="store_true", help="print the wires of every routed configuration")
+    parser.add_argument("--optimal", action="store_true", help="route the cheapest routing of every configuration (fewest SiDBs of the wires in "
+        + "SiDBImplementations, then wire tiles, then wires) instead of the first one and print the total cost")
+    arguments = parser.parse_args()
+
+    graph = SupertileGraph(arguments.rings)
+    router = Router(graph, arguments.max_path_length)
+    wireCosts = SiDBGateLibrary().wireDotCounts() if arguments.optimal else None
+    configurations = gateConfigurations(graph, arguments.gate)
+    routed = 0
+    totalCost = NO_COST
+    start = time.perf_counter()
+    for inputs, outputs in configurations :
+        options = gateOptions(graph, arguments.gate, inputs, outputs)
+        if arguments.optimal :
+            result = router.routeOptimal(options, wireCosts)
+            routing = result[0] if result is not None else None
+            if result is not None :
+                totalCost = addCosts(totalCost, result[1])
+        else :
+            routing = router.route(options)
+        if routing is not None :
+            routed += 1
+        if arguments.print :
+            print(arguments.gate, "".join(map(str, inputs)), "".join(map(str, outputs)) + ", "
+                + ("ERROR no routing" if routing is None else routing.option.name + ", " + ", ".join(WIRE_NAMES.get(wire, str(wire)) for wire in routing.wires[:-1])))
+    seconds = time.perf_counter() - start
+    if arguments.optimal :
+        print("Total cost: " + str(totalCost[0]) + " SiDBs, " + str(totalCost[1]) + " wire tiles, " + str(totalCost[2]) + " wires")
+    print(str(routed) + " of " + str(len(configurations)) + " configurations routed in " + format(seconds, ".3f") + " s (" + str(len(graph)) + " tiles, "
+        + str(len(graph.ports)) + " ports, " + str(len(router.memo) + len(router.optimalMemo)) + " memoised sub-routings, " + str(router.memoHits) + " memo hits, "
+        + str(router.reachableHits) + " of " + str(router.reachableHits + len(router.reachableMemo)) + " reachability checks memoised, " + str(router.searchedPaths) + " paths)")
+
+if __name__ == "__main__" :
+    main()
@@ -0,0 +1,209 @@
+import os
+
+import numpy as np
+
+from supertile_expansion import entryPaths
+from supertile_library import WIRE_CONNECTIONS, WIRE_NAMES
+from supertile_paths import CORE, ENTRY_SIDES, OUTSIDE
+from supertile_sqd import SQD_CACHE_PATH, loadSqd
+
+# SiDB gate library for the supertiles: every tile of a supertile (the six wire tiles and the core) is turned into the SiDB dots of its design
+# in SiDBImplementations. The dots of a design are (n, m, l) coordinates of the H-Si(100)-2x1 lattice of SiQAD (see the <latcoord> of an .sqd file).
+#
+# Every design is loaded once and centred on its tile. Its mirror image (n -> -n, which maps the sides 0 <-> 5, 1 <-> 4 and 2 <-> 3) is built as well,
+# which is the only symmetry of the lattice that maps dots onto dots, so there are no rotations and no vertical mirroring. For every design and every
+# position of the supertile, the dots are stored already moved to that position, so expanding an entry only concatenates arrays.
+#
+# The tiles are Bestagon tiles: the neighbour to the east is 60 columns (n) away, the neighbours to the north east and south east are
+# 30 columns and 23 rows (m) away. The designs in SiDBImplementations are drawn at different places of the lattice, so they are centred by their
+# ports: the dot of a design that lies furthest in the direction of one of its sides is taken as the port of that side, which is half the way
+# to the neighbour in that direction.
+
+SIDB_DIRECTORY = "SiDBImplementations"
+
+# Lattice of the .sqd files, in Angstrom
+COLUMN_DISTANCE = 3.84
+ROW_DISTANCE = 7.68
+DIMER_DISTANCE = 2.25
+
+# Offset (n, m) of the neighbouring tile in every direction, in the order of 'enum hex_direction' (NE, E, SE, SW, W, NW), m grows to the south
+TILE_OFFSETS = ((30, -23), (60, 0), (30, 23), (-30, 23), (-60, 0), (-30, -23))
+# Position in the supertile -> offset of its tile from the core
+POSITION_OFFSETS = {**{position : TILE_OFFSETS[position] for position in range(6)}, CORE : (0, 0)}
+
+# The sides of the mirror image of a design
+MIRRORED_SIDES = (5, 4, 3, 2, 1, 0)
+
+# design -> the two sides it connects
+WIRE_DESIGNS = {
+    "wireEtoW" : (1, 4),
+    "wireNEtoNW" : (0, 5),
+    "wireNEtoW" : (0, 4),
+    "wireSEtoSW" : (2, 3),
+    "wireSEtoW" : (2, 4),
+    "wireSWtoW" : (3, 4),
+    "wireWtoNW" : (4, 5),
+}
+
+# design -> gate type (as in fiction's .fgl files), input sides and output sides
+GATE_DESIGNS = {
+    "flippedAND" : ("AND", (2, 3), (0,)),
+    "flippedNAND" : ("NAND", (2, 3), (0,)),
+    "flippedOR" : ("OR", (2, 3), (0,)),
+    "flippedNOR" : ("NOR", (2, 3), (0,)),
+    "flippedXOR" : ("XOR", (2, 3), (0,)),
+    "flippedXNOR" : ("XNOR", (2, 3), (0,)),
+    "flippedFANOUT" : ("FANOUT", (2,), (0, 5)),
+}
+
+DESIGN_DIRECTORIES = {"wireGates" : WIRE_DESIGNS, "flippedExtendagonGates" : GATE_DESIGNS}
+
+# The lattice vectors a1, a2, b1 and b2 the designs have to be drawn on (see LATTICE_VECTORS in supertile_sqd.py)
+EXPECTED_LATTICE = np.array(((COLUMN_DISTANCE, 0), (0, ROW_DISTANCE), (0, 0), (0, DIMER_DISTANCE)))
+
+# Returns the dots of a design as (n, m, l) rows and their physical locations as (x, y) rows
+def readDesign(path, cacheDirectory) :
+    design = loadSqd(path, cacheDirectory)
+    if not np.allclose(design.lattice, EXPECTED_LATTICE) :
+        raise ValueError(path + " is not drawn on the H-Si(100)-2x1 lattice")
+    dots = np.stack((design.dots["n"], design.dots["m"], design.dots["l"]), axis=1)
+    return dots, np.stack((design.dots["x"], design.dots["y"]), axis=1)
+
+# Moves the dots so that the centre of their tile is at n = 0, m = 0 (see the top of this file)
+def centreDesign(dots, locations, sides) :
+    centres = []
+    for side in sides :
+        offsetN, offsetM = TILE_OFFSETS[side]
+        direction = np.array((offsetN * COLUMN_DISTANCE, offsetM * ROW_DISTANCE))
+        port = dots[np.argmax(locations @ direction)]
+        centres.append((port[0] - offsetN / 2, port[1] - offsetM / 2))
+    centreN, centreM = np.rint(np.mean(centres, axis=0)).astype(np.int32)
+    return dots - np.array((centreN, centreM, 0), dtype=np.int32)
+
+def mirrorDesign(dots) :
+    return dots * np.array((-1, 1, 1), dtype=np.int32)
+
+# The key of a wire tile is its 'enum wire' value, the key of a gate its type and its sorted input and output sides
+def wireKey(sideA, sideB) :
+    return 1 << WIRE_CONNECTIONS.index(sorted([sideA, sideB]))
+
+def gateKey(gateType, inputSides, outputSides) :
+    return (gateType, tuple(sorted(inputSides)), tuple(sorted(outputSides)))
+
+def describeKey(key) :
+    if isinstance(key, int) :
+        return WIRE_NAMES.get(key, "wire " + str(key))
+    gateType, inputSides, outputSides = key
+    return gateType + " with inputs " + str(list(inputSides)) + " and outputs " + str(list(outputSides))
+
+# Side of position through which a path goes to or comes from other (OUTSIDE for the neighbouring supertile)
+def sideTowards(position, other) :
+    return int(ENTRY_SIDES[position, other])
+
+# The sides of every tile of a path from start to stop, as (position, entry side, exit side)
+def pathConnections(path, start, stop) :
+    connections = []
+    for index, position in enumerate(path) :
+        previous = path[index - 1] if index > 0 else start
+        following = path[index + 1] if index + 1 < len(path) else stop
+        connections.append((position, sideTowards(position, previous), sideTowards(position, following)))
+    return connections
+
+class SiDBGateLibrary :
+    def __init__(self, directory=SIDB_DIRECTORY, cacheDirectory=SQD_CACHE_PATH) :
+        # key -> position -> dots of the design at that position of the supertile
+        self.designs = {}
+        mirrored = []
+        for subdirectory, designs in DESIGN_DIRECTORIES.items() :
+            for designName, description in designs.items() :
+                if designs is WIRE_DESIGNS :
+                    sides = description
+                    keys = (wireKey(*sides), wireKey(*(MIRRORED_SIDES[side] for side in sides)))
+                else :
+                    gateType, inputSides, outputSides = description
+                    sides = inputSides + outputSides
+                    keys = (gateKey(gateType, inputSides, outputSides),
+                        gateKey(gateType, [MIRRORED_SIDES[side] for side in inputSides], [MIRRORED_SIDES[side] for side in outputSides]))
+                dots = centreDesign(*readDesign(os.path.join(directory, subdirectory, designName + ".sqd"), cacheDirectory), sides)
+                self.addDesign(keys[0], dots)
+                mirrored.append((keys[1], mirrorDesign(dots)))
+        # A design that is symmetric on its own (e.g. wireEtoW) keeps its original
+        for key, dots in mirrored :
+            if key not in self.designs :
+                self.addDesign(key, dots)
+
+    def addDesign(self, key, dots) :
+        self.designs[key] = {position : dots + np.array((*offset, 0), dtype=np.int32) for position, offset in POSITION_OFFSETS.items()}
+
+    def hasDesign(self, key) :
+        return key in self.designs
+
+    # The dots of the design of key at position of the supertile (0 to 5 or CORE)
+    def tileDots(self, key, position) :
+        designs = self.designs.get(key)
+        if designs is None :
+            raise ValueError("There is no SiDB design for a " + describeKey(key))
+        return designs[position]
+
+    # The designs of every tile of a table entry as (position, key) pairs, tiles with two wires have two pairs.
+    # gateType is the type of the gate in the core (as in fiction's .fgl files), it is not needed for wires, crossings and bypasses.
+    def entryTiles(self, name, entry, gateType=None) :
+        paths = entryPaths(entry)
+        connections = []
+        coreInputs = []
+        coreOutputs = []
+        match name :
+            case "lookup_table_2in1out" | "lookup_table_1in2out" | "lookup_table_1in1out_INVERTER" :
+                inputCount = 2 if name == "lookup_table_2in1out" else 1
+                for path in paths[:inputCount] :
+                    connections += pathConnections(path, OUTSIDE, CORE)
+                    coreInputs.append(sideTowards(CORE, path[-1]))
+                for path in paths[inputCount:] :
+                    connections += pathConnections(path, CORE, OUTSIDE)
+                    coreOutputs.append(sideTowards(CORE, path[0]))
+            case "lookup_table_1in0out" :
+                path = [position for position in paths[0] if position != CORE]
+                connections += pathConnections(path, OUTSIDE, CORE)
+                coreInputs.append(sideTowards(CORE, path[-1]))
+            case "lookup_table_0in1out" :
+                connections += pathConnections(paths[0], CORE, OUTSIDE)
+                coreOutputs.append(sideTowards(CORE, paths[0][0]))
+            case "lookup_table_1in1out_WIRE" | "lookup_table_2in2out_CROSSING" | "lookup_table_2in2out_BYPASS" :
+                # The core is a wire tile like the others
+                for path in paths :
+                    connections += pathConnections(path, OUTSIDE, OUTSIDE)
+            case _ :
+                raise ValueError("There is no SiDB expansion for the table " + name)
+
+        tiles = [(position, wireKey(entrySide, exitSide)) for position, entrySide, exitSide in connections]
+        if len(coreInputs) + len(coreOutputs) > 0 :
+            if gateType is None :
+                raise ValueError("The core of " + name + " needs a gate type")
+            tiles.append((CORE, gateKey(gateType, coreInputs, coreOutputs)))
+
+        # Two wires on one tile are only possible if they don't cross, like the double wires of 'enum wire' (except in the core of a crossing)
+        wires = {}
+        for position, key in tiles :
+            if isinstance(key, int) :
+                wires[position] = wires.get(position, 0) | key
+        for position, wireCode in wires.items() :
+            if wireCode not in WIRE_NAMES and not (position == CORE and name == "lookup_table_2in2out_CROSSING") :
+                raise ValueError("The wires of tile " + str(position) + " of the entry " + str(list(entry)) + " cross each other")
+        return tiles
+
+    # The number of dots of a single wire between every pair of sides, in the order of WIRE_CONNECTIONS (e.g. as costs of wires for
+    # Router.routeOptimal()). Wires without a design are estimated by the average of the wires that have one.
+    def wireDotCounts(self) :
+        counts = [len(self.designs[1 << index][CORE]) if self.hasDesign(1 << index) else None for index in range(len(WIRE_CONNECTIONS))]
+        known = [count for count in counts if count is not None]
+        return [count if count is not None else round(sum(known) / len(known)) for count in counts]
+
+    # The dots of a whole supertile of a table entry, with its core at offset (n, m) of the lattice
+    def expandEntry(self, name, entry, gateType=None, offset=(0, 0)) :
+        parts = [self.tileDots(key, position) for position, key in self.entryTiles(name, entry, gateType)]
+        if len(parts) == 0 :
+            return np.zeros((0, 3), dtype=np.int32)
+        dots = np.concatenate(parts)
+        if offset != (0, 0) :
+            dots = dots + np.array((*offset, 0), dtype=np.int32)
+        return dots
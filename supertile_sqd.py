@@ -0,0 +1,165 @@
+import hashlib
+import os
+import tempfile
+import time
+import xml.etree.ElementTree as ElementTree
+from collections import deque, namedtuple
+from multiprocessing import Pool
+
+import numpy as np
+
+# Reading SiQAD's .sqd files. Most of such a file is GUI state and layer properties, only the dots of the DB layer and the lattice are kept.
+# The file is read with iterparse and every element is dropped as soon as it has been read, so nothing else is ever built up in memory.
+#
+# The result is cached in SQD_CACHE_PATH as one .npy file per content hash of the .sqd file (so a changed design is simply parsed again and
+# renaming or moving it doesn't matter), which holds a single record with the lattice and the dots. On later runs it is memory-mapped instead of parsed.
+# A cache file is written under a temporary name and renamed when it is complete, so it is either missing or whole.
+#
+# Writing works the other way round without any XML tree: writeSqd() formats the dots a chunk at a time (optionally in worker processes)
+# and writes the chunks in order between a fixed head and tail, which have the same structure as the files in SiDBImplementations.
+
+SQD_CACHE_PATH = ".sidb_cache"
+# Part of the path of every cache file, has to be increased whenever SQD_DOT or the layout of a cache file change
+SQD_CACHE_VERSION = 1
+
+# Lattice coordinates (see <latcoord>) and physical location in Angstrom (see <physloc>) of a dot
+SQD_DOT = np.dtype([("n", np.int32), ("m", np.int32), ("l", np.int32), ("x", np.float64), ("y", np.float64)])
+# The lattice vectors a1, a2, b1 and b2 of the Lattice layer, as rows (x, y) in Angstrom
+LATTICE_VECTORS = ("a1", "a2", "b1", "b2")
+
+SqdDesign = namedtuple("SqdDesign", ["dots", "lattice"])
+
+# The H-Si(100)-2x1 lattice of the written files, in Angstrom
+WRITE_LATTICE = {"a1" : (3.84, 0), "a2" : (0, 7.68), "b1" : (0, 0), "b2" : (0, 2.25)}
+
+DEFAULT_DOT_CHUNK_SIZE = 65536
+
+SQD_HEAD = ('<?xml version="1.0" encoding="UTF-8"?>\n<siqad>\n    <!--Program Flags-->\n    <program>\n        <file_purpose>save</file_purpose>\n'
+    '        <version>0.3.3</version>\n        <date>{date}</date>\n    </program>\n    <!--GUI Flags-->\n    <gui>\n        <zoom>0.1</zoom>\n'
+    '        <displayed_region x1="0" y1="0" x2="100" y2="100"/>\n        <scroll x="0" y="0"/>\n    </gui>\n'
+    '    <!--Layer Properties-->\n    <!--Layer ID is intrinsic to the layer order-->\n    <layers>\n'
+    '        <layer_prop>\n            <name>Lattice</name>\n            <type>Lattice</type>\n            <role>Design</role>\n'
+    '            <zoffset>0</zoffset>\n            <zheight>0</zheight>\n            <visible>1</visible>\n            <active>0</active>\n'
+    '            <lat_vec>\n                <a1 x="{a1[0]:g}" y="{a1[1]:g}"/>\n                <a2 x="{a2[0]:g}" y="{a2[1]:g}"/>\n                <N>2</N>\n'
+    '                <b1 x="{b1[0]:g}" y="{b1[1]:g}"/>\n                <b2 x="{b2[0]:g}" y="{b2[1]:g}"/>\n            </lat_vec>\n        </layer_prop>\n'
+    '        <layer_prop>\n            <name>Screenshot Overlay</name>\n            <type>Misc</type>\n            <role>Overlay</role>\n'
+    '            <zoffset>0</zoffset>\n            <zheight>0</zheight>\n            <visible>1</visible>\n            <active>0</active>\n        </layer_prop>\n'
+    '        <layer_prop>\n            <name>Surface</name>\n            <type>DB</type>\n            <role>Design</role>\n'
+    '            <zoffset>0</zoffset>\n            <zheight>0</zheight>\n            <visible>1</visible>\n            <active>0</active>\n        </layer_prop>\n'
+    '        <layer_prop>\n            <name>Metal</name>\n            <type>Electrode</type>\n            <role>Design</role>\n'
+    '            <zoffset>1000</zoffset>\n            <zheight>100</zheight>\n            <visible>1</visible>\n            <active>0</active>\n        </layer_prop>\n'
+    '    </layers>\n    <!--Item Hierarchy-->\n    <design>\n        <!--Lattice-->\n        <layer type="Lattice"/>\n'
+    '        <!--Screenshot Overlay-->\n        <layer type="Misc"/>\n        <!--Surface-->\n        <layer type="DB">\n')
+SQD_DOT_ELEMENT = ('            <dbdot>\n                <layer_id>2</layer_id>\n                <latcoord n="%d" m="%d" l="%d"/>\n'
+    '                <physloc x="%.12g" y="%.12g"/>\n                <color>#ffc8c8c8</color>\n            </dbdot>\n')
+SQD_TAIL = '        </layer>\n        <!--Metal-->\n        <layer type="Electrode"/>\n    </design>\n</siqad>'
+
+def parseSqd(path) :
+    dots = []
+    lattice = np.zeros((len(LATTICE_VECTORS), 2), dtype=np.float64)
+    inDbLayer = False
+    latcoord = None
+    physloc = None
+    for event, element in ElementTree.iterparse(path, events=("start", "end")) :
+        if event == "start" :
+            if element.tag == "layer" :
+                inDbLayer = element.get("type") == "DB"
+            continue
+        match element.tag :
+            case "latcoord" if inDbLayer :
+                latcoord = (int(element.get("n")), int(element.get("m")), int(element.get("l")))
+            case "physloc" if inDbLayer :
+                physloc = (float(element.get("x")), float(element.get("y")))
+            case "dbdot" :
+                if latcoord is None or physloc is None :
+                    raise ValueError(path + " has a dot without <latcoord> or <physloc>")
+                dots.append(latcoord + physloc)
+                latcoord = physloc = None
+                element.clear()
+            case "a1" | "a2" | "b1" | "b2" :
+                lattice[LATTICE_VECTORS.index(element.tag)] = (float(element.get("x")), float(element.get("y")))
+            case "layer" :
+                inDbLayer = False
+                element.clear()
+            case "layer_prop" | "gui" | "program" :
+                element.clear()
+    return SqdDesign(np.array(dots, dtype=SQD_DOT), lattice)
+
+def hashFile(path) :
+    with open(path, "rb") as sqdFile :
+        return hashlib.sha256(sqdFile.read()).hexdigest()
+
+# The record of a cache file with count dots
+def cacheRecord(count) :
+    return np.dtype([("lattice", np.float64, (len(LATTICE_VECTORS), 2)), ("dots", SQD_DOT, (count,))])
+
+# Like parseSqd(), but through the cache in cacheDirectory (None doesn't use a cache). The arrays of a cached design are read-only.
+def loadSqd(path, cacheDirectory=SQD_CACHE_PATH) :
+    if cacheDirectory is None :
+        return parseSqd(path)
+    cachePath = os.path.join(cacheDirectory, "v" + str(SQD_CACHE_VERSION), hashFile(path) + ".npy")
+    if os.path.exists(cachePath) :
+        record = np.load(cachePath, mmap_mode="r")
+        return SqdDesign(record["dots"][0], record["lattice"][0])
+
+    design = parseSqd(path)
+    record = np.zeros(1, dtype=cacheRecord(len(design.dots)))
+    record[0]["dots"] = design.dots
+    record[0]["lattice"] = design.lattice
+    os.makedirs(os.path.dirname(cachePath), exist_ok=True)
+    descriptor, temporaryPath = tempfile.mkstemp(dir=os.path.dirname(cachePath), suffix=".tmp")
+    with os.fdopen(descriptor, "wb") as cacheFile :
+        np.save(cacheFile, record)
+    os.replace(temporaryPath, cachePath)
+    return design
+
+# The <dbdot> elements of an (N, 3) array of (n, m, l) rows
+def formatDots(dots) :
+    dots = np.asarray(dots, dtype=np.int64).reshape(-1, 3)
+    xs = np.round(dots[:, 0] * WRITE_LATTICE["a1"][0], 4)
+    ys = np.round(dots[:, 1] * WRITE_LATTICE["a2"][1] + dots[:, 2] * WRITE_LATTICE["b2"][1], 4)
+    return "".join([SQD_DOT_ELEMENT % (n, m, l, x, y) for (n, m, l), x, y in zip(dots.tolist(), xs.tolist(), ys.tolist())])
+
+# Splits dots into (k, 3) arrays of at most chunkSize rows. dots is an (N, 3) array (e.g. from SiDBGateLibrary.expandEntry()),
+# an iterable of such arrays or an iterable of single (n, m, l) dots, which may be mixed.
+def dotChunks(dots, chunkSize) :
+    if isinstance(dots, np.ndarray) :
+        dots = (dots,)
+    pending = []
+    for item in dots :
+        if isinstance(item, np.ndarray) and item.ndim == 2 :
+            if len(pending) > 0 :
+                yield np.array(pending, dtype=np.int64)
+                pending = []
+            for start in range(0, len(item), chunkSize) :
+                yield item[start:start + chunkSize]
+        else :
+            pending.append(tuple(item))
+            if len(pending) == chunkSize :
+                yield np.array(pending, dtype=np.int64)
+                pending = []
+    if len(pending) > 0 :
+        yield np.array(pending, dtype=np.int64)
+
+# Streams dots (see dotChunks()) into an .sqd file, the chunks are formatted by up to workers processes (1 formats them in this process)
+# and written in order, at most two chunks per worker are on their way at any time. Returns the number of dots.
+def writeSqd(path, dots, workers=1, chunkSize=DEFAULT_DOT_CHUNK_SIZE) :
+    count = 0
+    with open(path, "w") as sqdFile :
+        sqdFile.write(SQD_HEAD.format(date=time.strftime("%Y-%m-%d %H:%M:%S"), **WRITE_LATTICE))
+        if workers <= 1 :
+            for chunk in dotChunks(dots, chunkSize) :
+                sqdFile.write(formatDots(chunk))
+                count += len(chunk)
+        else :
+            with Pool(workers) as pool :
+                pending = deque()
+                for chunk in dotChunks(dots, chunkSize) :
+                    pending.append(pool.apply_async(formatDots, (chunk,)))
+                    count += len(chunk)
+                    if len(pending) >= 2 * workers :
+                        sqdFile.write(pending.popleft().get())
+                while len(pending) > 0 :
+                    sqdFile.write(pending.popleft().get())
+        sqdFile.write(SQD_TAIL)
+    return count
@@ -0,0 +1,139 @@
+from supertile_library import WIRE_CONNECTIONS, WIRE_NAMES, SuperTile
+
+# Symmetries of the supertile: every transform maps a position (or side of a tile) p to (sign * p + rotation) % 6,
+# sign = 1 rotates the supertile clockwise, sign = -1 additionally reflects it.
+# Positions and sides share the same numbering (see the diagram in lookup_table_generator.py), so the same transform works for both.
+
+IDENTITY = (1, 0)
+
+ROTATIONS = [(1, rotation) for rotation in range(6)]
+
+# The connections to the outside of the supertile sit on side (p + 1) % 6 of tile p, so a reflected supertile
+# doesn't fit to its neighbours anymore. Only rotations are symmetries of the supertile, reflections are
+# just kept here for checking that claim with verifySymmetry().
+DIHEDRAL = ROTATIONS + [(-1, rotation) for rotation in range(6)]
+
+# The core gates only exist in the orientations with their in/outputs on 0, 2, 3 and 5, which only the half turn keeps.
+# Bypass has no core and the cores of Wire and POutput are wires themselves, so they can be rotated freely.
+CORE_SYMMETRIES = {
+    "BLG" : [IDENTITY, (1, 3)],
+    "BLGR" : [IDENTITY, (1, 3)],
+    "Inverter" : [IDENTITY, (1, 3)],
+    "Crossing" : [IDENTITY, (1, 3)],
+    "Bypass" : ROTATIONS,
+    "Wire" : ROTATIONS,
+    "POutput" : ROTATIONS,
+}
+
+# The transforms that are used for generating the tables, these are the CORE_SYMMETRIES the solvers actually keep for every configuration.
+# getYCore() and getICore() break ties (e.g. "BLG 02 1" and "Inverter 4 1") differently than for the rotated configuration, so BLG, BLGR
+# and Inverter have to be solved completely (check with: python supertile_symmetry.py).
+GATE_SYMMETRIES = {
+    "BLG" : [IDENTITY],
+    "BLGR" : [IDENTITY],
+    "Inverter" : [IDENTITY],
+    "Crossing" : [IDENTITY, (1, 3)],
+    "Bypass" : ROTATIONS,
+    "Wire" : ROTATIONS,
+    "POutput" : ROTATIONS,
+}
+
+def transformPosition(position, transform) :
+    sign, rotation = transform
+    return (sign * position + rotation) % 6
+
+def inverseTransform(transform) :
+    sign, rotation = transform
+    if sign == 1 :
+        return (1, (-rotation) % 6)
+    return transform # reflections are their own inverse
+
+def transformWires(wires, transform) :
+    return "".join(str(transformPosition(int(direction), transform)) for direction in wires)
+
+def transformWire(wireCode, transform) :
+    transformedCode = 0
+    for bit in range(len(WIRE_CONNECTIONS)) :
+        if wireCode & (1 << bit) :
+            a = transformPosition(WIRE_CONNECTIONS[bit][0], transform)
+            b = transformPosition(WIRE_CONNECTIONS[bit][1], transform)
+            transformedCode |= 1 << WIRE_CONNECTIONS.index(sorted([a, b]))
+    return transformedCode
+
+# Rotates/reflects a whole solved supertile, including the orientation in the core name
+def transformSuperTile(superTile, transform) :
+    wires = [0] * 6
+    for position in range(6) :
+        wires[transformPosition(position, transform)] = transformWire(superTile.wires[position], transform)
+    coreInPositions = tuple(transformPosition(position, transform) for position in superTile.coreInPositions)
+    coreOutPositions = tuple(transformPosition(position, transform) for position in superTile.coreOutPositions)
+
+    coreName = superTile.coreName
+    baseName = coreName.split("_")[0]
+    if coreName.startswith("wire") :
+        # Wire and POutput use a wire as core, its name already contains the orientation
+        coreName = WIRE_NAMES[transformWire(WIRE_CODES_BY_NAME[coreName], transform)]
+    elif baseName == "Inverter" :
+        coreName = baseName + "_" + str(coreInPositions[0]) + "_" + str(coreOutPositions[0])
+    elif baseName == "CROSSING" :
+        coreName = baseName + "_" + str(coreInPositions[0]) + "_" + str(coreInPositions[1])
+    elif baseName != "Bypass" :
+        coreName = baseName + "_" + str(coreOutPositions[0])
+    return SuperTile(coreName, coreInPositions, coreOutPositions, tuple(wires))
+
+WIRE_CODES_BY_NAME = {wireName : wireCode for wireCode, wireName in WIRE_NAMES.items()}
+
+# Returns the canonical query of the class of equivalent queries and the transform that leads from the query to it.
+# The canonical query is the smallest (inputWires, outputWires) any allowed transform produces.
+def canonicalQuery(gate, inputWires, outputWires, symmetries=None) :
+    if symmetries is None :
+        symmetries = GATE_SYMMETRIES.get(gate, [IDENTITY])
+    bestQuery = None
+    bestTransform = IDENTITY
+    for transform in symmetries :
+        query = (transformWires(inputWires, transform), transformWires(outputWires, transform))
+        if bestQuery is None or query < bestQuery :
+            bestQuery = query
+            bestTransform = transform
+    return (gate, bestQuery[0], bestQuery[1]), bestTransform
+
+# The result of a query, rebuilt from the solution of its canonical query
+def restoreSuperTile(canonicalSuperTile, transform) :
+    return transformSuperTile(canonicalSuperTile, inverseTransform(transform))
+
+# Solves every query directly and once for each transform, returns all (query, transform) for which the
+# transformed solution doesn't turn back into the direct one
+def verifySymmetry(solver, queries, symmetries=None) :
+    mismatches = []
+    for gate, inputWires, outputWires in queries :
+        direct = solver.solve(gate, inputWires, outputWires)
+        for transform in (symmetries if symmetries is not None else CORE_SYMMETRIES.get(gate, [IDENTITY])) :
+            try :
+                restored = restoreSuperTile(solver.solve(gate, transformWires(inputWires, transform), transformWires(outputWires, transform)), transform)
+            except RuntimeError :
+                restored = None # the transformed configuration can't be solved at all
+            if restored is None or restored.coreName != direct.coreName or restored.wires != direct.wires :
+                mismatches.append(((gate, inputWires, outputWires), transform))
+    return mismatches
+
+def main() :
+    import argparse
+    import lookup_table_generator
+
+    parser = argparse.ArgumentParser(description="Checks for which configurations the solvers are consistent with the symmetries of the supertile.")
+    parser.add_argument("--all", action="store_true", help="check all rotations and reflections instead of the ones the cores allow")
+    arguments = parser.parse_args()
+
+    solver = lookup_table_generator.BatchSolver()
+    for table in lookup_table_generator.TABLES :
+        queries = [(job.gate, job.inputWires, job.outputWires) for job in table.jobs(table) if job.gate is not None]
+        if len(queries) == 0 :
+            continue
+        mismatches = verifySymmetry(solver, queries, DIHEDRAL if arguments.all else None)
+        print(table.name + ": " + str(len(mismatches)) + " inconsistent")
+        for (gate, inputWires, outputWires), (sign, rotation) in mismatches :
+            print("    " + gate + " " + inputWires + " " + outputWires + " with " + ("reflection" if sign == -1 else "rotation") + " " + str(rotation))
+    solver.close()
+
+if __name__ == "__main__" :
+    main()
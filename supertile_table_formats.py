@@ -0,0 +1,228 @@
+import mmap
+import re
+import struct
+
+import numpy as np
+
+# Other formats for the tables of supertile_lookup_tables.hpp, written from the same data as the header:
+#   - a binary file with 3-bit-packed values, which can be mapped into memory and used without copying
+#   - a C++ header with the values packed into uint32_t words and inline accessors, which is a lot smaller than the std::array literals
+#   - a deduplicated C++ header, which stores every path only once (see writeDedupHeader())
+# In the first two formats the values are the ones of 'enum hex_direction', stored entry after entry, value i of entry e is value number e * supertileSize + i.
+
+HEX_DIRECTIONS = {"NE" : 0, "E" : 1, "SE" : 2, "SW" : 3, "W" : 4, "NW" : 5, "X" : 6, "C" : 7}
+BITS_PER_VALUE = 3
+# An empty position in the entries of lookup_table_generator.py
+EMPTY_POSITION = "-1"
+
+HEADER_PREAMBLE = '#include <array>\n#include <cstdint>\n\nenum hex_direction {\n    NE = 0,\n    E = 1,\n    SE = 2,\n    SW = 3,\n    W = 4,\n    NW = 5,\n    X = 6,\n    C = 7\n};\n'
+
+# Binary format, all numbers little endian:
+#     file header: magic "STLT", uint16 version, uint16 number of tables
+#     per table: name (32 bytes, padded with 0), uint32 totalSize, uint32 supertileSize, uint32 offset of the data from the start of the file, uint32 length of the data
+#     data of every table, starting at a multiple of DATA_ALIGNMENT: value n is stored in bits 3n to 3n + 2, counting from bit 0 of byte 0
+BINARY_MAGIC = b"STLT"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct("<4sHH")
+BINARY_TABLE = struct.Struct("<32sIIII")
+DATA_ALIGNMENT = 8
+
+# Values per uint32_t word of the packed C++ header, so no value is split between two words
+VALUES_PER_WORD = 32 // BITS_PER_VALUE
+
+TABLE_PATTERN = re.compile(r"std::array<std::array<hex_direction,(\d+)>,(\d+)> (\w+) = \{\{(.*?)\}\};", re.DOTALL)
+DIRECTION_PATTERN = re.compile(r"\b(NE|E|SE|SW|W|NW|X|C)\b")
+
+# The entries of lookup_table_generator.py ("-1" for empty, "0" to "5", "7") as (totalSize x supertileSize) uint8 array
+def entriesToArray(lookupTableForFile) :
+    return np.array([[HEX_DIRECTIONS["X"] if position == EMPTY_POSITION else int(position) for position in entry] for entry in lookupTableForFile], dtype=np.uint8)
+
+# The other way round, the entries of an array in the format of lookup_table_generator.py
+def arrayToEntries(array) :
+    return [[EMPTY_POSITION if value == HEX_DIRECTIONS["X"] else str(value) for value in entry] for entry in array.tolist()]
+
+# All tables in a text in the format of supertile_lookup_tables.hpp, by name
+def parseHeaderTables(header) :
+    tables = {}
+    for supertileSize, totalSize, name, body in TABLE_PATTERN.findall(header) :
+        values = [HEX_DIRECTIONS[direction] for direction in DIRECTION_PATTERN.findall(body)]
+        if len(values) != int(supertileSize) * int(totalSize) :
+            raise ValueError(name + " has " + str(len(values)) + " values instead of " + str(int(supertileSize) * int(totalSize)))
+        tables[name] = np.array(values, dtype=np.uint8).reshape(int(totalSize), int(supertileSize))
+    return tables
+
+def pack3(values) :
+    bits = (values.reshape(-1, 1) >> np.arange(BITS_PER_VALUE, dtype=np.uint8)) & 1
+    return np.packbits(bits.reshape(-1), bitorder="little")
+
+def unpack3(packed, count) :
+    bits = np.unpackbits(packed, count=count * BITS_PER_VALUE, bitorder="little").reshape(count, BITS_PER_VALUE)
+    return (bits << np.arange(BITS_PER_VALUE, dtype=np.uint8)).sum(axis=1, dtype=np.uint8)
+
+# tables are LookupTables of lookup_table_generator.py, arrays the matching (totalSize x supertileSize) arrays by name.
+# The whole file is assembled in memory and written at once.
+def writeBinaryTables(path, tables, arrays) :
+    offset = BINARY_HEADER.size + BINARY_TABLE.size * len(tables)
+    descriptors = []
+    blocks = []
+    for table in tables :
+        packed = pack3(arrays[table.name]).tobytes()
+        padding = -offset % DATA_ALIGNMENT
+        offset += padding
+        descriptors.append(BINARY_TABLE.pack(table.name.encode(), table.totalSize, table.supertileSize, offset, len(packed)))
+        blocks.append(b"\0" * padding + packed)
+        offset += len(packed)
+    with open(path, "wb") as binaryFile :
+        binaryFile.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, len(tables)) + b"".join(descriptors) + b"".join(blocks))
+
+# Maps the file into memory and returns (packed data, totalSize, supertileSize) of every table by name.
+# The packed data are views into the mapping, use unpack3() or readBinaryTables() to get the values.
+def openBinaryTables(path) :
+    with open(path, "rb") as binaryFile :
+        mapping = mmap.mmap(binaryFile.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, tableCount = BINARY_HEADER.unpack_from(mapping, 0)
+    if magic != BINARY_MAGIC :
+        raise ValueError(path + " is not a lookup table file")
+    if version != BINARY_VERSION :
+        raise ValueError(path + " has version " + str(version) + ", only version " + str(BINARY_VERSION) + " is supported")
+    tables = {}
+    for index in range(tableCount) :
+        name, totalSize, supertileSize, offset, length = BINARY_TABLE.unpack_from(mapping, BINARY_HEADER.size + index * BINARY_TABLE.size)
+        tables[name.rstrip(b"\0").decode()] = (np.frombuffer(mapping, dtype=np.uint8, count=length, offset=offset), totalSize, supertileSize)
+    return tables
+
+def readBinaryTables(path) :
+    return {name : unpack3(packed, totalSize * supertileSize).reshape(totalSize, supertileSize) for name, (packed, totalSize, supertileSize) in openBinaryTables(path).items()}
+
+def packWords(values) :
+    values = np.concatenate([values.reshape(-1).astype(np.uint32), np.zeros(-values.size % VALUES_PER_WORD, dtype=np.uint32)])
+    return (values.reshape(-1, VALUES_PER_WORD) << (BITS_PER_VALUE * np.arange(VALUES_PER_WORD, dtype=np.uint32))).sum(axis=1, dtype=np.uint32)
+
+# The same tables as supertile_lookup_tables.hpp, packed into uint32_t words. <name>(entry, index) returns the same as <name>[entry][index] of the normal header.
+def writePackedHeader(path, tables, arrays) :
+    parts = [HEADER_PREAMBLE.replace('#include <array>\n', '#include <cstddef>\n'),
+        '\ninline constexpr hex_direction unpack_hex_direction(const std::uint32_t* words, std::size_t value) {\n'
+        '    return static_cast<hex_direction>((words[value / ' + str(VALUES_PER_WORD) + '] >> (' + str(BITS_PER_VALUE) + ' * (value % ' + str(VALUES_PER_WORD) + '))) & 7u);\n'
+        '}\n']
+    for table in tables :
+        words = packWords(arrays[table.name])
+        if table.trivial :
+            parts.append('\n//Trivial, so it\'s not actually used')
+        parts.append('\nconstexpr std::size_t ' + table.name + '_total_size = ' + str(table.totalSize) + ';\n'
+            'constexpr std::size_t ' + table.name + '_supertile_size = ' + str(table.supertileSize) + ';\n'
+            'constexpr std::uint32_t ' + table.name + '_packed[' + str(len(words)) + '] = {\n'
+            + ',\n'.join(', '.join(format(int(word), '#010x') for word in words[start:start + 8]) for start in range(0, len(words), 8)) + '};\n'
+            'inline constexpr hex_direction ' + table.name + '(std::size_t entry, std::size_t index) {\n'
+            '    return unpack_hex_direction(' + table.name + '_packed, entry * ' + str(table.supertileSize) + ' + index);\n'
+            '}\n')
+    with open(path, "w") as headerFile :
+        headerFile.write("".join(parts))
+
+# Deduplicated format: an entry is a sequence of paths separated by X and padded with X, and the same paths appear in many entries
+# and tables, most of them also rotated by some sixths of a turn (position p -> (p + r) % 6, C stays). Every path is stored once as a
+# template, the rotation of it that is the smallest sequence, in a pool shared by all tables, and every entry is stored as one reference
+# (template * 6 + r) per path. Entries with fewer paths than the others of their table are filled up with NO_PATH.
+NO_PATH = 255
+ROTATIONS = 6
+
+def rotatePath(path, rotation) :
+    return tuple((position + rotation) % ROTATIONS if position < ROTATIONS else position for position in path)
+
+# The paths of an entry (values of 'enum hex_direction'), an X between two paths gives an empty path, the X after the last path are padding
+def splitPaths(entry) :
+    paths = [[]]
+    for position in entry :
+        if position == HEX_DIRECTIONS["X"] :
+            paths.append([])
+        else :
+            paths[-1].append(position)
+    while len(paths) > 0 and len(paths[-1]) == 0 :
+        paths.pop()
+    return [tuple(path) for path in paths]
+
+# Returns the pool (all templates one after the other), the start of every template in it (and the end of the last one)
+# and the references of every table as (totalSize x number of paths) uint8 array by name
+def dedupTables(tables, arrays) :
+    templates = {}
+    tablePaths = {}
+    for table in tables :
+        entries = [splitPaths(entry) for entry in arrays[table.name].tolist()]
+        tablePaths[table.name] = entries
+        for paths in entries :
+            for path in paths :
+                templates.setdefault(min(rotatePath(path, rotation) for rotation in range(ROTATIONS)), None)
+    # Sorted, so the pool doesn't depend on the order of the tables
+    templates = {template : index for index, template in enumerate(sorted(templates))}
+    if len(templates) * ROTATIONS > NO_PATH :
+        raise ValueError(str(len(templates)) + " different paths don't fit into the references of the deduplicated format")
+
+    references = {}
+    for table in tables :
+        entries = tablePaths[table.name]
+        pathCount = max(max((len(paths) for paths in entries), default=0), 1)
+        tableReferences = np.full((len(entries), pathCount), NO_PATH, dtype=np.uint8)
+        for entryIndex, paths in enumerate(entries) :
+            for pathIndex, path in enumerate(paths) :
+                for rotation in range(ROTATIONS) :
+                    template = rotatePath(path, -rotation)
+                    if template in templates :
+                        tableReferences[entryIndex, pathIndex] = templates[template] * ROTATIONS + rotation
+                        break
+        references[table.name] = tableReferences
+    pool = np.array([position for template in templates for position in template], dtype=np.uint8)
+    starts = np.cumsum([0] + [len(template) for template in templates]).astype(np.uint16)
+    return pool, starts, references
+
+# The (totalSize x supertileSize) array of the references of a table, like the accessors of the deduplicated header
+def expandReferences(pool, starts, tableReferences, supertileSize) :
+    values = np.full((len(tableReferences), supertileSize), HEX_DIRECTIONS["X"], dtype=np.uint8)
+    for entryIndex, entryReferences in enumerate(tableReferences.tolist()) :
+        index = 0
+        for reference in entryReferences :
+            if reference == NO_PATH :
+                break
+            template = reference // ROTATIONS
+            path = rotatePath(pool[starts[template]:starts[template + 1]].tolist(), reference % ROTATIONS)
+            values[entryIndex, index:index + len(path)] = path
+            index += len(path) + 1
+    return values
+
+# The same tables as supertile_lookup_tables.hpp, deduplicated (see dedupTables()). <name>(entry, index) returns the same as <name>[entry][index] of the normal header.
+def writeDedupHeader(path, tables, arrays) :
+    pool, starts, references = dedupTables(tables, arrays)
+    parts = [HEADER_PREAMBLE.replace('#include <array>\n', '#include <cstddef>\n'),
+        '\n// Every path of the tables once, as the smallest of its rotations, and the start of every path in the pool\n'
+        'constexpr std::uint8_t supertile_path_pool[' + str(max(len(pool), 1)) + '] = {' + ', '.join(map(str, pool.tolist() or [0])) + '};\n'
+        'constexpr std::uint16_t supertile_path_starts[' + str(len(starts)) + '] = {' + ', '.join(map(str, starts.tolist())) + '};\n'
+        'constexpr std::uint8_t supertile_no_path = ' + str(NO_PATH) + ';\n'
+        '\n// Value index of an entry with path_count references (path * 6 + rotation), the X between and after the paths are not stored\n'
+        'inline constexpr hex_direction supertile_path_value(const std::uint8_t* references, std::size_t path_count, std::size_t index) {\n'
+        '    for (std::size_t path = 0; path < path_count && references[path] != supertile_no_path; ++path) {\n'
+        '        const std::size_t start = supertile_path_starts[references[path] / 6];\n'
+        '        const std::size_t length = supertile_path_starts[references[path] / 6 + 1] - start;\n'
+        '        if (index < length) {\n'
+        '            const std::uint8_t value = supertile_path_pool[start + index];\n'
+        '            return static_cast<hex_direction>(value < 6 ? (value + references[path] % 6) % 6 : value);\n'
+        '        }\n'
+        '        if (index == length) {\n'
+        '            return X;\n'
+        '        }\n'
+        '        index -= length + 1;\n'
+        '    }\n'
+        '    return X;\n'
+        '}\n']
+    for table in tables :
+        tableReferences = references[table.name]
+        pathCount = tableReferences.shape[1]
+        values = tableReferences.reshape(-1).tolist()
+        if table.trivial :
+            parts.append('\n//Trivial, so it\'s not actually used')
+        parts.append('\nconstexpr std::size_t ' + table.name + '_total_size = ' + str(table.totalSize) + ';\n'
+            'constexpr std::size_t ' + table.name + '_supertile_size = ' + str(table.supertileSize) + ';\n'
+            'constexpr std::uint8_t ' + table.name + '_paths[' + str(len(values)) + '] = {\n'
+            + ',\n'.join(', '.join(map(str, values[start:start + 16])) for start in range(0, len(values), 16)) + '};\n'
+            'inline constexpr hex_direction ' + table.name + '(std::size_t entry, std::size_t index) {\n'
+            '    return supertile_path_value(' + table.name + '_paths + entry * ' + str(pathCount) + ', ' + str(pathCount) + ', index);\n'
+            '}\n')
+    with open(path, "w") as headerFile :
+        headerFile.write("".join(parts))
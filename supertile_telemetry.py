@@ -0,0 +1,98 @@
+import json
+import threading
+import time
+from collections import namedtuple
+
+# Optional instrumentation of lookup_table_generator.py. Nothing here is used unless a Telemetry object is passed in,
+# the generator only checks 'telemetry is not None' in its loops.
+# All times are taken with time.perf_counter() and stored relative to the creation of the Telemetry object.
+
+# Upper bounds of the latency histogram buckets in microseconds, everything slower lands in the last bucket
+HISTOGRAM_BOUNDS = [2 ** exponent for exponent in range(4, 21)]
+
+# source is how the job got its SuperTile:
+#     "solver": its query was sent to the solver
+#     "shared": its query (or an equivalent one, see supertile_symmetry.py) was solved for another job
+#     "cache": the SuperTile came from the solver cache
+#     "none": the job doesn't need the solver
+# solveMicroseconds and solverMicroseconds belong to the query the SuperTile came from and are None if it wasn't solved in this run
+JobRecord = namedtuple("JobRecord", ["table", "slot", "gate", "inputWires", "outputWires", "source", "solveMicroseconds", "solverMicroseconds", "buildMicroseconds", "outputSize"])
+
+# One solver query as measured by the worker thread, solverMilliseconds is the time the solver reported itself (None without -t)
+QueryTiming = namedtuple("QueryTiming", ["start", "end", "solverMilliseconds"])
+
+def histogramBucket(microseconds) :
+    for bucket, bound in enumerate(HISTOGRAM_BOUNDS) :
+        if microseconds <= bound :
+            return bucket
+    return len(HISTOGRAM_BOUNDS)
+
+class Telemetry :
+    def __init__(self) :
+        self.origin = time.perf_counter()
+        self.lock = threading.Lock()
+        self.jobs = []
+        self.events = []
+
+    def microseconds(self, timestamp) :
+        return (timestamp - self.origin) * 1e6
+
+    # A finished phase of the pipeline, start and end are time.perf_counter() values
+    def addSpan(self, name, category, start, end, arguments=None) :
+        event = {"name" : name, "cat" : category, "ph" : "X", "ts" : self.microseconds(start), "dur" : (end - start) * 1e6, "pid" : 1, "tid" : threading.get_ident()}
+        if arguments is not None :
+            event["args"] = arguments
+        with self.lock :
+            self.events.append(event)
+
+    def addQuery(self, query, timing) :
+        gate, inputWires, outputWires = query
+        self.addSpan(gate + " " + inputWires + " " + outputWires, "solve", timing.start, timing.end, {"solverMilliseconds" : timing.solverMilliseconds})
+
+    def addJob(self, job, source, timing, buildSeconds, entry) :
+        solveMicroseconds = None
+        solverMicroseconds = None
+        if timing is not None :
+            solveMicroseconds = (timing.end - timing.start) * 1e6
+            if timing.solverMilliseconds is not None :
+                solverMicroseconds = timing.solverMilliseconds * 1e3
+        outputSize = sum(1 for position in entry if position != "-1")
+        with self.lock :
+            self.jobs.append(JobRecord(job.table.name, job.slot, job.gate, job.inputWires, job.outputWires, source, solveMicroseconds, solverMicroseconds, buildSeconds * 1e6, outputSize))
+
+    # Counters and a histogram of the solve times of every table
+    def tableSummaries(self) :
+        summaries = {}
+        for record in self.jobs :
+            if record.table not in summaries :
+                summaries[record.table] = {
+                    "jobs" : 0, "solver" : 0, "shared" : 0, "cache" : 0, "none" : 0,
+                    "solveMicroseconds" : 0.0, "solverMicroseconds" : 0.0, "buildMicroseconds" : 0.0,
+                    "solveHistogram" : [0] * (len(HISTOGRAM_BOUNDS) + 1),
+                }
+            summary = summaries[record.table]
+            summary["jobs"] += 1
+            summary[record.source] += 1
+            summary["buildMicroseconds"] += record.buildMicroseconds
+            if record.source == "solver" :
+                summary["solveMicroseconds"] += record.solveMicroseconds
+                summary["solverMicroseconds"] += record.solverMicroseconds or 0.0
+                summary["solveHistogram"][histogramBucket(record.solveMicroseconds)] += 1
+        return summaries
+
+    def writeRecords(self, path) :
+        with open(path, "w") as recordFile :
+            json.dump({
+                "histogramBoundsMicroseconds" : HISTOGRAM_BOUNDS,
+                "tables" : self.tableSummaries(),
+                "jobs" : [record._asdict() for record in self.jobs],
+            }, recordFile, indent=4)
+
+    # The format of chrome://tracing and https://ui.perfetto.dev
+    def writeChromeTrace(self, path) :
+        threadNames = {}
+        for event in self.events :
+            threadNames.setdefault(event["tid"], "thread " + str(len(threadNames)))
+        metadata = [{"name" : "thread_name", "ph" : "M", "pid" : 1, "tid" : tid, "args" : {"name" : name}} for tid, name in threadNames.items()]
+        with open(path, "w") as traceFile :
+            json.dump({"traceEvents" : metadata + self.events, "displayTimeUnit" : "ms"}, traceFile)